@@ -0,0 +1,147 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+
+Microbenchmarks of the report parsing hot path, over synthetic reports from
+report_generators.py. Each stage is measured alone:
+
+    csv       splitting lines into rows with csv.reader
+    decode    converting rows, already split, into records
+    period    _parse_reportperiod on report period strings
+    page      a whole page through _read_page_records
+    memory    bytes allocated per record kept, measured with tracemalloc
+
+Usage:
+    python benchmarks/bench_parsing.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from opendns.data_repository import ReportDataRepository  # noqa: E402
+from opendns.report_schemas import COMPACT_REPORT_SCHEMAS, REPORT_SCHEMAS  # noqa: E402
+from report_generators import generate_domain_activity_lines, generate_time_series_lines  # noqa: E402
+
+REPORT_DATE = date(2005, 11, 1)
+
+
+def measure(operation: Callable[[], object], repeat: int) -> float:
+    """
+    Returns the fastest of several runs of an operation, in seconds.
+    """
+
+    timings = []
+    for _ in range(repeat):
+
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def measure_memory(operation: Callable[[], list]) -> int:
+    """
+    Returns the bytes allocated and still held by the list an operation
+    builds.
+    """
+
+    tracemalloc.start()
+    try:
+        result = operation()
+        size, _ = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    del result
+
+    return size
+
+
+def run(rows: int, repeat: int) -> list[tuple[str, str, float, str]]:
+    """
+    Runs every stage and returns rows of the stage, report, time per row
+    and a note.
+    """
+
+    repository = ReportDataRepository(None)
+    compact_repository = ReportDataRepository(None, compact=True)
+
+    results = []
+
+    reports = {
+        "topdomains": list(generate_domain_activity_lines(rows)),
+        "totalrequests": list(generate_time_series_lines("totalrequests", rows)),
+    }
+
+    for report_type, lines in reports.items():
+
+        elapsed = measure(lambda: sum(1 for _ in csv.reader(lines)), repeat)
+        results.append(("csv", report_type, elapsed / rows, ""))
+
+        header, *table = list(csv.reader(lines))
+
+        schemas = {"": REPORT_SCHEMAS[report_type]}
+        if COMPACT_REPORT_SCHEMAS[report_type] is not REPORT_SCHEMAS[report_type]:
+            schemas["compact"] = COMPACT_REPORT_SCHEMAS[report_type]
+
+        for note, schema in schemas.items():
+
+            decode = schema.compile(header, REPORT_DATE)
+
+            elapsed = measure(lambda: [decode(row) for row in table], repeat)
+            results.append(("decode", report_type, elapsed / rows, note))
+
+            size = measure_memory(lambda: [decode(row) for row in table])
+            results.append(("memory", report_type, size / rows, note))
+
+        for note, page_repository in (("", repository), ("compact", compact_repository)):
+
+            if note and "compact" not in schemas:
+                continue
+
+            elapsed = measure(lambda: page_repository._read_page_records(lines, report_type, REPORT_DATE), repeat)
+            results.append(("page", report_type, elapsed / rows, note))
+
+    periods = [line.split(",", 1)[0] for line in reports["totalrequests"][1:]]
+
+    elapsed = measure(lambda: [repository._parse_reportperiod(period) for period in periods], repeat)
+    results.append(("period", "totalrequests", elapsed / rows, ""))
+
+    return results
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Measures the stages of report parsing.")
+    parser.add_argument("--rows", type=int, default=100000, help="rows in each synthetic report")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each stage, the fastest is kept")
+    args = parser.parse_args()
+
+    print(f"{'stage':<8}{'report':<15}{'per row':>14}  note")
+
+    for stage, report_type, value, note in run(args.rows, args.repeat):
+
+        per_row = f"{value:.0f} B" if stage == "memory" else f"{value * 1e9:.0f} ns"
+
+        print(f"{stage:<8}{report_type:<15}{per_row:>14}  {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+
+Measures retrieving each report type end to end, over HTTP from the fake
+dashboard in tests/fake_dashboard.py, through DataSource and
+ReportDataRepository. Each report type is run in its own process, so its
+peak RSS is its own.
+
+Usage:
+    python benchmarks/bench_reports.py [--domains 20000] [--page-size 200]
+        [--latency 0.0] [--throttle-every 0] [--days 30]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tests"))
+
+from fake_dashboard import FakeDashboard  # noqa: E402
+from opendns.data_repository import ReportDataRepository  # noqa: E402
+from opendns.rate_limiter import RateLimiter  # noqa: E402
+
+REPORT_TYPES = (
+    ReportDataRepository.RPT_DOMAIN,
+    ReportDataRepository.RPT_REQUESTTYPE,
+    ReportDataRepository.RPT_REQUESTS,
+    ReportDataRepository.RPT_UNQDOMAIN,
+    ReportDataRepository.RPT_IPADDR,
+)
+
+REPORT_DATE = date(2005, 11, 1)
+
+
+def get_peak_rss() -> int:
+    """
+    Returns the peak resident set size of this process in bytes.
+    """
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # reported in bytes on macOS, and KiB elsewhere
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def run_report(report_type: str, args: argparse.Namespace) -> dict:
+    """
+    Retrieves one report from a new fake dashboard and returns its
+    measurements.
+    """
+
+    dashboard = FakeDashboard(
+        domain_count=args.domains,
+        page_size=args.page_size,
+        latency=args.latency,
+        throttle_every=args.throttle_every).start()
+
+    try:
+        # the rate budget is not under test
+        data_source = dashboard.make_data_source(rate_limiter=RateLimiter(10 ** 9, 1))
+        repository = ReportDataRepository(data_source)
+
+        reportdate_end = REPORT_DATE + timedelta(days=args.days - 1)
+
+        records = {
+            ReportDataRepository.RPT_DOMAIN: lambda: repository.get_domain_activity_records("1", REPORT_DATE),
+            ReportDataRepository.RPT_REQUESTTYPE: lambda: repository.get_request_types_records("1", REPORT_DATE),
+            ReportDataRepository.RPT_REQUESTS: lambda: repository.get_total_requests_records(
+                "1", REPORT_DATE, reportdate_end),
+            ReportDataRepository.RPT_UNQDOMAIN: lambda: repository.get_total_unique_domains_records(
+                "1", REPORT_DATE, reportdate_end),
+            ReportDataRepository.RPT_IPADDR: lambda: repository.get_unique_ipaddress_records(
+                "1", REPORT_DATE, reportdate_end),
+        }[report_type]
+
+        # log in before timing, so every report is measured alike
+        data_source.get_endpoint("/")
+        stats_start = dashboard.stats_count
+
+        record_count = 0
+        first_record = None
+        error = None
+
+        start = time.perf_counter()
+        try:
+            for _ in records():
+
+                if first_record is None:
+                    first_record = time.perf_counter() - start
+
+                record_count += 1
+
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+
+        elapsed = time.perf_counter() - start
+
+    finally:
+        dashboard.stop()
+
+    request_count = dashboard.stats_count - stats_start
+
+    return {
+        "report_type": report_type,
+        "records": record_count,
+        "requests": request_count,
+        "elapsed": elapsed,
+        "records_per_sec": record_count / elapsed if elapsed > 0 else 0.0,
+        "requests_per_sec": request_count / elapsed if elapsed > 0 else 0.0,
+        "time_to_first_record": first_record,
+        "peak_rss": get_peak_rss(),
+        "error": error,
+    }
+
+
+def print_results(results: list[dict]) -> None:
+    """
+    Prints the measurements of each report type as a table.
+    """
+
+    print(f"{'report':<14}{'records':>9}{'requests':>10}{'records/s':>12}{'requests/s':>12}"
+          f"{'first (ms)':>12}{'peak RSS (MiB)':>16}")
+
+    for result in results:
+
+        first_record = result["time_to_first_record"]
+        first_record = f"{first_record * 1000:.1f}" if first_record is not None else "-"
+
+        print(f"{result['report_type']:<14}{result['records']:>9}{result['requests']:>10}"
+              f"{result['records_per_sec']:>12.0f}{result['requests_per_sec']:>12.1f}"
+              f"{first_record:>12}{result['peak_rss'] / 1048576:>16.1f}")
+
+        if result["error"]:
+            print(f"{'':<14}failed: {result['error']}")
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Measures retrieving each report type from a fake dashboard.")
+    parser.add_argument("--domains", type=int, default=20000, help="domains in the Domain report")
+    parser.add_argument("--page-size", type=int, default=200, help="domains per Domain report page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of server latency per request")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--days", type=int, default=30, help="days in the range reports")
+    parser.add_argument("--report", choices=REPORT_TYPES, help="run a single report type in this process")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    if args.report is not None:
+        results = [run_report(args.report, args)]
+
+    else:
+        results = []
+        for report_type in REPORT_TYPES:
+
+            child_args = [arg for arg in sys.argv[1:] if arg != "--json"]
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), *child_args, "--report", report_type, "--json"],
+                check=True, capture_output=True, text=True).stdout
+
+            results.extend(json.loads(output))
+
+    if args.json:
+        print(json.dumps(results))
+
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
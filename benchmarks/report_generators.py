@@ -0,0 +1,153 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+
+Generates synthetic report CSVs shaped like those of the dashboard, for
+measuring the parsing of reports of any size without a network.
+
+Usage:
+    python benchmarks/report_generators.py topdomains 1000000 topdomains.csv
+    python benchmarks/report_generators.py totalrequests 8760 totalrequests.csv
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+from typing import Generator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from opendns.report_schemas import DOMAIN_ACTIVITY_FLAG_COLUMNS  # noqa: E402
+
+DOMAIN_ACTIVITY_HEADER = ["Rank", "Domain", "Total"] + list(DOMAIN_ACTIVITY_FLAG_COLUMNS.values())
+
+# report type -> the value column of the time series reports
+TIME_SERIES_VALUE_COLUMNS = {
+    "totalrequests": "Requests",
+    "uniquedomains": "Requests",
+    "uniqueips": "IP Addresses",
+}
+
+# the share of domains with any flag set, and of the flags set on those
+FLAGGED_RATE = 0.1
+FLAG_RATE = 0.05
+
+_TLDS = ("com", "net", "org", "io", "co.uk", "de", "cloudfront.net", "akamaiedge.net")
+_LABELS = ("www", "api", "cdn", "mail", "static", "img", "login", "update", "telemetry", "ads")
+
+
+def generate_domain_activity_lines(row_count: int, seed: int = 0) -> Generator[str, None, None]:
+    """
+    Generates the lines of a Domain report, with the full header. Totals
+    fall with rank as real traffic does, and most domains have no flag set.
+
+    :param row_count: An integer value of the domains to report.
+
+    :param seed: An integer seed, the same seed generates the same report.
+
+    :returns: A Generator object providing lines of CSV text.
+    """
+
+    rng = random.Random(seed)
+
+    flag_count = len(DOMAIN_ACTIVITY_FLAG_COLUMNS)
+    unflagged = ",0" * flag_count
+
+    yield ",".join(DOMAIN_ACTIVITY_HEADER) + "\n"
+
+    top_total = row_count * 1000
+
+    for rank in range(1, row_count + 1):
+
+        domain = f"{rng.choice(_LABELS)}{rank}.site{rng.randrange(row_count)}.{rng.choice(_TLDS)}"
+        total = max(top_total // rank, 1)
+
+        if rng.random() < FLAGGED_RATE:
+            flags = "".join(",1" if rng.random() < FLAG_RATE else ",0" for _ in range(flag_count))
+
+        else:
+            flags = unflagged
+
+        yield f"{rank},{domain},{total}{flags}\n"
+
+
+def generate_time_series_lines(
+        report_type: str,
+        row_count: int,
+        reportdate_start: date = date(2005, 11, 1),
+        hourly: bool = True,
+        seed: int = 0) -> Generator[str, None, None]:
+    """
+    Generates the lines of a report of a value per hour or per day.
+
+    :param report_type: A string to identify the report, one of
+        TIME_SERIES_VALUE_COLUMNS.
+
+    :param row_count: An integer value of the periods to report.
+
+    :param reportdate_start: A date object of the first period.
+
+    :param hourly: If True, a period is an hour, otherwise a day.
+
+    :param seed: An integer seed, the same seed generates the same report.
+
+    :returns: A Generator object providing lines of CSV text.
+    """
+
+    rng = random.Random(seed)
+
+    step = timedelta(hours=1) if hourly else timedelta(days=1)
+    period = datetime(reportdate_start.year, reportdate_start.month, reportdate_start.day)
+
+    yield f"Date,{TIME_SERIES_VALUE_COLUMNS[report_type]}\n"
+
+    for _ in range(row_count):
+
+        # busier during the day than at night
+        value = rng.randrange(1000, 5000) * (3 if 8 <= period.hour < 18 else 1)
+
+        yield f"{period:%Y-%m-%d %H:%M:%S},{value}\n"
+
+        period += step
+
+
+def generate_report_lines(report_type: str, row_count: int, seed: int = 0) -> Generator[str, None, None]:
+    """
+    Generates the lines of a Domain or time series report.
+
+    :param report_type: A string to identify the report.
+
+    :param row_count: An integer value of the rows to report.
+
+    :param seed: An integer seed, the same seed generates the same report.
+    """
+
+    if report_type == "topdomains":
+        return generate_domain_activity_lines(row_count, seed)
+
+    return generate_time_series_lines(report_type, row_count, seed=seed)
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Writes a synthetic report CSV.")
+    parser.add_argument("report", choices=["topdomains", *TIME_SERIES_VALUE_COLUMNS])
+    parser.add_argument("rows", type=int, help="rows to generate")
+    parser.add_argument("path", help="file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.path, "w", encoding="UTF-8", newline="") as file:
+        file.writelines(generate_report_lines(args.report, args.rows, args.seed))
+
+
+if __name__ == "__main__":
+    main()
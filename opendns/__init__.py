@@ -10,13 +10,33 @@ If LICENSE file is not included, please visit :
     https://github.com/gkunde/py_opendns
 """
 from datetime import date
-from typing import Generator
-
+from typing import AsyncGenerator, Generator
+
+from .async_data_repository import AsyncReportDataRepository
+from .async_data_source import AsyncDataSource
+from .backfill_job import BackfillJob, BackfillProgress, BackfillUnit
+from .cached_data_source import CachedDataSource
+from .checkpoint_store import CheckpointStore
+from .coalescing_data_source import AsyncCoalescingDataSource, CoalescingDataSource
 from .data_repository import ReportDataRepository
 from .data_source import DataSource
+from .fetch_planner import FetchNeed, FetchPlan, FetchPlanner, FetchRequest, Granularity
+from .interfaces.i_async_opendns import IAsyncOpenDns
+from .interfaces.i_async_rate_limiter import IAsyncRateLimiter
+from .interfaces.i_metrics import IMetrics
 from .interfaces.i_opendns import IOpenDns
-from .models import (DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord,
+from .interfaces.i_rate_limiter import IRateLimiter, Priority
+from .interfaces.i_tracer import ITracer
+from .metrics import MetricsRegistry
+from .models import (CompactDomainActivityRecord, DomainActivityColumns, DomainActivityRecord, DomainCategory,
+                     DomainStatus, RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord,
                      UniqueIpAddressRecord)
+from .multi_network_opendns import MultiNetworkOpenDns
+from .rate_limiter import AsyncRateLimiter, RateLimiter, request_priority
+from .report_schemas import RowFilter
+from .report_sync import ReportSync
+from .shared_rate_limiter import SharedRateLimiter
+from .tracing import JsonLinesExporter, Span, Tracer
 
 
 class OpenDns(IOpenDns):
@@ -34,28 +54,88 @@ class OpenDns(IOpenDns):
     :param network_refid: A string value of the netowrk reference id provided
         by OpenDNS. This should be a numeric value that is displayed in the
         URL from OpenDNS's network settings page for a selected network.
+
+    :param rate_limiter: An IRateLimiter object to throttle requests with. If
+        not provided, the DataSource default is used.
+
+    :param cookie_file: A string path to a file for persisting the session
+        cookies between instances, avoiding a login on every start.
+
+    :param cache_dir: A string path to a directory for caching reports of
+        past dates. If not provided, reports are not cached.
+
+    :param metrics: An IMetrics object to record requests, logins, rate
+        limiter waits and report parsing with, such as a MetricsRegistry.
+
+    :param tracer: An ITracer object to record spans of reports, pages,
+        requests and logins with, such as a Tracer.
     """
 
-    def __init__(self, username: str, password: str, network_refid: str) -> None:
+    def __init__(
+            self,
+            username: str,
+            password: str,
+            network_refid: str,
+            rate_limiter: IRateLimiter = None,
+            cookie_file: str = None,
+            cache_dir: str = None,
+            metrics: IMetrics = None,
+            tracer: ITracer = None) -> None:
 
         self.network_refid = network_refid
 
-        self.data_source = DataSource(username, password)
+        self.data_source = DataSource(username, password, rate_limiter, cookie_file, metrics=metrics, tracer=tracer)
+
+        if cache_dir is not None:
+            self.data_source = CachedDataSource(self.data_source, cache_dir)
 
-        self.report_data_repository = ReportDataRepository(self.data_source)
+        self.report_data_repository = ReportDataRepository(self.data_source, metrics=metrics, tracer=tracer)
 
-    def get_domain_activity_report(self, reportdate: date) -> Generator[DomainActivityRecord, None, None]:
+    def get_domain_activity_report(
+            self,
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> Generator[DomainActivityRecord, None, None]:
         """
         Fetches the data for the Domain report.
 
         :param reportdate: A date object to specify the reporting period.
 
+        :param limit: An integer value of the last rank to fetch. No pages
+            are requested beyond the one holding this rank.
+
+        :param row_filter: A RowFilter object selecting the domains to
+            provide, tested before a record object is created.
+
         :returns: A Generator object that returns DomainActivityRecord objects.
         """
 
-        for record in self.report_data_repository.get_domain_activity_records(self.network_refid, reportdate):
+        for record in self.report_data_repository.get_domain_activity_records(
+                self.network_refid, reportdate, limit, row_filter):
             yield record
 
+    def get_domain_activity_report_columns(
+            self,
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> DomainActivityColumns:
+        """
+        Fetches the data for the Domain report as columns of rank, hostname,
+        requests and flag bit masks.
+
+        :param reportdate: A date object to specify the reporting period.
+
+        :param limit: An integer value of the last rank to fetch.
+
+        :param row_filter: A RowFilter object selecting the domains to
+            provide.
+
+        :returns: A DomainActivityColumns object.
+        """
+
+        return self.report_data_repository.get_domain_activity_columns(
+            self.network_refid, reportdate, limit, row_filter)
+
     def get_request_types_report(self, reportdate: date) -> Generator[RequestTypesRecord, None, None]:
         """
         Fetches the data for the Request Types report.
@@ -138,3 +218,156 @@ class OpenDns(IOpenDns):
                 reportdate_start,
                 reportdate_end):
             yield record
+
+
+class AsyncOpenDns(IAsyncOpenDns):
+    """
+    An asyncio class to enable access to OpenDNS's reporting data and
+    account information. Reports are provided as asynchronous generators
+    for use with "async for".
+
+    :param username: A string value of the account's username to
+        authenticate with. This value should be the email address associated
+        to the account.
+
+    :param password: A string value of the account's password to authenticate
+        with.
+
+    :param network_refid: A string value of the netowrk reference id provided
+        by OpenDNS. This should be a numeric value that is displayed in the
+        URL from OpenDNS's network settings page for a selected network.
+
+    :param rate_limiter: An IAsyncRateLimiter object to throttle requests
+        with. If not provided, the AsyncDataSource default is used.
+
+    :param cookie_file: A string path to a file for persisting the session
+        cookies between instances, avoiding a login on every start.
+
+    :param metrics: An IMetrics object to record requests, logins, rate
+        limiter waits and report parsing with, such as a MetricsRegistry.
+
+    :param tracer: An ITracer object to record spans of reports, pages,
+        requests and logins with, such as a Tracer.
+    """
+
+    def __init__(
+            self,
+            username: str,
+            password: str,
+            network_refid: str,
+            rate_limiter: IAsyncRateLimiter = None,
+            cookie_file: str = None,
+            metrics: IMetrics = None,
+            tracer: ITracer = None) -> None:
+
+        self.network_refid = network_refid
+
+        self.data_source = AsyncDataSource(username, password, rate_limiter, cookie_file, metrics=metrics, tracer=tracer)
+
+        self.report_data_repository = AsyncReportDataRepository(self.data_source, metrics=metrics, tracer=tracer)
+
+    async def get_domain_activity_report(
+            self,
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> AsyncGenerator[DomainActivityRecord, None]:
+        """
+        Fetches the data for the Domain report.
+
+        :param reportdate: A date object to specify the reporting period.
+
+        :param limit: An integer value of the last rank to fetch. No pages
+            are requested beyond the one holding this rank.
+
+        :param row_filter: A RowFilter object selecting the domains to
+            provide, tested before a record object is created.
+
+        :returns: An AsyncGenerator object that returns DomainActivityRecord objects.
+        """
+
+        async for record in self.report_data_repository.get_domain_activity_records(
+                self.network_refid, reportdate, limit, row_filter):
+            yield record
+
+    async def get_request_types_report(self, reportdate: date) -> AsyncGenerator[RequestTypesRecord, None]:
+        """
+        Fetches the data for the Request Types report.
+
+        :param reportdate: A date object to specify the reporting period.
+
+        :returns: An AsyncGenerator object that returns RequestTypesRecord objects.
+        """
+
+        async for record in self.report_data_repository.get_request_types_records(self.network_refid, reportdate):
+            yield record
+
+    async def get_total_requests_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[TotalRequestsRecord, None]:
+        """
+        Fetches the data for the Total Requests report. Note that report
+        ranges less a week will return hourly data.
+
+        :param reportdate_start: A date object to specify the reporting period
+            start.
+
+        :param reportdate_end: A date objet to specify the rpeorting period
+            end. If not provided, a single day report will be retrieved.
+
+        :returns: An AsyncGenerator object that returns TotalRequestsRecord objects.
+        """
+
+        async for record in self.report_data_repository.get_total_requests_records(
+                self.network_refid,
+                reportdate_start,
+                reportdate_end):
+            yield record
+
+    async def get_total_unique_domains_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[TotalUniqueDomainsRecord, None]:
+        """
+        Fetchs the data for the Total Unique Domains report. Note that report
+        ranges less a week will return hourly data.
+
+        :param reportdate_start: A date object to specify the reporting period
+            start.
+
+        :param reportdate_end: A date objet to specify the rpeorting period
+            end. If not provided, a single day report will be retrieved.
+
+        :returns: An AsyncGenerator object that returns TotalUniqueDomainsRecord
+            objects.
+        """
+
+        async for record in self.report_data_repository.get_total_unique_domains_records(
+                self.network_refid,
+                reportdate_start,
+                reportdate_end):
+            yield record
+
+    async def get_unique_ipaddress_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[UniqueIpAddressRecord, None]:
+        """
+        Fetchs the data for the Total Unique IPs report. Note that report
+        ranges less a week will return hourly data.
+
+        :param reportdate_start: A date object to specify the reporting period
+            start.
+
+        :param reportdate_end: A date objet to specify the rpeorting period
+            end. If not provided, a single day report will be retrieved.
+
+        :returns: An AsyncGenerator object that returns UniqueIpAddressRecord
+            objects.
+        """
+
+        async for record in self.report_data_repository.get_unique_ipaddress_records(
+                self.network_refid,
+                reportdate_start,
+                reportdate_end):
+            yield record
@@ -0,0 +1,230 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+from datetime import date
+from io import StringIO
+from typing import Any, AsyncGenerator
+
+from .data_repository import ReportDataRepositoryBase
+from .interfaces.i_async_data_source import IAsyncDataSource
+from .interfaces.i_async_report_data_repository import IAsyncReportDataRepository
+from .interfaces.i_metrics import IMetrics
+from .interfaces.i_tracer import ITracer
+from .models import (DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord,
+                     UniqueIpAddressRecord)
+from .report_schemas import RowFilter
+from .tracing import start_trace, trace, use_span
+
+
+class AsyncReportDataRepository(ReportDataRepositoryBase, IAsyncReportDataRepository):
+    """
+    Provides asyncio methods for retrieving and normalizing reporting data
+    provided by an object implementing the IAsyncDataSource interface.
+
+    :param data_source: An IAsyncDataSource object.
+
+    :param compact: If True, Domain report records are provided as
+        CompactDomainActivityRecord objects, using far less memory.
+
+    :param metrics: An IMetrics object to record the reports, pages and rows
+        read, and the time parsing each page, with. If not provided, nothing
+        is recorded.
+
+    :param tracer: An ITracer object to record spans of each report, page
+        and page parse with. If not provided, nothing is traced.
+    """
+
+    def __init__(
+            self,
+            data_source: IAsyncDataSource,
+            compact: bool = False,
+            metrics: IMetrics = None,
+            tracer: ITracer = None) -> None:
+
+        super().__init__(data_source, compact, metrics, tracer)
+
+    async def get_domain_activity_records(
+            self,
+            network_refid: str,
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> AsyncGenerator[DomainActivityRecord, None]:
+        """
+        Retrieves domain activity report records.
+
+        :param network_refid: A string to identify a network to capture records for.
+
+        :param reportdate: A date object that represents the reporting period.
+
+        :param limit: An integer value of the last rank to retrieve. No pages
+            are requested beyond the one holding this rank.
+
+        :param row_filter: A RowFilter object selecting the rows to provide,
+            tested before a record object is created.
+
+        :returns: An AsyncGenerator object providing DomainActivityRecord objects.
+        """
+
+        async for record in self._get_report_records(
+                self._report_domain, network_refid, reportdate, None, row_filter, limit):
+            yield record
+
+    async def get_request_types_records(
+            self,
+            network_refid: str,
+            reportdate: date) -> AsyncGenerator[RequestTypesRecord, None]:
+        """
+        Retrieves Request Types Report Records.
+
+        :param network_refid: A string to identify a network to capture records for.
+
+        :param reportdate: A date object that represents the reporting period.
+
+        :returns: An AsyncGenerator object providing RequestTypesRecord objects.
+        """
+
+        async for record in self._get_report_records(self._report_requesttypes, network_refid, reportdate, None):
+            yield record
+
+    async def get_total_requests_records(
+            self,
+            network_refid: str,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[TotalRequestsRecord, None]:
+        """
+        Retrieves Total Request Report Records. Date ranges less than 1 week
+        will return hourly data.
+
+        :param network_ref_id: A string to identify a network to capture records for.
+
+        :param reportdate_start: A date object that represents the reporting period start.
+
+        :param reportdate_end: A date object that represents the reporting
+            period end, if not provided a single day report is requested.
+
+        :returns: An AsyncGenerator object providing TotalRequestsRecord objects.
+        """
+
+        async for record in self._get_report_records(self._report_requests, network_refid, reportdate_start, reportdate_end):
+            yield record
+
+    async def get_total_unique_domains_records(
+            self,
+            network_refid: str,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[TotalUniqueDomainsRecord, None]:
+        """
+        Retrieves Total Unique Domain Report Records. Date ranges less than 1
+        week will return hourly data.
+
+        :param network_refid: A string to identify a network to capture records for.
+
+        :param reportdate_start: A date object that represents the reporting period start.
+
+        :param reportdate_end: A date object that represents the reporting
+            period end, if not provided a single day report is requested.
+
+        :returns: An AsyncGenerator object providing TotalUniqueDomainsRecord
+            objects.
+        """
+
+        async for record in self._get_report_records(self._report_unique_domains, network_refid, reportdate_start, reportdate_end):
+            yield record
+
+    async def get_unique_ipaddress_records(
+            self,
+            network_refid: str,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[UniqueIpAddressRecord, None]:
+        """
+        Retrieves Unique IP Address Report Records. Date ranges less than 1
+        week will return hourly data.
+
+        :param network_refid: A string to identify a network to capture records for.
+
+        :param reportdate_start: A date object that represents the reporting period start.
+
+        :param reportdate_end: A date object that represents the reporting
+            period end, if not provided a single day report is requested.
+
+        :returns: An AsyncGenerator object providing UniqueIpAddressRecord
+            objects.
+        """
+
+        async for record in self._get_report_records(self._report_ipaddress, network_refid, reportdate_start, reportdate_end):
+            yield record
+
+    async def _get_report_records(
+            self,
+            report_type: str,
+            network_refid: str,
+            reportdate_start: date,
+            reportdate_end: date,
+            row_filter: RowFilter = None,
+            limit: int = None) -> AsyncGenerator[Any, None]:
+        """
+        Makes calls to the data_source object to retrieve data from service
+        provider.
+
+        :param report_type: A string to identify when reporting data to
+            retrieve.
+
+        :param network_refid: A string to identify a network to retrieve data
+            for.
+
+        :param reportdate_start: A date object that represents the reporting
+            period start.
+
+        :param reportdate_end: A date object that represents the reporting
+            period end. If None or matches reportdate_start, this value is
+            ignored.
+
+        :param row_filter: A RowFilter object selecting the rows to decode.
+
+        :param limit: An integer value of the last rank to retrieve, for
+            ranked reports.
+
+        :returns: An AsyncGenerator object providing the record objects of
+            the report type.
+        """
+
+        attributes = self._get_span_attributes(report_type, network_refid, reportdate_start, reportdate_end)
+
+        # the report span is held while records are yielded, so it is given
+        # as the parent of the page spans rather than made current
+        with start_trace(self._tracer, "report", **attributes) as report_span:
+
+            for page in self._get_report_pages(report_type):
+
+                with start_trace(self._tracer, "page", report_span, page=page, **attributes) as page_span:
+
+                    opendns_path = self._get_report_path(
+                        report_type, network_refid, reportdate_start, reportdate_end, page)
+
+                    with use_span(self._tracer, page_span):
+
+                        with StringIO() as file:
+
+                            await self.data_source.get_endpoint(opendns_path, None, file)
+
+                            file.seek(0)
+
+                            with trace(self._tracer, "parse", page=page, **attributes):
+                                records, row_count, is_limit_reached = self._read_page_records(
+                                    file, report_type, reportdate_start, None, row_filter, limit)
+
+                for record in records:
+                    yield record
+
+                if is_limit_reached or row_count == 0 or self._is_final_page(report_type, row_count):
+                    break
+
+            self._record_report(report_type)
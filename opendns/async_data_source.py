@@ -0,0 +1,250 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import asyncio
+import sys
+import time
+from io import IOBase
+
+import requests
+
+from .data_source import DataSource
+from .interfaces.i_async_data_source import IAsyncDataSource
+from .interfaces.i_async_rate_limiter import IAsyncRateLimiter
+from .interfaces.i_metrics import IMetrics
+from .interfaces.i_rate_limiter import IRateLimiter, Priority
+from .interfaces.i_tracer import ITracer
+from .metrics import RATE_LIMIT_WAIT_SECONDS
+from .rate_limiter import AsyncRateLimiter
+from .tracing import trace
+
+
+class _UnlimitedRateLimiter(IRateLimiter):
+    """
+    A rate limiter that never waits, for the DataSource object requests are
+    sent through. The AsyncDataSource object's own rate limiter is awaited
+    instead.
+    """
+
+    def check(self, priority: Priority = None) -> None:
+        pass
+
+    def try_acquire(self, priority: Priority = None) -> bool:
+        return True
+
+    def time_until_available(self, priority: Priority = None) -> float:
+        return 0
+
+    def remaining(self) -> int:
+        return sys.maxsize
+
+    def time_until_refill(self) -> float:
+        return 0
+
+
+class AsyncDataSource(IAsyncDataSource):
+    """
+    An asyncio DataSource class for connecting to OpenDNS and establishing a
+    session with the service providers website.
+
+    Rate limiting is awaited on the event loop, so no thread is held while a
+    request waits for its turn. The HTTP exchanges themselves are handed to
+    the default executor, as the underlying requests.Session is blocking.
+    Requests made together run on threads of their own, each with its own
+    connection from the pool.
+
+    Failed requests are retried as by DataSource, with the backoff awaited
+    on the event loop.
+
+    :param username: A string value of the account's username to
+        authenticate with. This value should be the email address associated
+        to the account.
+
+    :param password: A string value of the account's password to authenticate
+        with.
+
+    :param rate_limiter: An IAsyncRateLimiter object to throttle requests
+        with. If not provided, an AsyncRateLimiter allowing 19 requests every
+        120 seconds is used. Provide an AsyncRateLimiter with max_requests to
+        adapt the budget to the service's responses.
+
+    :param cookie_file: A string path to a file for persisting the session
+        cookies. When provided, a previously saved session is reused instead
+        of logging in again.
+
+    :param pool_maxsize: An integer value of the connections kept open to
+        each host. Should be at least the number of requests made together.
+
+    :param metrics: An IMetrics object to record request latency, bytes
+        received, logins and rate limiter waits with. If not provided,
+        nothing is recorded.
+
+    :param tracer: An ITracer object to record spans of requests,
+        connections and logins with. If not provided, nothing is traced.
+
+    :param max_retries: An integer value of the times a failed request is
+        retried before its error is raised.
+    """
+
+    def __init__(
+            self,
+            username: str,
+            password: str,
+            rate_limiter: IAsyncRateLimiter = None,
+            cookie_file: str = None,
+            pool_maxsize: int = DataSource.POOL_MAXSIZE,
+            metrics: IMetrics = None,
+            tracer: ITracer = None,
+            max_retries: int = DataSource.MAX_RETRIES) -> None:
+
+        self._data_source = DataSource(
+            username,
+            password,
+            _UnlimitedRateLimiter(),
+            cookie_file,
+            pool_maxsize,
+            metrics,
+            tracer,
+            max_retries)
+
+        self._rate_limiter = rate_limiter
+        if self._rate_limiter is None:
+            self._rate_limiter = AsyncRateLimiter(
+                num_requests=DataSource.NUM_REQUESTS,
+                period=DataSource.PERIOD)
+
+        self._metrics = metrics
+        self._tracer = tracer
+
+        self._sleep = asyncio.sleep
+
+        self.__connect_lock = asyncio.Lock()
+
+    async def get_endpoint(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]] = None,
+            file: IOBase = None,
+            priority: Priority = None) -> str | None:
+        """
+        Fetches data from the given endpoint. Data return will be return as-is
+        per the website being connected to. Data may be represented as HTML,
+        plain text, or formatted as a CSV document.
+
+        :param endpoint: A string path to the endpoint to retrieve data for.
+
+        :param params: A collection of query string values to include with the
+            endpoint.
+
+        :param file: An IOBase object for capturing larger data files or
+            streams.
+
+        :param priority: The Priority of the request with the rate limiter.
+            If not provided, the priority set with request_priority is used.
+
+        :returns: A string value containing the retrieved content. If the file
+            param is specified, no value is returned.
+        """
+
+        with trace(self._tracer, "get_endpoint", endpoint=endpoint):
+
+            response = await self._send_request(endpoint, params, file is not None, priority)
+
+            return await asyncio.to_thread(self._data_source.read_response, endpoint, response, file)
+
+    async def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> str | None:
+        """
+        Allows data to be posted to given endpoint. Not currently implemented.
+        """
+
+        await self._check_rate_limit()
+
+        return await super().post_endpoint(endpoint, params)
+
+    async def _send_request(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]],
+            stream: bool,
+            priority: Priority = None) -> requests.Response:
+        """
+        Sends a GET request for an endpoint within the rate limiter's budget,
+        retrying failures worth retrying. Parameters are as for
+        DataSource._send_request.
+
+        :returns: A requests.Response object with a successful status.
+        """
+
+        attempt = 0
+        is_session_renewed = False
+        while True:
+
+            await self._check_rate_limit(priority)
+
+            await self._connect()
+
+            try:
+                response = await asyncio.to_thread(self._data_source.request_endpoint, endpoint, params, stream)
+
+            except requests.RequestException as error:
+
+                delay = self._data_source.get_retry_delay(endpoint, error, attempt, self._rate_limiter)
+                if delay is None:
+                    raise
+
+                await self._sleep(delay)
+                attempt += 1
+
+                continue
+
+            if response is None:
+                if is_session_renewed:
+                    raise RuntimeError("Unable to login, the session was not accepted.")
+
+                is_session_renewed = True
+                continue
+
+            self._rate_limiter.on_success()
+
+            return response
+
+    async def _check_rate_limit(self, priority: Priority = None) -> None:
+        """
+        Waits for the rate limiter, recording the time waited.
+
+        :param priority: The Priority of the request with the rate limiter.
+        """
+
+        start = time.perf_counter()
+
+        await self._rate_limiter.check(priority)
+
+        if self._metrics is not None:
+            self._metrics.observe(RATE_LIMIT_WAIT_SECONDS, time.perf_counter() - start)
+
+    async def _connect(self) -> None:
+        """
+        Authenticates the session once, even when several coroutines make
+        their first request at the same time.
+
+        :raises RuntimeError: If the site is reporting error messages or an
+            authentication token cannot be obtained.
+        """
+
+        if self._data_source.is_connected:
+            return
+
+        # logs in as DataSource does, the lock keeps the coroutines waiting
+        # on the event loop rather than each holding a thread
+        async with self.__connect_lock:
+
+            if not self._data_source.is_connected:
+                await asyncio.to_thread(self._data_source.ensure_connected)
@@ -0,0 +1,384 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Generator, Iterable
+
+from .data_repository import ReportDataRepository
+from .fetch_planner import FetchNeed, FetchPlanner, Granularity
+
+
+@dataclass(frozen=True)
+class BackfillUnit:
+    """
+    A report of a network to backfill, fetched one page at a time.
+    """
+
+    network_refid: str
+    report_type: str
+    reportdate_start: date
+    reportdate_end: date = None
+
+
+@dataclass
+class BackfillProgress:
+    """
+    The progress and throughput of a backfill job.
+    """
+
+    units_total: int = 0
+    units_done: int = 0
+    pages_done: int = 0
+    records_done: int = 0
+    pages_per_hour: float = 0.0
+    eta: timedelta = None
+
+    @property
+    def is_done(self) -> bool:
+        return self.units_done >= self.units_total
+
+
+class BackfillJob:
+    """
+    A durable queue of report pages to fetch, recorded in a SQLite database.
+
+    Work is queued as units of a network, report and date. Each unit is
+    fetched a page at a time, and every completed page is recorded, so a
+    job that is stopped or crashes resumes from the page it was on.
+
+    A page is recorded as complete once its records have been consumed, so
+    the records of the page in progress are provided again after a crash.
+
+    Several runners, in this or other processes, may work on the same
+    database. A runner claims a unit before fetching its pages, and skips
+    units claimed by others. A claim is renewed with each page, and expires
+    if no page is fetched for claim_timeout seconds, so the unit of a
+    runner that crashed is taken over.
+
+    :param path: A string path to the SQLite database file. The file is
+        created if it does not exist.
+
+    :param report_data_repository: The ReportDataRepository object to
+        retrieve report pages with.
+
+    :param clock: A callable returning the current time in seconds, defaults
+        to time.time.
+
+    :param claim_timeout: An integer value of seconds a unit stays claimed
+        by a runner without a page being fetched.
+    """
+
+    # seconds to wait for another process to release the database
+    LOCK_TIMEOUT = 30
+
+    # seconds a claimed unit is left to its runner, longer than any page
+    # takes including the rate limiter's waits
+    CLAIM_TIMEOUT = 900
+
+    # seconds of recent pages the throughput is measured over
+    THROUGHPUT_WINDOW = 3600
+
+    def __init__(
+            self,
+            path: str,
+            report_data_repository: ReportDataRepository,
+            clock: Callable[[], float] = None,
+            claim_timeout: int = CLAIM_TIMEOUT) -> None:
+
+        self.path = path
+        self.report_data_repository = report_data_repository
+        self.claim_timeout = claim_timeout
+
+        self._clock = clock if clock is not None else time.time
+
+        # identifies this runner's claims
+        self._runner_id = uuid.uuid4().hex
+
+        self._lock_timeout = self.LOCK_TIMEOUT
+        self._throughput_window = self.THROUGHPUT_WINDOW
+
+        self._planner = FetchPlanner()
+
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS backfill_units ("
+                "unit_id INTEGER PRIMARY KEY, "
+                "network_refid TEXT NOT NULL, "
+                "report_type TEXT NOT NULL, "
+                "reportdate_start TEXT NOT NULL, "
+                "reportdate_end TEXT, "
+                "next_page INTEGER NOT NULL DEFAULT 1, "
+                "is_done INTEGER NOT NULL DEFAULT 0, "
+                "claimed_by TEXT, "
+                "claimed_until REAL, "
+                "UNIQUE (network_refid, report_type, reportdate_start, reportdate_end))")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS backfill_pages ("
+                "unit_id INTEGER NOT NULL, "
+                "page INTEGER NOT NULL, "
+                "record_count INTEGER NOT NULL, "
+                "completed_at REAL NOT NULL, "
+                "PRIMARY KEY (unit_id, page))")
+
+    def add(
+            self,
+            report_type: str,
+            network_refids: Iterable[str],
+            reportdate_start: date,
+            reportdate_end: date,
+            granularity: Granularity = Granularity.DAILY) -> int:
+        """
+        Queues the work units of a report for a date range. Single date
+        reports are queued a unit per date, range reports are queued as the
+        fewest range requests. Units already queued are skipped.
+
+        :param report_type: A string to identify the report.
+
+        :param network_refids: A collection of strings to identify networks.
+
+        :param reportdate_start: A date object of the first date.
+
+        :param reportdate_end: A date object of the last date.
+
+        :param granularity: The Granularity of range reports to keep.
+
+        :returns: An integer value of the units added.
+        """
+
+        units = []
+
+        for network_refid in network_refids:
+
+            if report_type in self._planner.RANGE_REPORT_TYPES:
+                plan = self._planner.plan([
+                    FetchNeed(report_type, network_refid, reportdate_start, reportdate_end, granularity)])
+
+                units.extend(
+                    BackfillUnit(network_refid, report_type, request.reportdate_start, request.reportdate_end)
+                    for request in plan.requests)
+
+            else:
+                units.extend(
+                    BackfillUnit(network_refid, report_type, reportdate_start + timedelta(days=offset))
+                    for offset in range((reportdate_end - reportdate_start).days + 1))
+
+        with closing(self._connect()) as connection:
+
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                added = 0
+                for unit in units:
+
+                    reportdate_end_value = unit.reportdate_end.isoformat() if unit.reportdate_end else None
+
+                    # UNIQUE does not match NULL ends, so check explicitly
+                    exists = connection.execute(
+                        "SELECT 1 FROM backfill_units WHERE network_refid = ? AND report_type = ? "
+                        "AND reportdate_start = ? AND reportdate_end IS ?",
+                        (unit.network_refid, unit.report_type, unit.reportdate_start.isoformat(),
+                         reportdate_end_value, )).fetchone()
+
+                    if exists is not None:
+                        continue
+
+                    connection.execute(
+                        "INSERT INTO backfill_units (network_refid, report_type, reportdate_start, reportdate_end) "
+                        "VALUES (?, ?, ?, ?)",
+                        (unit.network_refid, unit.report_type, unit.reportdate_start.isoformat(),
+                         reportdate_end_value, ))
+
+                    added += 1
+
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        return added
+
+    def run(self, max_pages: int = None) -> Generator[tuple[BackfillUnit, Any], None, None]:
+        """
+        Fetches the queued pages in order, resuming from the last completed
+        page.
+
+        :param max_pages: An integer value of the pages to fetch before
+            stopping. If not provided, runs until the queue is empty.
+
+        :returns: A Generator object that returns tuples of the BackfillUnit
+            and a record object.
+        """
+
+        pages_fetched = 0
+
+        try:
+            while max_pages is None or pages_fetched < max_pages:
+
+                pending = self._claim_next_unit()
+                if pending is None:
+                    return
+
+                unit_id, unit, page = pending
+
+                records, is_final_page = self.report_data_repository.get_report_page(
+                    unit.report_type, unit.network_refid, unit.reportdate_start, unit.reportdate_end, page)
+
+                for record in records:
+                    yield unit, record
+
+                self._complete_page(unit_id, page, len(records), is_final_page)
+
+                pages_fetched += 1
+
+        finally:
+            # a unit left part way is free for other runners at once
+            self._release_claims()
+
+    def get_progress(self) -> BackfillProgress:
+        """
+        Returns the progress of the job, with the throughput of the pages
+        completed recently and the estimated time to finish.
+        """
+
+        now = self._clock()
+
+        with closing(self._connect()) as connection:
+
+            units_total, units_done = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(is_done), 0) FROM backfill_units").fetchone()
+
+            pages_done, records_done = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(record_count), 0) FROM backfill_pages").fetchone()
+
+            recent_pages, first_completed = connection.execute(
+                "SELECT COUNT(*), MIN(completed_at) FROM backfill_pages WHERE completed_at > ?",
+                (now - self._throughput_window, )).fetchone()
+
+            done_unit_pages = connection.execute(
+                "SELECT COUNT(*) FROM backfill_pages WHERE unit_id IN "
+                "(SELECT unit_id FROM backfill_units WHERE is_done = 1)").fetchone()[0]
+
+        progress = BackfillProgress(units_total, units_done, pages_done, records_done)
+
+        elapsed = now - first_completed if first_completed is not None else 0
+        if recent_pages > 1 and elapsed > 0:
+            progress.pages_per_hour = recent_pages * 3600 / elapsed
+
+        if progress.is_done:
+            progress.eta = timedelta(0)
+
+        elif progress.pages_per_hour > 0 and units_done > 0:
+            # remaining units are assumed to average as many pages as those done
+            pages_remaining = (units_total - units_done) * done_unit_pages / units_done
+            progress.eta = timedelta(hours=pages_remaining / progress.pages_per_hour)
+
+        return progress
+
+    def _claim_next_unit(self) -> tuple[int, BackfillUnit, int] | None:
+        """
+        Claims the next unit not claimed by another runner, preferring the
+        unit this runner already holds.
+
+        :returns: The id, unit and page number of the next page to fetch, or
+            None if every unit is done or claimed by other runners.
+        """
+
+        with closing(self._connect()) as connection:
+
+            # take the write lock up front, so two runners cannot claim the
+            # same unit
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                now = self._clock()
+
+                row = connection.execute(
+                    "SELECT unit_id, network_refid, report_type, reportdate_start, reportdate_end, next_page "
+                    "FROM backfill_units "
+                    "WHERE is_done = 0 AND (claimed_by IS NULL OR claimed_by = ? OR claimed_until <= ?) "
+                    "ORDER BY claimed_by IS NOT ?, unit_id LIMIT 1",
+                    (self._runner_id, now, self._runner_id, )).fetchone()
+
+                if row is not None:
+                    connection.execute(
+                        "UPDATE backfill_units SET claimed_by = ?, claimed_until = ? WHERE unit_id = ?",
+                        (self._runner_id, now + self.claim_timeout, row[0], ))
+
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+
+        unit_id, network_refid, report_type, reportdate_start, reportdate_end, page = row
+
+        unit = BackfillUnit(
+            network_refid,
+            report_type,
+            date.fromisoformat(reportdate_start),
+            date.fromisoformat(reportdate_end) if reportdate_end else None)
+
+        return unit_id, unit, page
+
+    def _complete_page(self, unit_id: int, page: int, record_count: int, is_final_page: bool) -> None:
+        """
+        Records a page as complete and advances its unit, in one transaction.
+        """
+
+        with closing(self._connect()) as connection:
+
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO backfill_pages (unit_id, page, record_count, completed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (unit_id, page, record_count, self._clock(), ))
+
+                # a runner whose claim expired may complete a page again,
+                # which never moves the unit back
+                connection.execute(
+                    "UPDATE backfill_units SET next_page = MAX(next_page, ?), is_done = MAX(is_done, ?) "
+                    "WHERE unit_id = ?",
+                    (page + 1, int(is_final_page), unit_id, ))
+
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _release_claims(self) -> None:
+        """
+        Releases the units claimed by this runner.
+        """
+
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "UPDATE backfill_units SET claimed_by = NULL, claimed_until = NULL WHERE claimed_by = ?",
+                (self._runner_id, ))
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection to the database with transactions managed by the
+        caller.
+        """
+
+        return sqlite3.connect(self.path, timeout=self._lock_timeout, isolation_level=None)
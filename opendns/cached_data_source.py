@@ -0,0 +1,360 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import gzip
+import hashlib
+import heapq
+import os
+import re
+import tempfile
+import threading
+from datetime import date, timedelta
+from io import IOBase, StringIO
+from typing import Callable, Generator
+
+from .interfaces.i_data_source import IDataSource
+
+
+class CachedDataSource(IDataSource):
+    """
+    Wraps an IDataSource object with an on-disk cache of report pages.
+
+    Only reports covering dates that have closed are cached, as their content
+    no longer changes. Reports including the current day are always fetched
+    from the wrapped data source. The least recently used pages are removed
+    once the cache grows beyond max_size.
+
+    The directory is scanned once, on the first page stored or read, after
+    which the pages and their total size are tracked in memory. Pages stored
+    by other processes sharing the directory are counted once read.
+
+    :param data_source: The IDataSource object to fetch uncached pages with.
+
+    :param cache_dir: A string path to the directory holding cached pages.
+        The directory is created if it does not exist.
+
+    :param max_size: An integer value of the maximum bytes stored in the
+        cache directory.
+
+    :param compress: If True, pages are stored gzip compressed.
+
+    :param settle_days: An integer value of the days a report's end date must
+        be in the past before it is cached. Allows for the provider finishing
+        a day later than the local date changes.
+
+    :param today: A callable returning the current date, defaults to
+        date.today.
+    """
+
+    # 256 MiB
+    DEFAULT_MAX_SIZE = 268435456
+
+    DEFAULT_ENCODING = "UTF-8"
+
+    # outdated queue entries allowed before the queue is rebuilt
+    _QUEUE_SLACK = 64
+
+    _CACHE_SUFFIX = ".csv"
+    _COMPRESSED_SUFFIX = ".csv.gz"
+
+    _REPORT_PATH_PATTERN = re.compile(
+        r"^/stats/[^/]+/[^/]+/(?P<start>\d{4}-\d{2}-\d{2})(?:to(?P<end>\d{4}-\d{2}-\d{2}))?(?:/page\d+)?\.csv$")
+
+    def __init__(
+            self,
+            data_source: IDataSource,
+            cache_dir: str,
+            max_size: int = DEFAULT_MAX_SIZE,
+            compress: bool = False,
+            settle_days: int = 1,
+            today: Callable[[], date] = None) -> None:
+
+        self.data_source = data_source
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.compress = compress
+        self.settle_days = settle_days
+
+        self._today = today if today is not None else date.today
+
+        # path -> (mtime, size) of the cached pages, None until scanned
+        self.__entries = None
+        self.__size = 0
+
+        # (mtime, path) least recently used first, may hold outdated entries
+        self.__queue = []
+        self.__lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_endpoint(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]] = None,
+            file: IOBase = None) -> bytes | None:
+        """
+        Fetches data from the given endpoint, using the cached copy when one
+        is available.
+
+        :param endpoint: A string path to the endpoint to retrieve data for.
+
+        :param params: A collection of query string values to include with the
+            endpoint.
+
+        :param file: An IOBase object for capturing larger data files or
+            streams.
+
+        :returns: The retrieved content. If the file param is specified, no
+            value is returned.
+        """
+
+        if not self._is_cacheable(endpoint):
+            return self.data_source.get_endpoint(endpoint, params, file)
+
+        cache_path = self._get_cache_path(endpoint, params)
+
+        content = self._read(cache_path)
+        if content is None:
+
+            if file is None:
+                content = self.data_source.get_endpoint(endpoint, params, None)
+
+            else:
+                with StringIO() as buffer:
+                    self.data_source.get_endpoint(endpoint, params, buffer)
+                    content = buffer.getvalue().encode(self.DEFAULT_ENCODING)
+
+            self._write(cache_path, content)
+
+        if file is None:
+            return content
+
+        file.write(content.decode(self.DEFAULT_ENCODING))
+
+        return None
+
+    def iter_endpoint_lines(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]] = None) -> Generator[str, None, None]:
+        """
+        Fetches data from the given endpoint line by line, using the cached
+        copy when one is available. Uncached pages are streamed from the
+        wrapped data source and stored once they have been read completely.
+
+        :param endpoint: A string path to the endpoint to retrieve data for.
+
+        :param params: A collection of query string values to include with the
+            endpoint.
+
+        :returns: A Generator object providing lines of text.
+        """
+
+        if not self._is_cacheable(endpoint):
+            yield from self.data_source.iter_endpoint_lines(endpoint, params)
+            return
+
+        cache_path = self._get_cache_path(endpoint, params)
+
+        content = self._read(cache_path)
+        if content is not None:
+
+            with StringIO(content.decode(self.DEFAULT_ENCODING)) as file:
+                yield from file
+
+            return
+
+        lines = []
+        for line in self.data_source.iter_endpoint_lines(endpoint, params):
+
+            lines.append(line)
+
+            yield line
+
+        self._write(cache_path, "".join(lines).encode(self.DEFAULT_ENCODING))
+
+    def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+        """
+        Posts data to the wrapped data source, responses are never cached.
+        """
+
+        return self.data_source.post_endpoint(endpoint, params)
+
+    def _is_cacheable(self, endpoint: str) -> bool:
+        """
+        Determines if an endpoint is a report for dates that have closed.
+
+        :param endpoint: A string path to the endpoint.
+        """
+
+        match = self._REPORT_PATH_PATTERN.match(endpoint)
+        if match is None:
+            return False
+
+        report_end = date.fromisoformat(match.group("end") or match.group("start"))
+
+        return report_end + timedelta(days=self.settle_days) <= self._today()
+
+    def _get_cache_path(self, endpoint: str, params: list[tuple[str, str | None]]) -> str:
+        """
+        Returns the file path caching an endpoint and its query string.
+        """
+
+        key = endpoint
+        if params:
+            key += "?" + "&".join(f"{name}={value}" for name, value in params)
+
+        suffix = self._COMPRESSED_SUFFIX if self.compress else self._CACHE_SUFFIX
+
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode(self.DEFAULT_ENCODING)).hexdigest() + suffix)
+
+    def _read(self, cache_path: str) -> bytes | None:
+        """
+        Reads a cached page, marking it as recently used.
+
+        :returns: The cached content, or None if the page is not cached.
+        """
+
+        try:
+            with open(cache_path, "rb") as cache_file:
+                content = cache_file.read()
+
+        except FileNotFoundError:
+            return None
+
+        if cache_path.endswith(self._COMPRESSED_SUFFIX):
+            content = gzip.decompress(content)
+
+        try:
+            os.utime(cache_path)
+
+        except FileNotFoundError:
+            # evicted by another process since being read
+            return content
+
+        self._add_entry(cache_path)
+
+        return content
+
+    def _write(self, cache_path: str, content: bytes) -> None:
+        """
+        Stores a page in the cache, then evicts pages beyond max_size.
+        """
+
+        if cache_path.endswith(self._COMPRESSED_SUFFIX):
+            content = gzip.compress(content)
+
+        # write aside and rename, so readers never see a partial page
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as cache_file:
+                cache_file.write(content)
+
+            os.replace(temp_path, cache_path)
+
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        self._add_entry(cache_path)
+
+    def _add_entry(self, cache_path: str) -> None:
+        """
+        Records a page that was written or read as most recently used, then
+        evicts pages beyond max_size.
+        """
+
+        try:
+            cache_stat = os.stat(cache_path)
+
+        except FileNotFoundError:
+            # evicted by another process since being used
+            return
+
+        with self.__lock:
+
+            if self.__entries is None:
+                self._scan()
+
+            _, previous_size = self.__entries.get(cache_path, (None, 0, ))
+
+            self.__entries[cache_path] = (cache_stat.st_mtime, cache_stat.st_size, )
+            self.__size += cache_stat.st_size - previous_size
+
+            heapq.heappush(self.__queue, (cache_stat.st_mtime, cache_path, ))
+
+            # pages used again leave their earlier places in the queue behind
+            if len(self.__queue) > 2 * len(self.__entries) + self._QUEUE_SLACK:
+                self.__queue = [(mtime, path, ) for path, (mtime, _) in self.__entries.items()]
+                heapq.heapify(self.__queue)
+
+            if self.__size > self.max_size:
+                self._evict()
+
+    def _scan(self) -> None:
+        """
+        Indexes the pages in the cache directory by their last use.
+        """
+
+        self.__entries = {}
+        self.__size = 0
+
+        with os.scandir(self.cache_dir) as cache_entries:
+            for entry in cache_entries:
+
+                if not entry.name.endswith((self._CACHE_SUFFIX, self._COMPRESSED_SUFFIX)):
+                    continue
+
+                entry_stat = entry.stat()
+
+                self.__entries[entry.path] = (entry_stat.st_mtime, entry_stat.st_size, )
+                self.__size += entry_stat.st_size
+
+        self.__queue = [(mtime, path, ) for path, (mtime, _) in self.__entries.items()]
+        heapq.heapify(self.__queue)
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used pages until the cache fits max_size.
+        A page is checked before removal, in case another process sharing
+        the directory used it since it was indexed.
+        """
+
+        while self.__size > self.max_size and self.__queue:
+
+            mtime, path = heapq.heappop(self.__queue)
+
+            entry = self.__entries.get(path)
+            if entry is None or entry[0] != mtime:
+                continue
+
+            try:
+                entry_stat = os.stat(path)
+
+            except FileNotFoundError:
+                entry_stat = None
+
+            if entry_stat is not None and entry_stat.st_mtime != mtime:
+                self.__entries[path] = (entry_stat.st_mtime, entry_stat.st_size, )
+                self.__size += entry_stat.st_size - entry[1]
+
+                heapq.heappush(self.__queue, (entry_stat.st_mtime, path, ))
+                continue
+
+            try:
+                os.unlink(path)
+
+            except FileNotFoundError:
+                pass
+
+            del self.__entries[path]
+            self.__size -= entry[1]
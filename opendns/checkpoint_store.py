@@ -0,0 +1,89 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import sqlite3
+from contextlib import closing
+from datetime import date
+
+
+class CheckpointStore:
+    """
+    Records the last complete reporting date of each network's reports in a
+    SQLite database, so a sync survives restarts.
+
+    :param path: A string path to the SQLite database file. The file is
+        created if it does not exist.
+    """
+
+    # seconds to wait for another process to release the database
+    LOCK_TIMEOUT = 30
+
+    def __init__(self, path: str) -> None:
+
+        self.path = path
+
+        self._lock_timeout = self.LOCK_TIMEOUT
+
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS report_checkpoints ("
+                "network_refid TEXT NOT NULL, "
+                "report_type TEXT NOT NULL, "
+                "complete_through TEXT NOT NULL, "
+                "PRIMARY KEY (network_refid, report_type))")
+
+    def get_checkpoint(self, network_refid: str, report_type: str) -> date | None:
+        """
+        Returns the last reporting date fetched completely.
+
+        :param network_refid: A string to identify a network.
+
+        :param report_type: A string to identify the report.
+
+        :returns: A date object, or None if the report was never synced.
+        """
+
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT complete_through FROM report_checkpoints WHERE network_refid = ? AND report_type = ?",
+                (network_refid, report_type, )).fetchone()
+
+        if row is None:
+            return None
+
+        return date.fromisoformat(row[0])
+
+    def set_checkpoint(self, network_refid: str, report_type: str, complete_through: date) -> None:
+        """
+        Records the last reporting date fetched completely. A checkpoint is
+        never moved backwards.
+
+        :param network_refid: A string to identify a network.
+
+        :param report_type: A string to identify the report.
+
+        :param complete_through: A date object of the last complete date.
+        """
+
+        with closing(self._connect()) as connection:
+            # ISO dates order the same as text
+            connection.execute(
+                "INSERT INTO report_checkpoints (network_refid, report_type, complete_through) VALUES (?, ?, ?) "
+                "ON CONFLICT (network_refid, report_type) DO UPDATE SET "
+                "complete_through = MAX(complete_through, excluded.complete_through)",
+                (network_refid, report_type, complete_through.isoformat(), ))
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection to the database, committing each statement.
+        """
+
+        return sqlite3.connect(self.path, timeout=self._lock_timeout, isolation_level=None)
@@ -0,0 +1,238 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import asyncio
+import copy
+import threading
+from io import IOBase, StringIO
+
+from .interfaces.i_async_data_source import IAsyncDataSource
+from .interfaces.i_data_source import IDataSource
+
+
+def _get_fetch_key(endpoint: str, params: list[tuple[str, str | None]] | None, file: IOBase | None) -> tuple:
+    """
+    Returns the key identifying identical fetches of an endpoint. Fetches
+    returning content and fetches written to a file are kept apart, as the
+    data source provides them in different forms.
+    """
+
+    return (endpoint, tuple(params) if params else (), file is not None, )
+
+
+def _copy_error(error: Exception) -> Exception:
+    """
+    Returns a new exception like the one a shared fetch failed with, so each
+    caller raises its own instance rather than sharing one traceback.
+    """
+
+    try:
+        return copy.copy(error)
+
+    except Exception:
+        return RuntimeError(f"A shared fetch failed: {error!r}")
+
+
+class _InFlightFetch:
+    """
+    A fetch made by one thread, whose result is shared with the threads
+    waiting on it.
+    """
+
+    def __init__(self) -> None:
+
+        self.done = threading.Event()
+        self.content = None
+        self.error = None
+
+
+class CoalescingDataSource(IDataSource):
+    """
+    Wraps an IDataSource object so that concurrent threads fetching the same
+    endpoint and params share one request. The first caller makes the
+    request, the others wait for it and receive the same content, or an
+    error chained to the one the request failed with.
+
+    Only fetches in progress are shared, nothing is kept once a fetch ends.
+    Pages are read whole before being provided, including through
+    iter_endpoint_lines.
+
+    :param data_source: The IDataSource object to fetch with.
+    """
+
+    def __init__(self, data_source: IDataSource) -> None:
+
+        self.data_source = data_source
+
+        self.__in_flight = {}
+        self.__lock = threading.Lock()
+
+    def get_endpoint(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]] = None,
+            file: IOBase = None) -> bytes | None:
+        """
+        Fetches data from the given endpoint, sharing a fetch of the same
+        endpoint already in progress.
+
+        :param endpoint: A string path to the endpoint to retrieve data for.
+
+        :param params: A collection of query string values to include with the
+            endpoint.
+
+        :param file: An IOBase object for capturing larger data files or
+            streams.
+
+        :returns: The retrieved content. If the file param is specified, no
+            value is returned.
+        """
+
+        key = _get_fetch_key(endpoint, params, file)
+
+        with self.__lock:
+
+            fetch = self.__in_flight.get(key)
+
+            is_leader = fetch is None
+            if is_leader:
+                fetch = _InFlightFetch()
+                self.__in_flight[key] = fetch
+
+        if is_leader:
+            try:
+                fetch.content = self._fetch(endpoint, params, file is not None)
+
+            except Exception as error:
+                fetch.error = error
+                raise
+
+            finally:
+                with self.__lock:
+                    del self.__in_flight[key]
+
+                fetch.done.set()
+
+        else:
+            fetch.done.wait()
+
+            if fetch.error is not None:
+                raise _copy_error(fetch.error) from fetch.error
+
+        if file is None:
+            return fetch.content
+
+        file.write(fetch.content)
+
+        return None
+
+    def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+        """
+        Posts data to the wrapped data source, posts are never shared.
+        """
+
+        return self.data_source.post_endpoint(endpoint, params)
+
+    def _fetch(self, endpoint: str, params: list[tuple[str, str | None]] | None, to_file: bool) -> bytes | str:
+        """
+        Fetches the content of an endpoint as the data source returns it, or
+        as the text it writes when fetching to a file.
+        """
+
+        if not to_file:
+            return self.data_source.get_endpoint(endpoint, params)
+
+        with StringIO() as buffer:
+
+            self.data_source.get_endpoint(endpoint, params, buffer)
+
+            return buffer.getvalue()
+
+
+class AsyncCoalescingDataSource(IAsyncDataSource):
+    """
+    Wraps an IAsyncDataSource object so that concurrent coroutines fetching
+    the same endpoint and params share one request. A caller that is
+    cancelled does not cancel the fetch for the others.
+
+    :param data_source: The IAsyncDataSource object to fetch with.
+    """
+
+    def __init__(self, data_source: IAsyncDataSource) -> None:
+
+        self.data_source = data_source
+
+        self.__in_flight = {}
+
+    async def get_endpoint(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]] = None,
+            file: IOBase = None) -> bytes | None:
+        """
+        Fetches data from the given endpoint, sharing a fetch of the same
+        endpoint already in progress.
+
+        :param endpoint: A string path to the endpoint to retrieve data for.
+
+        :param params: A collection of query string values to include with the
+            endpoint.
+
+        :param file: An IOBase object for capturing larger data files or
+            streams.
+
+        :returns: The retrieved content. If the file param is specified, no
+            value is returned.
+        """
+
+        key = _get_fetch_key(endpoint, params, file)
+
+        task = self.__in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(endpoint, params, file is not None))
+            self.__in_flight[key] = task
+
+            task.add_done_callback(lambda _: self.__in_flight.pop(key, None))
+
+        try:
+            content = await asyncio.shield(task)
+
+        except Exception as error:
+            raise _copy_error(error) from error
+
+        if file is None:
+            return content
+
+        file.write(content)
+
+        return None
+
+    async def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+        """
+        Posts data to the wrapped data source, posts are never shared.
+        """
+
+        return await self.data_source.post_endpoint(endpoint, params)
+
+    async def _fetch(self, endpoint: str, params: list[tuple[str, str | None]] | None, to_file: bool) -> bytes | str:
+        """
+        Fetches the content of an endpoint as the data source returns it, or
+        as the text it writes when fetching to a file.
+        """
+
+        if not to_file:
+            return await self.data_source.get_endpoint(endpoint, params)
+
+        with StringIO() as buffer:
+
+            await self.data_source.get_endpoint(endpoint, params, buffer)
+
+            return buffer.getvalue()
@@ -9,23 +9,42 @@ LICENSE file in the root directory of this source tree.
 If LICENSE file is not included, please visit :
     https://github.com/gkunde/py_opendns
 """
-from csv import DictReader
+import csv
+import time
+from contextlib import closing
 from datetime import date, datetime
 from io import StringIO
-from typing import Any, Generator
+from typing import Any, Generator, Iterable
 
 from .interfaces.i_data_source import IDataSource
+from .interfaces.i_metrics import IMetrics
+from .interfaces.i_tracer import ITracer
 from .interfaces.i_report_data_repository import IReportDataRepository
-from .models import (DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord,
-                     UniqueIpAddressRecord)
+from .metrics import PAGE_PARSE_SECONDS, REPORT_PAGES, REPORT_ROWS, REPORTS
+from .models import (DomainActivityColumns, DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord,
+                     TotalUniqueDomainsRecord, UniqueIpAddressRecord)
+from .page_prefetcher import PagePrefetcher
+from .report_schemas import (COMPACT_REPORT_SCHEMAS, REPORT_SCHEMAS, DomainActivityColumnsSchema, ReportSchema,
+                             RowFilter, parse_report_period)
+from .tracing import iter_in_span, start_trace, trace, use_span
 
 
-class ReportDataRepository(IReportDataRepository):
+class ReportDataRepositoryBase:
     """
-    Provides methods for retrieving and normalizing reporting data provided
-    by an object implementing the IDataSource interface.
+    Provides the report naming, paging and record decoding shared by the
+    blocking and asyncio report data repositories.
 
-    :param data_source: An IDataSource object.
+    :param data_source: The data source object reports are retrieved from.
+
+    :param compact: If True, Domain report records are provided as
+        CompactDomainActivityRecord objects.
+
+    :param metrics: An IMetrics object to record the reports, pages and rows
+        read, and the time parsing each page, with. If not provided, nothing
+        is recorded.
+
+    :param tracer: An ITracer object to record spans of each report, page
+        and page parse with. If not provided, nothing is traced.
     """
 
     MAX_PAGES = 1000000
@@ -36,10 +55,18 @@ class ReportDataRepository(IReportDataRepository):
     RPT_REQUESTS = "totalrequests"
     RPT_UNQDOMAIN = "uniquedomains"
 
-    def __init__(self, data_source: IDataSource) -> None:
+    def __init__(
+            self,
+            data_source: Any,
+            compact: bool = False,
+            metrics: IMetrics = None,
+            tracer: ITracer = None) -> None:
 
         self.data_source = data_source
 
+        self._metrics = metrics
+        self._tracer = tracer
+
         self._max_pages = self.MAX_PAGES
 
         self._report_domain = self.RPT_DOMAIN
@@ -54,10 +81,321 @@ class ReportDataRepository(IReportDataRepository):
 
         self._multipage_report_types = (self._report_domain)
 
+        self._schemas = COMPACT_REPORT_SCHEMAS if compact else REPORT_SCHEMAS
+
+        # report type -> the page size learned from pages followed by more
+        self._page_sizes = {}
+
+    def _read_page(
+            self,
+            lines: Iterable[str],
+            report_type: str,
+            reportdate: date,
+            schema: ReportSchema = None,
+            row_filter: RowFilter = None,
+            limit: int = None) -> Generator[Any, None, tuple[int, bool]]:
+        """
+        Decodes the records of a report page. The header row is resolved
+        once, then every row is decoded by position.
+
+        :param lines: An iterable of the page's lines of CSV text.
+
+        :param report_type: A string to identify the report.
+
+        :param reportdate: A date object that represents the reporting period
+            start.
+
+        :param schema: A ReportSchema object to decode rows with, instead of
+            the report type's registered schema.
+
+        :param row_filter: A RowFilter object selecting the rows to decode.
+
+        :param limit: An integer value of the last rank to read. Rows ranked
+            beyond it end the page.
+
+        :returns: A Generator object providing record objects. Once
+            exhausted, it returns a tuple of the number of rows read, filtered
+            rows included, and a bool that is True if the limit was reached.
+        """
+
+        page_reader = self._decode_page(lines, report_type, reportdate, schema, row_filter, limit)
+
+        if self._metrics is None:
+            return (yield from page_reader)
+
+        # CPU time of this thread, so time waiting on the network for lines
+        # and time spent by the consumer between records are left out
+        parse_seconds = 0.0
+
+        while True:
+
+            start = time.thread_time()
+            try:
+                record = next(page_reader)
+
+            except StopIteration as stop:
+                row_count, is_limit_reached = stop.value
+                break
+
+            finally:
+                parse_seconds += time.thread_time() - start
+
+            yield record
+
+        labels = {"report_type": report_type}
+
+        self._metrics.increment(REPORT_PAGES, 1, labels)
+        self._metrics.increment(REPORT_ROWS, row_count, labels)
+        self._metrics.observe(PAGE_PARSE_SECONDS, parse_seconds, labels)
+
+        return row_count, is_limit_reached
+
+    def _record_report(self, report_type: str) -> None:
+        """
+        Records a report read to its last page.
+
+        :param report_type: A string to identify the report.
+        """
+
+        if self._metrics is not None:
+            self._metrics.increment(REPORTS, 1, {"report_type": report_type})
+
+    def _decode_page(
+            self,
+            lines: Iterable[str],
+            report_type: str,
+            reportdate: date,
+            schema: ReportSchema = None,
+            row_filter: RowFilter = None,
+            limit: int = None) -> Generator[Any, None, tuple[int, bool]]:
+        """
+        Decodes the records of a report page, without recording metrics.
+        Parameters and the result are as for _read_page.
+        """
+
+        reader = csv.reader(lines)
+
+        header = next(reader, None)
+        if header is None:
+            return 0, False
+
+        if schema is None:
+            schema = self._schemas[report_type]
+
+        decode = schema.compile(header, reportdate)
+
+        # short rows are padded with None, as csv.DictReader does
+        width = len(header)
+
+        row_count = 0
+
+        if row_filter is None and limit is None:
+
+            for row in reader:
+
+                # blank lines are skipped, as csv.DictReader does
+                if row:
+
+                    if len(row) < width:
+                        row += [None] * (width - len(row))
+
+                    row_count += 1
+                    yield decode(row)
+
+            return row_count, False
+
+        is_included = row_filter.compile(header) if row_filter is not None else None
+        rank_index = schema.get_index(header, "Rank") if limit is not None else None
+
+        for row in reader:
+
+            if not row:
+                continue
+
+            if len(row) < width:
+                row += [None] * (width - len(row))
+
+            row_count += 1
+
+            rank = int(row[rank_index]) if rank_index is not None else None
+
+            if rank is not None and rank > limit:
+                return row_count, True
+
+            if is_included is None or is_included(row):
+                yield decode(row)
+
+            if rank is not None and rank == limit:
+                return row_count, True
+
+        return row_count, False
+
+    def _read_page_records(
+            self,
+            lines: Iterable[str],
+            report_type: str,
+            reportdate: date,
+            schema: ReportSchema = None,
+            row_filter: RowFilter = None,
+            limit: int = None) -> tuple[list[Any], int, bool]:
+        """
+        Decodes all records of a report page. Parameters are as for
+        _read_page.
+
+        :returns: A tuple of the record objects, the number of rows read and
+            a bool that is True if the limit was reached.
+        """
+
+        records = []
+
+        page_reader = self._read_page(lines, report_type, reportdate, schema, row_filter, limit)
+
+        while True:
+            try:
+                records.append(next(page_reader))
+
+            except StopIteration as stop:
+                return (records, *stop.value, )
+
+    def _get_report_pages(self, report_type: str) -> range:
+        """
+        Returns the page numbers that may be requested for a report type.
+
+        :param report_type: A string to identify the report.
+        """
+
+        max_pages = self._max_pages if report_type in self._multipage_report_types else 1
+        # adjust for off-by-one (using cardinal counting)
+        max_pages += 1
+
+        return range(1, max_pages)
+
+    def _get_report_path(
+            self,
+            report_type: str,
+            network_refid: str,
+            reportdate_start: date,
+            reportdate_end: date,
+            page: int) -> str:
+        """
+        Builds the endpoint path for a page of a report.
+
+        :param report_type: A string to identify the report.
+
+        :param network_refid: A string to identify a network.
+
+        :param reportdate_start: A date object that represents the reporting
+            period start.
+
+        :param reportdate_end: A date object that represents the reporting
+            period end. If None or matches reportdate_start, this value is
+            ignored.
+
+        :param page: An integer page number, starting at 1.
+        """
+
+        report_range = reportdate_start.isoformat()
+        if reportdate_end is not None and reportdate_end != reportdate_start:
+            report_range = f"{report_range}to{reportdate_end.isoformat()}"
+
+        page_segment = f"/page{page}"
+        if page == 1:
+            page_segment = ""
+
+        return f"/stats/{network_refid}/{report_type}/{report_range}{page_segment}.csv"
+
+    def _is_final_page(self, report_type: str, record_count: int) -> bool:
+        """
+        Determines if a page is the last page of a report. Every page but the
+        last is full, so a page shorter than the longest page that was
+        followed by another is final. Otherwise, a page of 2 or fewer records
+        is final.
+
+        :param report_type: A string to identify the report.
+
+        :param record_count: The number of records read from the page.
+        """
+
+        page_size = self._page_sizes.get(report_type, 0)
+
+        if record_count < page_size or record_count <= 2:
+            return True
+
+        # more pages follow, so this page is full
+        if record_count > page_size:
+            self._page_sizes[report_type] = record_count
+
+        return False
+
+    def _get_span_attributes(
+            self,
+            report_type: str,
+            network_refid: str,
+            reportdate_start: date,
+            reportdate_end: date) -> dict[str, Any]:
+        """
+        Returns the attributes describing a report in its spans.
+        """
+
+        return {
+            "network_refid": network_refid,
+            "report_type": report_type,
+            "reportdate_start": reportdate_start,
+            "reportdate_end": reportdate_end,
+        }
+
+    def _parse_reportperiod(self, report_period: str) -> datetime:
+        """
+        A datetime object normalizing method.
+
+        :param report_period: A string representation of a date object.
+        """
+
+        return parse_report_period(report_period)
+
+
+class ReportDataRepository(ReportDataRepositoryBase, IReportDataRepository):
+    """
+    Provides methods for retrieving and normalizing reporting data provided
+    by an object implementing the IDataSource interface.
+
+    :param data_source: An IDataSource object.
+
+    :param compact: If True, Domain report records are provided as
+        CompactDomainActivityRecord objects, using far less memory.
+
+    :param prefetch_pages: An integer value of the pages of a multipage
+        report to fetch on a background thread ahead of the page being
+        read. When 0, pages are fetched as they are needed.
+
+    :param metrics: An IMetrics object to record the reports, pages and rows
+        read, and the time parsing each page, with. If not provided, nothing
+        is recorded.
+
+    :param tracer: An ITracer object to record spans of each report, page
+        and page parse with. If not provided, nothing is traced.
+    """
+
+    def __init__(
+            self,
+            data_source: IDataSource,
+            compact: bool = False,
+            prefetch_pages: int = 0,
+            metrics: IMetrics = None,
+            tracer: ITracer = None) -> None:
+
+        super().__init__(data_source, compact, metrics, tracer)
+
+        self.prefetch_pages = prefetch_pages
+
+        self._domain_columns_schema = DomainActivityColumnsSchema()
+
     def get_domain_activity_records(
             self,
             network_refid: str,
-            reportdate: date) -> Generator[DomainActivityRecord, None, None]:
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> Generator[DomainActivityRecord, None, None]:
         """
         Retrieves domain activity report records.
 
@@ -65,83 +403,47 @@ class ReportDataRepository(IReportDataRepository):
 
         :param reportdate: A date object that represents the reporting period.
 
+        :param limit: An integer value of the last rank to retrieve. No pages
+            are requested beyond the one holding this rank.
+
+        :param row_filter: A RowFilter object selecting the rows to provide,
+            tested before a record object is created.
+
         :returns: A Generator object providing DomainActivityRecord objects.
         """
 
-        for entry in self._get_report_records(self._report_domain, network_refid, reportdate, None):
-
-            record = DomainActivityRecord(
-                rank=int(entry["Rank"]),
-                report_period=datetime(reportdate.year, reportdate.month, reportdate.day),
-                hostname=entry["Domain"],
-                requests=int(entry["Total"]),
-                is_blocked_hostname=entry["Blacklisted"] != "0",
-                is_blocked_category=entry["Blocked by Category"] != "0",
-                is_blocked_botnet=entry["Blocked as Botnet"] != "0",
-                is_blocked_malware=entry["Blocked as Malware"] != "0",
-                is_blocked_phishing=entry["Blocked as Phishing"] != "0",
-                is_smartcache_resolved=entry["Resolved by SmartCache"] != "0",
-                is_academic_fraud=entry["Academic Fraud"] != "0",
-                is_adult_themes=entry["Adult Themes"] != "0",
-                is_advertisements=entry["Advertisements"] != "0",
-                is_adware=entry["Adware"] != "0",
-                is_alcohol=entry["Alcohol"] != "0",
-                is_anime_manga_webcomic=entry["Anime/Manga/Webcomic"] != "0",
-                is_auctions=entry["Auctions"] != "0",
-                is_automotive=entry["Automotive"] != "0",
-                is_blogs=entry["Blogs"] != "0",
-                is_business_services=entry["Business Services"] != "0",
-                is_chat=entry["Chat"] != "0",
-                is_classifieds=entry["Classifieds"] != "0",
-                is_dating=entry["Dating"] != "0",
-                is_drugs=entry["Drugs"] != "0",
-                is_ecommerce_shopping=entry["Ecommerce/Shopping"] != "0",
-                is_educational_institutions=entry["Educational Institutions"] != "0",
-                is_file_storage=entry["File Storage"] != "0",
-                is_financial_institutions=entry["Financial Institutions"] != "0",
-                is_forums_message_boards=entry["Forums/Message boards"] != "0",
-                is_gambling=entry["Gambling"] != "0",
-                is_games=entry["Games"] != "0",
-                is_german_youth_protection=entry["German Youth Protection"] != "0",
-                is_government=entry["Government"] != "0",
-                is_hate_discrimination=entry["Hate/Discrimination"] != "0",
-                is_health_and_fitness=entry["Health and Fitness"] != "0",
-                is_humor=entry["Humor"] != "0",
-                is_instant_messaging=entry["Instant Messaging"] != "0",
-                is_jobs_employment=entry["Jobs/Employment"] != "0",
-                is_lingerie_bikini=entry["Lingerie/Bikini"] != "0",
-                is_movies=entry["Movies"] != "0",
-                is_music=entry["Music"] != "0",
-                is_news_media=entry["News/Media"] != "0",
-                is_non_profits=entry["Non-Profits"] != "0",
-                is_nudity=entry["Nudity"] != "0",
-                is_p2p_file_sharing=entry["P2P/File sharing"] != "0",
-                is_parked_domains=entry["Parked Domains"] != "0",
-                is_photo_sharing=entry["Photo Sharing"] != "0",
-                is_podcasts=entry["Podcasts"] != "0",
-                is_politics=entry["Politics"] != "0",
-                is_pornography=entry["Pornography"] != "0",
-                is_portals=entry["Portals"] != "0",
-                is_proxy_anonymizer=entry["Proxy/Anonymizer"] != "0",
-                is_radio=entry["Radio"] != "0",
-                is_religious=entry["Religious"] != "0",
-                is_research_reference=entry["Research/Reference"] != "0",
-                is_search_engines=entry["Search Engines"] != "0",
-                is_sexuality=entry["Sexuality"] != "0",
-                is_social_networking=entry["Social Networking"] != "0",
-                is_software_technology=entry["Software/Technology"] != "0",
-                is_sports=entry["Sports"] != "0",
-                is_tasteless=entry["Tasteless"] != "0",
-                is_television=entry["Television"] != "0",
-                is_tobacco=entry["Tobacco"] != "0",
-                is_travel=entry["Travel"] != "0",
-                is_video_sharing=entry["Video Sharing"] != "0",
-                is_visual_search_engines=entry["Visual Search Engines"] != "0",
-                is_weapons=entry["Weapons"] != "0",
-                is_web_spam=entry["Web Spam"] != "0",
-                is_webmail=entry["Webmail"] != "0")
+        yield from self.get_report_records(
+            self._report_domain, network_refid, reportdate, None, row_filter=row_filter, limit=limit)
 
-            yield record
+    def get_domain_activity_columns(
+            self,
+            network_refid: str,
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> DomainActivityColumns:
+        """
+        Retrieves the domain activity report as columns, without creating an
+        object per domain.
+
+        :param network_refid: A string to identify a network to capture records for.
+
+        :param reportdate: A date object that represents the reporting period.
+
+        :param limit: An integer value of the last rank to retrieve.
+
+        :param row_filter: A RowFilter object selecting the rows to provide.
+
+        :returns: A DomainActivityColumns object.
+        """
+
+        columns = DomainActivityColumns(datetime(reportdate.year, reportdate.month, reportdate.day))
+
+        append = columns.append
+        for row in self.get_report_records(
+                self._report_domain, network_refid, reportdate, None, self._domain_columns_schema, row_filter, limit):
+            append(*row)
+
+        return columns
 
     def get_request_types_records(
             self,
@@ -157,15 +459,7 @@ class ReportDataRepository(IReportDataRepository):
         :returns: A Generator object providing RequestTypesRecord objects.
         """
 
-        for entry in self._get_report_records(self._report_requesttypes, network_refid, reportdate, None):
-
-            record = RequestTypesRecord(
-                report_period=datetime(reportdate.year, reportdate.month, reportdate.day),
-                request_type=entry["Request Type"],
-                requests=int(entry["Requests"])
-            )
-
-            yield record
+        yield from self.get_report_records(self._report_requesttypes, network_refid, reportdate, None)
 
     def get_total_requests_records(
             self,
@@ -186,15 +480,7 @@ class ReportDataRepository(IReportDataRepository):
         :returns: A Generator object providing TotalRequestsRecord objects.
         """
 
-        for entry in self._get_report_records(self._report_requests, network_refid, reportdate_start, reportdate_end):
-
-            report_period = self._parse_reportperiod(entry["Date"])
-
-            record = TotalRequestsRecord(
-                report_period=report_period,
-                requests=int(entry["Requests"]))
-
-            yield record
+        yield from self.get_report_records(self._report_requests, network_refid, reportdate_start, reportdate_end)
 
     def get_total_unique_domains_records(
             self,
@@ -215,15 +501,7 @@ class ReportDataRepository(IReportDataRepository):
         :returns: A Generator object providing TotalUniqueDomainsRecord objects.
         """
 
-        for entry in self._get_report_records(self._report_unique_domains, network_refid, reportdate_start, reportdate_end):
-
-            report_period = self._parse_reportperiod(entry["Date"])
-
-            record = TotalUniqueDomainsRecord(
-                report_period=report_period,
-                unique_domains=int(entry["Requests"]))
-
-            yield record
+        yield from self.get_report_records(self._report_unique_domains, network_refid, reportdate_start, reportdate_end)
 
     def get_unique_ipaddress_records(
             self,
@@ -244,25 +522,20 @@ class ReportDataRepository(IReportDataRepository):
         :returns: A Generator object providing UniqueIpAddressRecord objects.
         """
 
-        for entry in self._get_report_records(self._report_ipaddress, network_refid, reportdate_start, reportdate_end):
+        yield from self.get_report_records(self._report_ipaddress, network_refid, reportdate_start, reportdate_end)
 
-            report_period = self._parse_reportperiod(entry["Date"])
-
-            record = UniqueIpAddressRecord(
-                report_period=report_period,
-                ip_addresses=int(entry["IP Addresses"]))
-
-            yield record
-
-    def _get_report_records(
+    def get_report_records(
             self,
             report_type: str,
             network_refid: str,
             reportdate_start: date,
-            reportdate_end: date) -> Generator[dict[str, Any], None, None]:
+            reportdate_end: date,
+            schema: ReportSchema = None,
+            row_filter: RowFilter = None,
+            limit: int = None) -> Generator[Any, None, None]:
         """
         Makes calls to the data_source object to retrieve data from service
-        provider.
+        provider. Records are decoded as the page is received.
 
         :param report_type: A string to identify when reporting data to
             retrieve.
@@ -276,54 +549,166 @@ class ReportDataRepository(IReportDataRepository):
         :param reportdate_end: A date object that represents the reporting
             period end. If None or matches reportdate_start, this value is
             ignored.
-        
-        :returns: A Generator object containing dictionary objects of string
-            keys for field names and objects for field values as provided by
-            csv.DictReader parsing.
+
+        :param schema: A ReportSchema object to decode rows with, instead of
+            the report type's registered schema.
+
+        :param row_filter: A RowFilter object selecting the rows to decode.
+
+        :param limit: An integer value of the last rank to retrieve, for
+            ranked reports.
+
+        :returns: A Generator object providing the record objects of the
+            report type.
         """
 
-        max_pages = self._max_pages if report_type in self._multipage_report_types else 1
-        # adjust for off-by-one (using cardinal counting)
-        max_pages += 1
+        pages = self._get_report_pages(report_type)
 
-        report_range = reportdate_start.isoformat()
-        if reportdate_end is not None and reportdate_end != reportdate_start:
-            report_range = f"{report_range}to{reportdate_end.isoformat()}"
+        attributes = self._get_span_attributes(report_type, network_refid, reportdate_start, reportdate_end)
 
-        for page in range(1, max_pages):
+        # spans held while records are yielded are given their parents, so
+        # the consumer's spans are not made children of them
+        with start_trace(self._tracer, "report", **attributes) as report_span:
 
-            page_segment = f"/page{page}"
-            if page == 1:
-                page_segment = ""
+            if self.prefetch_pages > 0 and len(pages) > 1:
+                yield from self._get_prefetched_report_records(
+                    report_type, network_refid, reportdate_start, reportdate_end, schema, pages, row_filter, limit,
+                    report_span)
 
-            opendns_path = f"/stats/{network_refid}/{report_type}/{report_range}{page_segment}.csv"
+                self._record_report(report_type)
+                return
 
-            has_data = False
-            record_count = 0
+            for page in pages:
 
-            with StringIO() as file:
+                with start_trace(self._tracer, "page", report_span, page=page, **attributes) as page_span:
 
-                self.data_source.get_endpoint(opendns_path, None, file)
+                    opendns_path = self._get_report_path(
+                        report_type, network_refid, reportdate_start, reportdate_end, page)
 
-                file.seek(0)
+                    with closing(self.data_source.iter_endpoint_lines(opendns_path, None)) as lines:
 
-                reader = DictReader(file)
+                        # lines are received as they are parsed, so this
+                        # includes the time receiving the page
+                        with start_trace(self._tracer, "parse", page_span, page=page, **attributes):
+                            row_count, is_limit_reached = yield from self._read_page(
+                                iter_in_span(self._tracer, page_span, lines),
+                                report_type, reportdate_start, schema, row_filter, limit)
 
-                for entry in reader:
+                if is_limit_reached or row_count == 0 or self._is_final_page(report_type, row_count):
+                    break
 
-                    has_data = True
-                    record_count += 1
+            self._record_report(report_type)
 
-                    yield entry
+    def get_report_page(
+            self,
+            report_type: str,
+            network_refid: str,
+            reportdate_start: date,
+            reportdate_end: date,
+            page: int,
+            schema: ReportSchema = None) -> tuple[list[Any], bool]:
+        """
+        Retrieves a single page of a report.
 
-            if not has_data or record_count <= 2:
-                break
+        :param page: An integer page number, starting at 1. Other parameters
+            are as for get_report_records.
 
-    def _parse_reportperiod(self, report_period: str) -> datetime:
+        :returns: A tuple of the page's record objects and a bool that is True
+            if this is the last page of the report.
         """
-        A datetime object normalizing method.
 
-        :param report_period: A string representation of a date object.
+        opendns_path = self._get_report_path(report_type, network_refid, reportdate_start, reportdate_end, page)
+
+        attributes = self._get_span_attributes(report_type, network_refid, reportdate_start, reportdate_end)
+
+        with trace(self._tracer, "page", page=page, **attributes):
+
+            with closing(self.data_source.iter_endpoint_lines(opendns_path, None)) as lines:
+
+                with trace(self._tracer, "parse", page=page, **attributes):
+                    records, row_count, _ = self._read_page_records(lines, report_type, reportdate_start, schema)
+
+        is_final_page = (
+            row_count == 0
+            or page >= self._get_report_pages(report_type)[-1]
+            or self._is_final_page(report_type, row_count))
+
+        if is_final_page:
+            self._record_report(report_type)
+
+        return records, is_final_page
+
+    def _get_prefetched_report_records(
+            self,
+            report_type: str,
+            network_refid: str,
+            reportdate_start: date,
+            reportdate_end: date,
+            schema: ReportSchema,
+            pages: range,
+            row_filter: RowFilter = None,
+            limit: int = None,
+            report_span: Any = None) -> Generator[Any, None, None]:
+        """
+        Retrieves a multipage report with a PagePrefetcher fetching the
+        following pages while the current one is read. Parameters are as
+        for get_report_records, report_span is the span of the report the
+        page spans are children of.
         """
 
-        return datetime.strptime(report_period.strip(), "%Y-%m-%d %H:%M:%S")
+        def fetch_page(page: int) -> str:
+
+            opendns_path = self._get_report_path(report_type, network_refid, reportdate_start, reportdate_end, page)
+
+            with StringIO() as file:
+
+                with use_span(self._tracer, report_span):
+                    self.data_source.get_endpoint(opendns_path, None, file)
+
+                return file.getvalue()
+
+        rank_schema = schema if schema is not None else self._schemas[report_type]
+
+        def is_final_page(content: str) -> bool:
+
+            # report values hold no line breaks, so rows are counted by line
+            # rather than parsing the page a second time
+            lines = content.splitlines()
+
+            row_count = 0
+            last_line = None
+            for line in lines[1:]:
+                if line:
+                    row_count += 1
+                    last_line = line
+
+            if row_count == 0:
+                return True
+
+            # no page is prefetched beyond the limit
+            if limit is not None:
+
+                header = next(csv.reader(lines[:1]))
+                last_row = next(csv.reader([last_line]))
+
+                if int(last_row[rank_schema.get_index(header, "Rank")]) >= limit:
+                    return True
+
+            return self._is_final_page(report_type, row_count)
+
+        attributes = self._get_span_attributes(report_type, network_refid, reportdate_start, reportdate_end)
+
+        with closing(PagePrefetcher(fetch_page, is_final_page, pages, self.prefetch_pages)) as prefetcher:
+
+            for page, content in zip(pages, prefetcher):
+
+                with start_trace(self._tracer, "page", report_span, page=page, **attributes) as page_span:
+
+                    with StringIO(content) as file:
+
+                        with start_trace(self._tracer, "parse", page_span, page=page, **attributes):
+                            _, is_limit_reached = yield from self._read_page(
+                                file, report_type, reportdate_start, schema, row_filter, limit)
+
+                if is_limit_reached:
+                    break
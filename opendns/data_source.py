@@ -9,16 +9,56 @@ LICENSE file in the root directory of this source tree.
 If LICENSE file is not included, please visit :
     https://github.com/gkunde/py_opendns
 """
+import os
+import random
+import re
+import threading
+import time
 from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
 from html.parser import HTMLParser
+from http.cookiejar import LWPCookieJar
 from io import IOBase
+from typing import Generator
 from urllib.parse import SplitResult, urlsplit
 
 import requests
 import requests.utils
+from requests.adapters import HTTPAdapter
 
+from .interfaces.i_async_rate_limiter import IAsyncRateLimiter
 from .interfaces.i_data_source import IDataSource
+from .interfaces.i_metrics import IMetrics
+from .interfaces.i_rate_limiter import IRateLimiter, Priority
+from .interfaces.i_tracer import ITracer
+from .metrics import (LOGIN_SECONDS, LOGINS, RATE_LIMIT_WAIT_SECONDS, REQUEST_RETRIES, REQUEST_SECONDS,
+                      RESPONSE_BYTES)
 from .rate_limiter import RateLimiter
+from .tracing import start_trace, trace, use_span
+
+# once set, requests are abandoned rather than sent, set with
+# request_cancel_event
+_current_cancel_event = ContextVar("opendns_request_cancel_event", default=None)
+
+
+@contextmanager
+def request_cancel_event(event: threading.Event) -> Generator[None, None, None]:
+    """
+    Abandons the requests made within the block, by the current thread or
+    asyncio task, once the event is set. The event is checked after each
+    wait for the rate limiter, before the request is sent.
+
+    :param event: A threading.Event object set when the requests are no
+        longer wanted.
+    """
+
+    token = _current_cancel_event.set(event)
+    try:
+        yield
+
+    finally:
+        _current_cancel_event.reset(token)
 
 
 class DataSource(IDataSource):
@@ -26,19 +66,74 @@ class DataSource(IDataSource):
     A DataSource class for connecting to OpenDNS and establishing a session
     with the service providers website.
 
+    A DataSource may be shared by several threads, such as the workers of a
+    ThreadPoolExecutor. Logging in is done by one thread while the others
+    wait for it, and each thread uses its own connection from the pool.
+
+    Requests failing with a 429 or 5xx response, or a connection error, are
+    retried with jittered backoff, each attempt within the rate limiter's
+    budget. Throttling responses are reported to the rate limiter, so a
+    RateLimiter or SharedRateLimiter with max_requests adapts its budget to
+    them. Once the body of a response is being read, a failure is raised
+    rather than retried.
+
     :param username: A string value of the account's username to
         authenticate with. This value should be the email address associated
         to the account.
 
     :param password: A string value of the account's password to authenticate
         with.
+
+    :param rate_limiter: An IRateLimiter object to throttle requests with. If
+        not provided, a RateLimiter allowing 19 requests every 120 seconds is
+        used. Provide a SharedRateLimiter to share the budget between
+        processes. Give either one max_requests to adapt the budget to the
+        service's responses.
+
+    :param cookie_file: A string path to a file for persisting the session
+        cookies. When provided, a previously saved session is reused instead
+        of logging in again. The file grants access to the account and is
+        created readable by the owner only.
+
+    :param pool_maxsize: An integer value of the connections kept open to
+        each host. Should be at least the number of threads sharing the
+        DataSource.
+
+    :param metrics: An IMetrics object to record request latency, bytes
+        received, logins and rate limiter waits with. If not provided,
+        nothing is recorded.
+
+    :param tracer: An ITracer object to record spans of requests,
+        connections and logins with. If not provided, nothing is traced.
+
+    :param max_retries: An integer value of the times a failed request is
+        retried before its error is raised.
     """
 
     # 1 MiB
     FILE_CHUNKSIZE = 1048576
 
+    # 16 KiB, small enough for the first lines to arrive within a round trip
+    LINE_CHUNKSIZE = 16384
+
     DEFAULT_ENCODING = "UTF-8"
 
+    POOL_MAXSIZE = 10
+
+    # the default rate limiter's budget
+    NUM_REQUESTS = 19
+    PERIOD = 120
+
+    MAX_RETRIES = 3
+
+    # seconds of backoff before the first retry, doubling for each retry after
+    RETRY_BACKOFF = 2.0
+    RETRY_BACKOFF_MAX = 120.0
+
+    # statuses worth retrying, and those of them asking for fewer requests
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    THROTTLE_STATUSES = (429, 503)
+
     _CLIENT_NAME = "dashboard-browser"
     _CLIENT_VERSION = "0.5.0"
 
@@ -51,9 +146,22 @@ class DataSource(IDataSource):
 
     _USER_AGENT_FIELD = "User-Agent"
 
-    def __init__(self, username: str, password: str) -> None:
+    # report paths are labelled by report type, not network, date and page
+    _STATS_PATH_PATTERN = re.compile(r"^/stats/[^/]+/(?P<report>[^/]+)/")
+
+    def __init__(
+            self,
+            username: str,
+            password: str,
+            rate_limiter: IRateLimiter = None,
+            cookie_file: str = None,
+            pool_maxsize: int = POOL_MAXSIZE,
+            metrics: IMetrics = None,
+            tracer: ITracer = None,
+            max_retries: int = MAX_RETRIES) -> None:
 
         self.chunk_size = self.FILE_CHUNKSIZE
+        self.line_chunk_size = self.LINE_CHUNKSIZE
 
         self.user_agent = self._get_user_agent()
 
@@ -64,21 +172,56 @@ class DataSource(IDataSource):
         self._login_url = self._LOGIN_URL
         self._logout_url = self._LOGOUT_URL
         self._root_url_split = urlsplit(self._ROOT_URL)
+        self._cookie_file = cookie_file
         self._username_field = self._USERNAME_FIELD
         self._password_field = self._PASSWORD_FIELD
+        self._retry_backoff = self.RETRY_BACKOFF
+        self._retry_backoff_max = self.RETRY_BACKOFF_MAX
+        self._sleep = time.sleep
+
+        self.max_retries = max_retries
 
-        self._rate_limiter = RateLimiter(
-            num_requests=19,
-            period=120)
+        self._rate_limiter = rate_limiter
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimiter(
+                num_requests=self.NUM_REQUESTS,
+                period=self.PERIOD)
+
+        self._metrics = metrics
+        self._tracer = tracer
 
         self.__is_connected = False
         self.__session = requests.Session()
 
+        # counts logins, so a thread can tell if the session it found expired
+        # has been replaced while it waited for the lock
+        self.__login_count = 0
+        self.__connect_lock = threading.Lock()
+
+        self.__session.headers.update(
+            {self._USER_AGENT_FIELD: self.user_agent})
+
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.__session.mount("https://", adapter)
+        self.__session.mount("http://", adapter)
+
+        if self._cookie_file is not None:
+            self.__is_connected = self._load_cookies()
+
+    @property
+    def is_connected(self) -> bool:
+        """
+        Indicates if the session has been authenticated with the provider.
+        """
+
+        return self.__is_connected
+
     def get_endpoint(
             self,
             endpoint: str,
             params: list[tuple[str, str | None]] = None,
-            file: IOBase = None) -> str | None:
+            file: IOBase = None,
+            priority: Priority = None) -> str | None:
         """
         Fetches data from the given endpoint. Data return will be return as-is
         per the website being connected to. Data may be represented as HTML,
@@ -92,25 +235,169 @@ class DataSource(IDataSource):
         :param file: An IOBase object for capturing larger data files or
             streams.
 
+        :param priority: The Priority of the request with the rate limiter.
+            If not provided, the priority set with request_priority is used.
+
         :returns: A string value containing the retrieved content. If the file
             param is specified, no value is returned.
         """
 
-        self._rate_limiter.check()
+        with trace(self._tracer, "get_endpoint", endpoint=endpoint):
+
+            response = self._send_request(endpoint, params, file is not None, priority)
+
+            return self.read_response(endpoint, response, file)
+
+    def iter_endpoint_lines(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]] = None,
+            priority: Priority = None) -> Generator[str, None, None]:
+        """
+        Fetches data from the given endpoint, providing each line of text as
+        soon as it has been received. Memory use is bounded by
+        line_chunk_size rather than the size of the content.
+
+        :param endpoint: A string path to the endpoint to retrieve data for.
+
+        :param params: A collection of query string values to include with the
+            endpoint.
+
+        :param priority: The Priority of the request with the rate limiter.
+            If not provided, the priority set with request_priority is used.
+
+        :returns: A Generator object providing lines of text, including their
+            line endings.
+        """
+
+        # the span is held while lines are yielded, so it is only the parent
+        # of the spans of sending the request
+        with start_trace(self._tracer, "iter_endpoint_lines", endpoint=endpoint) as span:
+
+            with use_span(self._tracer, span):
+                response = self._send_request(endpoint, params, True, priority)
+
+            with response:
+
+                pending = ""
+                for text_chunk in response.iter_content(chunk_size=self.line_chunk_size, decode_unicode=True):
+
+                    text = pending + text_chunk
+
+                    line_start = 0
+                    line_end = text.find("\n")
+                    while line_end >= 0:
+                        yield text[line_start:line_end + 1]
+
+                        line_start = line_end + 1
+                        line_end = text.find("\n", line_start)
+
+                    pending = text[line_start:]
+
+                if pending:
+                    yield pending
+
+                self._record_response_bytes(endpoint, response)
+
+    def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> str | None:
+        """
+        Allows data to be posted to given endpoint. Not currently implemented.
+        """
+
+        self._check_rate_limit()
+
+        return super().post_endpoint(endpoint, params)
+
+    def ensure_connected(self) -> None:
+        """
+        Authenticates the session if it is not connected. Only one thread
+        logs in, however many find the session is not connected.
+
+        :raises RuntimeError: If the site is reporting error messages or an
+            authentication token cannot be obtained.
+        """
+
+        if not self.__is_connected:
+            self._reconnect(self.__login_count)
+
+    def request_endpoint(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]],
+            stream: bool) -> requests.Response | None:
+        """
+        Sends a single GET request for an endpoint, without waiting for the
+        rate limiter or retrying. If the session has expired, logs in again
+        rather than sending the request again, so every request sent can be
+        counted by the caller's rate limiter.
+
+        :param endpoint: A string path to the endpoint to retrieve data for.
+
+        :param params: A collection of query string values to include with the
+            endpoint.
+
+        :param stream: If True, the response body is not read until accessed.
+
+        :returns: A requests.Response object with a successful status and its
+            encoding set, or None if the session had expired and the request
+            is to be sent again.
+
+        :raises requests.HTTPError: If the response has an error status.
+
+        :raises RuntimeError: If logging in fails.
+        """
 
         split_url = SplitResult(
             self._root_url_split.scheme, self._root_url_split.netloc, endpoint, None, None)
 
-        is_stream = (file is not None)
+        with self._make_connection(endpoint) as connection:
 
-        content = None
-        with self._make_connection() as connection:
-            
-            response = connection.get(split_url.geturl(), params=params, stream=is_stream)
+            login_count = self.__login_count
+
+            response = connection.get(split_url.geturl(), params=params, stream=stream)
+
+            if self._is_login_page(response):
+                response.close()
+
+                self._reconnect(login_count)
+
+                return None
+
+        if self._metrics is not None:
+            self._metrics.observe(
+                REQUEST_SECONDS, response.elapsed.total_seconds(), {"endpoint": self._get_endpoint_label(endpoint)})
 
+        try:
             response.raise_for_status()
 
-            response.encoding = self._determine_encoding(response.encoding)
+        except requests.HTTPError:
+            response.close()
+            raise
+
+        response.encoding = self._determine_encoding(response.encoding)
+
+        return response
+
+    def read_response(self, endpoint: str, response: requests.Response, file: IOBase = None) -> bytes | None:
+        """
+        Reads the body of a response from request_endpoint, then closes it.
+
+        :param endpoint: A string path to the endpoint the response is for.
+
+        :param response: A requests.Response object, streamed if file is
+            specified.
+
+        :param file: An IOBase object for capturing larger data files or
+            streams.
+
+        :returns: The retrieved content. If the file param is specified, no
+            value is returned.
+        """
+
+        is_stream = (file is not None)
+
+        content = None
+        with response:
 
             if not is_stream:
                 content = response.content
@@ -119,16 +406,193 @@ class DataSource(IDataSource):
                 for file_chunk in response.iter_content(chunk_size=self.chunk_size, decode_unicode=True):
                     file.write(file_chunk)
 
+            self._record_response_bytes(endpoint, response)
+
         return content
 
-    def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> str | None:
+    def get_retry_delay(
+            self,
+            endpoint: str,
+            error: requests.RequestException,
+            attempt: int,
+            rate_limiter: IRateLimiter | IAsyncRateLimiter) -> float | None:
         """
-        Allows data to be posted to given endpoint. Not currently implemented.
+        Determines if a request that failed from request_endpoint is
+        retried, reporting throttling responses to the rate limiter.
+
+        :param endpoint: A string path to the endpoint of the request.
+
+        :param error: The requests.RequestException the request failed with.
+
+        :param attempt: An integer value of the retries already made.
+
+        :param rate_limiter: The rate limiter the request was made within.
+
+        :returns: The number of seconds to wait before retrying, or None if
+            the error is to be raised.
         """
 
-        self._rate_limiter.check()
+        retry_after = None
 
-        return super().post_endpoint(endpoint, params)
+        if isinstance(error, requests.HTTPError):
+
+            status = error.response.status_code
+
+            retry_after = self._get_retry_after(error.response)
+            if status in self.THROTTLE_STATUSES or retry_after is not None:
+                rate_limiter.on_throttle(retry_after)
+
+            if status not in self.RETRY_STATUSES:
+                return None
+
+            reason = str(status)
+
+        elif isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            reason = "connection"
+
+        else:
+            return None
+
+        if attempt >= self.max_retries:
+            return None
+
+        if self._metrics is not None:
+            self._metrics.increment(
+                REQUEST_RETRIES, 1, {"endpoint": self._get_endpoint_label(endpoint), "reason": reason})
+
+        # jittered, so requests failing together are not retried together
+        backoff = min(self._retry_backoff * 2 ** attempt, self._retry_backoff_max)
+
+        return max(random.uniform(backoff / 2, backoff), retry_after or 0)
+
+    def _check_rate_limit(self, priority: Priority = None) -> None:
+        """
+        Waits for the rate limiter, recording the time waited.
+
+        :param priority: The Priority of the request with the rate limiter.
+        """
+
+        start = time.perf_counter()
+
+        self._rate_limiter.check(priority)
+
+        if self._metrics is not None:
+            self._metrics.observe(RATE_LIMIT_WAIT_SECONDS, time.perf_counter() - start)
+
+    def _send_request(
+            self,
+            endpoint: str,
+            params: list[tuple[str, str | None]],
+            stream: bool,
+            priority: Priority = None) -> requests.Response:
+        """
+        Sends a GET request for an endpoint within the rate limiter's budget,
+        retrying failures worth retrying.
+
+        :param endpoint: A string path to the endpoint to retrieve data for.
+
+        :param params: A collection of query string values to include with the
+            endpoint.
+
+        :param stream: If True, the response body is not read until accessed.
+
+        :param priority: The Priority of the request with the rate limiter.
+
+        :returns: A requests.Response object with a successful status.
+
+        :raises RuntimeError: If the request was cancelled with
+            request_cancel_event.
+        """
+
+        attempt = 0
+        is_session_renewed = False
+        while True:
+
+            self._check_rate_limit(priority)
+
+            # the caller may have stopped while waiting for the rate limiter
+            cancel_event = _current_cancel_event.get()
+            if cancel_event is not None and cancel_event.is_set():
+                raise RuntimeError("The request was cancelled.")
+
+            try:
+                response = self.request_endpoint(endpoint, params, stream)
+
+            except requests.RequestException as error:
+
+                delay = self.get_retry_delay(endpoint, error, attempt, self._rate_limiter)
+                if delay is None:
+                    raise
+
+                self._sleep(delay)
+                attempt += 1
+
+                continue
+
+            if response is None:
+                # the session had expired, it is sent again within the budget
+                if is_session_renewed:
+                    raise RuntimeError("Unable to login, the session was not accepted.")
+
+                is_session_renewed = True
+                continue
+
+            self._rate_limiter.on_success()
+
+            return response
+
+    def _get_retry_after(self, response: requests.Response) -> float | None:
+        """
+        Returns the seconds to wait given by a response's Retry-After header,
+        as seconds or a date, or None if there is none.
+
+        :param response: A requests.Response object.
+        """
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is None:
+            return None
+
+        try:
+            return max(float(retry_after), 0)
+
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+
+        except (TypeError, ValueError):
+            return None
+
+        return max(retry_at.timestamp() - time.time(), 0)
+
+    def _record_response_bytes(self, endpoint: str, response: requests.Response) -> None:
+        """
+        Records the bytes received for a response whose body has been read.
+
+        :param endpoint: A string path to the endpoint the response is for.
+
+        :param response: A requests.Response object.
+        """
+
+        if self._metrics is not None:
+            self._metrics.increment(
+                RESPONSE_BYTES, response.raw.tell(), {"endpoint": self._get_endpoint_label(endpoint)})
+
+    def _get_endpoint_label(self, endpoint: str) -> str:
+        """
+        Returns the label of an endpoint for metrics. Reports are labelled by
+        report type, so the number of series stays small.
+
+        :param endpoint: A string path to an endpoint.
+        """
+
+        match = self._STATS_PATH_PATTERN.match(endpoint)
+        if match is not None:
+            return f"/stats/{match.group('report')}"
+
+        return endpoint
 
     def _determine_encoding(self, response_encoding: str) -> str:
         """
@@ -144,61 +608,156 @@ class DataSource(IDataSource):
         return response_encoding if response_encoding else self.DEFAULT_ENCODING
 
     @contextmanager
-    def _make_connection(self) -> requests.Session:
+    def _make_connection(self, endpoint: str = None) -> requests.Session:
         """
         Manages the requests.Session object used to communicate with the
         provider.
 
+        :param endpoint: A string path to the endpoint the connection is
+            made for, recorded with the span of the connection.
+
         :raises RuntimeError: If the site is reporting error messages or an
             authentication token cannot be obtained.
         """
 
-        if not self.__is_connected:
+        with trace(self._tracer, "connection", endpoint=endpoint):
 
-            self.__session.headers.update(
-                {self._USER_AGENT_FIELD: self.user_agent})
+            self.ensure_connected()
 
-            response = self.__session.get(self._login_url)
-            response.raise_for_status()
+            yield self.__session
 
-            login_page = LoginPageParser()
-            login_page.feed(response.text)
+    def _reconnect(self, login_count: int) -> None:
+        """
+        Authenticates the session, unless another thread has done so since
+        the caller found it was not connected. Only one thread logs in at a
+        time.
 
-            if login_page.error_msg is not None:
-                raise RuntimeError(login_page.error_msg)
+        :param login_count: The number of logins made when the caller found
+            the session was not connected.
 
-            params = []
-            for field in login_page.fields:
+        :raises RuntimeError: If the site is reporting error messages or an
+            authentication token cannot be obtained.
+        """
 
-                if field[0] == self._username_field:
-                    params.append((field[0], self._username, ))
+        with self.__connect_lock:
 
-                elif field[0] == self._password_field:
-                    params.append((field[0], self._password, ))
+            if self.__login_count != login_count:
+                return
 
-                else:
-                    params.append(field)
+            self.__is_connected = False
 
-            if not params:
-                raise RuntimeError(
-                    "Service Unavailable. Check https://login.opendns.com for more information.")
+            with trace(self._tracer, "login"):
+                self._connect()
 
-            if login_page.form_method != "POST":
-                raise RuntimeError(
-                    "Unable to login, invalid submission method.")
+    def _connect(self) -> None:
+        """
+        Authenticates the requests.Session object with the provider.
 
-            response = self.__session.post(login_page.form_action, data=params)
-            response.raise_for_status()
+        :raises RuntimeError: If the site is reporting error messages or an
+            authentication token cannot be obtained.
+        """
+
+        login_start = time.perf_counter()
+
+        self.__session.cookies.clear()
+
+        response = self.__session.get(self._login_url)
+        response.raise_for_status()
+
+        login_page = LoginPageParser()
+        login_page.feed(response.text)
+
+        if login_page.error_msg is not None:
+            raise RuntimeError(login_page.error_msg)
+
+        params = []
+        for field in login_page.fields:
 
-            login_page = LoginPageParser()
-            login_page.feed(response.text)
+            if field[0] == self._username_field:
+                params.append((field[0], self._username, ))
+
+            elif field[0] == self._password_field:
+                params.append((field[0], self._password, ))
+
+            else:
+                params.append(field)
+
+        if not params:
+            raise RuntimeError(
+                "Service Unavailable. Check https://login.opendns.com for more information.")
+
+        if login_page.form_method != "POST":
+            raise RuntimeError(
+                "Unable to login, invalid submission method.")
+
+        response = self.__session.post(login_page.form_action, data=params)
+        response.raise_for_status()
+
+        login_page = LoginPageParser()
+        login_page.feed(response.text)
+
+        if login_page.error_msg is not None:
+            raise RuntimeError(login_page.error_msg)
+
+        self.__is_connected = True
+        self.__login_count += 1
+
+        if self._metrics is not None:
+            self._metrics.increment(LOGINS)
+            self._metrics.observe(LOGIN_SECONDS, time.perf_counter() - login_start)
+
+        if self._cookie_file is not None:
+            self._save_cookies()
+
+    def _is_login_page(self, response: requests.Response) -> bool:
+        """
+        Determines if a response was redirected to the login page, which
+        happens when the session is no longer valid.
+
+        :param response: A requests.Response object.
+        """
+
+        response_url_split = urlsplit(response.url)
+        login_url_split = urlsplit(self._login_url)
+
+        return (response_url_split.netloc == login_url_split.netloc
+                and response_url_split.path == login_url_split.path)
+
+    def _load_cookies(self) -> bool:
+        """
+        Loads session cookies saved by a previous instance.
+
+        :returns: True if any cookies were loaded.
+        """
+
+        cookie_jar = LWPCookieJar(self._cookie_file)
+
+        try:
+            cookie_jar.load(ignore_discard=True)
+
+        except (OSError, ValueError):
+            # missing or unreadable, a new session will be established
+            return False
+
+        self.__session.cookies.update(cookie_jar)
+
+        return len(self.__session.cookies) > 0
+
+    def _save_cookies(self) -> None:
+        """
+        Saves the session cookies so later instances can skip logging in.
+        """
 
-            if login_page.error_msg is not None:
-                raise RuntimeError(login_page.error_msg)
+        cookie_jar = LWPCookieJar(self._cookie_file)
+        for cookie in self.__session.cookies:
+            cookie_jar.set_cookie(cookie)
 
-            self.__is_connected = True
+        # make the file private to the owner before any cookies are written,
+        # including a file created earlier with looser permissions
+        os.close(os.open(self._cookie_file, os.O_WRONLY | os.O_CREAT, 0o600))
+        os.chmod(self._cookie_file, 0o600)
 
-        yield self.__session
+        cookie_jar.save(ignore_discard=True)
 
     def _get_user_agent(self) -> str:
         """
@@ -0,0 +1,286 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from enum import Enum
+from typing import Any, Generator, Iterable
+
+from .data_repository import ReportDataRepository
+from .interfaces.i_rate_limiter import IRateLimiter
+
+
+class Granularity(Enum):
+    """
+    The resolution of report data that is needed.
+    """
+
+    DAILY = "daily"
+    HOURLY = "hourly"
+
+
+@dataclass(frozen=True)
+class FetchNeed:
+    """
+    Reporting data needed for a network, of a report accepting date ranges.
+    """
+
+    report_type: str
+    network_refid: str
+    reportdate_start: date
+    reportdate_end: date = None
+    granularity: Granularity = Granularity.DAILY
+
+
+@dataclass(frozen=True)
+class FetchRequest:
+    """
+    A single range request of a report.
+    """
+
+    report_type: str
+    network_refid: str
+    reportdate_start: date
+    reportdate_end: date
+
+
+@dataclass
+class FetchPlan:
+    """
+    The range requests satisfying a set of FetchNeed objects, and the time
+    they are expected to take.
+    """
+
+    requests: list[FetchRequest] = field(default_factory=list)
+    eta: timedelta = timedelta(0)
+
+    @property
+    def request_count(self) -> int:
+        return len(self.requests)
+
+    def execute(
+            self,
+            report_data_repository: ReportDataRepository) -> Generator[tuple[FetchRequest, Any], None, None]:
+        """
+        Retrieves the planned requests in order.
+
+        :param report_data_repository: The ReportDataRepository object to
+            retrieve reports with.
+
+        :returns: A Generator object that returns tuples of the FetchRequest
+            and a record object.
+        """
+
+        for request in self.requests:
+
+            records = report_data_repository.get_report_records(
+                request.report_type, request.network_refid, request.reportdate_start, request.reportdate_end)
+
+            for record in records:
+                yield request, record
+
+
+class FetchPlanner:
+    """
+    Plans the fewest range requests that provide the reporting data needed.
+
+    Needs of the same report and network are merged where they overlap or
+    touch. Where hourly data is needed, ranges are split into windows short
+    enough for the service provider to return hourly data. Daily needs that
+    are already covered by those windows are dropped.
+
+    :param num_requests: An integer value for the maximum number of requests
+        of the rate budget.
+
+    :param period: An integer value of seconds for the rate budget's time
+        period.
+
+    :param rate_limiter: An IRateLimiter object the requests will be made
+        within. If provided, ETAs start from its current window and use its
+        current budget, rather than assuming an unused budget of
+        num_requests.
+    """
+
+    # the longest range, in days, the service provider returns hourly data for
+    HOURLY_MAX_DAYS = 7
+
+    RANGE_REPORT_TYPES = (
+        ReportDataRepository.RPT_REQUESTS,
+        ReportDataRepository.RPT_UNQDOMAIN,
+        ReportDataRepository.RPT_IPADDR,
+    )
+
+    def __init__(self, num_requests: int = 19, period: int = 120, rate_limiter: IRateLimiter = None) -> None:
+
+        self.num_requests = num_requests
+        self.period = period
+        self.rate_limiter = rate_limiter
+
+    def plan(self, needs: Iterable[FetchNeed]) -> FetchPlan:
+        """
+        Computes the range requests satisfying all needs.
+
+        :param needs: A collection of FetchNeed objects.
+
+        :raises ValueError: If a need is for a report not accepting date
+            ranges, or ends before it starts.
+
+        :returns: A FetchPlan object.
+        """
+
+        # (report_type, network_refid) -> granularity -> list of (start, end)
+        spans = {}
+
+        for need in needs:
+
+            if need.report_type not in self.RANGE_REPORT_TYPES:
+                raise ValueError(f"Report does not accept date ranges: {need.report_type}")
+
+            reportdate_end = need.reportdate_end if need.reportdate_end is not None else need.reportdate_start
+            if reportdate_end < need.reportdate_start:
+                raise ValueError(f"Report range ends before it starts: {need}")
+
+            key = (need.report_type, need.network_refid, )
+            spans.setdefault(key, {}).setdefault(need.granularity, []).append(
+                (need.reportdate_start, reportdate_end, ))
+
+        requests = []
+
+        for (report_type, network_refid), granularities in spans.items():
+
+            hourly_windows = self._get_hourly_windows(granularities.get(Granularity.HOURLY, []))
+
+            daily_spans = [
+                span for span in self._merge_spans(granularities.get(Granularity.DAILY, []))
+                if not self._is_covered(span, hourly_windows)]
+
+            for reportdate_start, reportdate_end in sorted(hourly_windows + daily_spans):
+                requests.append(FetchRequest(report_type, network_refid, reportdate_start, reportdate_end))
+
+        return FetchPlan(requests, self.get_eta(len(requests)))
+
+    def get_eta(self, request_count: int) -> timedelta:
+        """
+        Returns the time to make a number of requests under the rate budget.
+        Transfer time is not included.
+
+        Without a rate limiter the budget is assumed unused at the start.
+        With one, the requests left in its window are made first. The rest
+        wait until the oldest request leaves the window, then proceed a
+        budget per period.
+
+        :param request_count: An integer value of the requests to be made.
+        """
+
+        if request_count <= 0:
+            return timedelta(0)
+
+        if self.rate_limiter is None:
+            return timedelta(seconds=((request_count - 1) // self.num_requests) * self.period)
+
+        # the budget may have adapted since the rate limiter was created
+        num_requests = getattr(self.rate_limiter, "num_requests", self.num_requests)
+        period = getattr(self.rate_limiter, "period", self.period)
+
+        # zero unless the rate limiter is paused, or the window is spent
+        available = self.rate_limiter.time_until_available()
+
+        remaining = self.rate_limiter.remaining()
+        if request_count <= remaining:
+            return timedelta(seconds=available)
+
+        # an empty window is first refilled as the requests made now leave it
+        refill = self.rate_limiter.time_until_refill()
+        if refill <= 0:
+            refill = period
+
+        refill = max(refill, available)
+
+        return timedelta(seconds=refill + ((request_count - remaining - 1) // num_requests) * period)
+
+    def _merge_spans(self, spans: list[tuple[date, date]]) -> list[tuple[date, date]]:
+        """
+        Merges date spans that overlap or touch.
+
+        :param spans: A collection of tuples of start and end dates.
+
+        :returns: A sorted list of tuples of start and end dates.
+        """
+
+        merged = []
+
+        for reportdate_start, reportdate_end in sorted(spans):
+
+            if merged and reportdate_start <= merged[-1][1] + timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], reportdate_end), )
+                continue
+
+            merged.append((reportdate_start, reportdate_end, ))
+
+        return merged
+
+    def _get_hourly_windows(self, spans: list[tuple[date, date]]) -> list[tuple[date, date]]:
+        """
+        Covers date spans with the fewest windows short enough to return
+        hourly data. Each window starts at the earliest uncovered date, and
+        ends at the last needed date it can reach.
+
+        :param spans: A collection of tuples of start and end dates.
+
+        :returns: A sorted list of tuples of start and end dates.
+        """
+
+        window_length = timedelta(days=self.HOURLY_MAX_DAYS - 1)
+
+        windows = []
+
+        for span_start, span_end in self._merge_spans(spans):
+
+            window_start = span_start
+
+            # extend the previous window over the gap, if it can reach
+            if windows and windows[-1][0] + window_length >= window_start:
+                window_end = min(windows[-1][0] + window_length, span_end)
+                windows[-1] = (windows[-1][0], window_end, )
+                window_start = window_end + timedelta(days=1)
+
+            while window_start <= span_end:
+
+                window_end = min(window_start + window_length, span_end)
+                windows.append((window_start, window_end, ))
+                window_start = window_end + timedelta(days=1)
+
+        return windows
+
+    def _is_covered(self, span: tuple[date, date], windows: list[tuple[date, date]]) -> bool:
+        """
+        Determines if every date of a span falls within the windows.
+
+        :param span: A tuple of start and end dates.
+
+        :param windows: A sorted list of non-overlapping tuples of start and
+            end dates.
+        """
+
+        next_date = span[0]
+
+        for window_start, window_end in windows:
+
+            if window_start > next_date:
+                break
+
+            if window_end >= next_date:
+                next_date = window_end + timedelta(days=1)
+
+            if next_date > span[1]:
+                return True
+
+        return False
@@ -0,0 +1,40 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from abc import ABCMeta, abstractmethod
+from io import IOBase
+
+
+class IAsyncDataSource(metaclass=ABCMeta):
+    """
+    An interface class for creating an asyncio Data Source instance that
+    provides awaitable methods fetching information from a providers web site.
+    """
+
+    @abstractmethod
+    async def get_endpoint(self, endpoint: str, params: list[tuple[str, str| None]] = None, file: IOBase = None) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def post_endpoint(self, endpoint: str, params: list[tuple[str, str| None]] = None) -> None:
+        raise NotImplementedError()
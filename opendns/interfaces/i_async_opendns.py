@@ -0,0 +1,122 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from abc import ABCMeta, abstractmethod
+from datetime import date
+from typing import AsyncGenerator
+
+from ..models import (DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord,
+                      TotalUniqueDomainsRecord, UniqueIpAddressRecord)
+from ..report_schemas import RowFilter
+
+
+class IAsyncOpenDns(metaclass=ABCMeta):
+    """
+    An interface class for creating an AsyncOpenDns instance that provides asyncio
+    methods fetching information from OpenDNS's website.
+    """
+
+    @abstractmethod
+    def get_domain_activity_report(
+            self,
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> AsyncGenerator[DomainActivityRecord, None]:
+        """
+        Retrieve the Domain Activity report.
+
+        :param reportdate: A date object that represents the reporting period.
+
+        :param limit: An integer value of the last rank to retrieve.
+
+        :param row_filter: A RowFilter object selecting the rows to provide.
+
+        :returns: An asynchronous generator object containing the report
+            records.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_request_types_report(
+            self,
+            reportdate: date) -> AsyncGenerator[RequestTypesRecord, None]:
+        """
+        Retrieve the Request Types report.
+
+        :param reportdate: A date object that represents the reporting period.
+
+        :returns: An asynchronous generator object containing the report
+            records.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_total_requests_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[TotalRequestsRecord, None]:
+        """
+        Retrieve the Total Requests report.
+
+        :param reportdate_start: A date object that represents the reporting period start.
+
+        :param reoirtdate_end: A date object that represents the reporting period end.
+
+        :returns: An asynchronous generator object containing the report
+            records.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_total_unique_domains_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[TotalUniqueDomainsRecord, None]:
+        """
+        Retrieve the Total Unique Domains report.
+
+        :param reportdate_start: A date object that represents the reporting period start.
+
+        :param reoirtdate_end: A date object that represents the reporting period end.
+
+        :returns: An asynchronous generator object containing the report
+            records.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_unique_ipaddress_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> AsyncGenerator[UniqueIpAddressRecord, None]:
+        """
+        Retrieve the Unique IP Address report.
+
+        :param reportdate_start: A date object that represents the reporting period start.
+
+        :param reoirtdate_end: A date object that represents the reporting period end.
+
+        :returns: An asynchronous generator object containing the report
+            records.
+        """
+        raise NotImplementedError()
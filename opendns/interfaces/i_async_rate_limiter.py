@@ -0,0 +1,93 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from abc import ABCMeta
+
+from .i_rate_limiter import Priority
+
+
+class IAsyncRateLimiter(metaclass=ABCMeta):
+    """
+    An interface class for creating an asyncio Rate Limiter class for
+    preventing abuse of the service provider's website.
+    """
+
+    async def check(self, priority: Priority = None) -> None:
+        """
+        Determines if delay is required by the caller. Will suspend the
+        calling coroutine until the limit period as expired.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+        """
+        raise NotImplementedError()
+
+    def try_acquire(self, priority: Priority = None) -> bool:
+        """
+        Takes a request from the budget if one is free now, without waiting.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+
+        :returns: True if the request may be made.
+        """
+        raise NotImplementedError()
+
+    def time_until_available(self, priority: Priority = None) -> float:
+        """
+        Returns the number of seconds until a request of the priority may be
+        made, zero if one may be made now. No request is taken.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+        """
+        raise NotImplementedError()
+
+    def remaining(self) -> int:
+        """
+        Returns the number of requests left in the current window.
+        """
+        raise NotImplementedError()
+
+    def time_until_refill(self) -> float:
+        """
+        Returns the number of seconds until the oldest request in the window
+        leaves it, freeing another request, zero if the window is empty.
+        """
+        raise NotImplementedError()
+
+    def on_success(self) -> None:
+        """
+        Tells the rate limiter a request succeeded. Rate limiters that do
+        not adapt to the responses ignore it.
+        """
+
+    def on_throttle(self, retry_after: float = None) -> None:
+        """
+        Tells the rate limiter the service asked for fewer requests, with a
+        429 or 503 response or a Retry-After header. Rate limiters that do
+        not adapt to the responses ignore it.
+
+        :param retry_after: A float value of the seconds the service asked
+            to wait, if it said.
+        """
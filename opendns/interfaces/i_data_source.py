@@ -22,7 +22,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from abc import ABCMeta, abstractmethod
-from io import IOBase
+from io import IOBase, StringIO
+from typing import Generator
 
 
 class IDataSource(metaclass=ABCMeta):
@@ -38,3 +39,17 @@ class IDataSource(metaclass=ABCMeta):
     @abstractmethod
     def post_endpoint(self, endpoint: str, params: list[tuple[str, str| None]] = None) -> None:
         raise NotImplementedError()
+
+    def iter_endpoint_lines(self, endpoint: str, params: list[tuple[str, str| None]] = None) -> Generator[str, None, None]:
+        """
+        Fetches data from the given endpoint, providing it line by line.
+        Implementations able to stream the content should override this, by
+        default the whole content is retrieved with get_endpoint first.
+        """
+        with StringIO() as file:
+
+            self.get_endpoint(endpoint, params, file)
+
+            file.seek(0)
+
+            yield from file
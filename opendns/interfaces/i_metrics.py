@@ -0,0 +1,59 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from abc import ABCMeta, abstractmethod
+
+
+class IMetrics(metaclass=ABCMeta):
+    """
+    An interface class for recording measurements of requests, logins, rate
+    limiting and report parsing.
+    """
+
+    @abstractmethod
+    def increment(self, name: str, value: float = 1, labels: dict[str, str] = None) -> None:
+        """
+        Adds to a counter.
+
+        :param name: A string name of the metric.
+
+        :param value: The amount to add.
+
+        :param labels: A dict of label names and values identifying the
+            series.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def observe(self, name: str, value: float, labels: dict[str, str] = None) -> None:
+        """
+        Records an observation in a histogram.
+
+        :param name: A string name of the metric.
+
+        :param value: The value observed, such as a duration in seconds.
+
+        :param labels: A dict of label names and values identifying the
+            series.
+        """
+        raise NotImplementedError()
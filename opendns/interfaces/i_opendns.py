@@ -25,8 +25,9 @@ from abc import ABCMeta, abstractmethod
 from datetime import date
 from typing import Generator
 
-from ..models import (DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord,
+from ..models import (DomainActivityColumns, DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord,
                       TotalUniqueDomainsRecord, UniqueIpAddressRecord)
+from ..report_schemas import RowFilter
 
 
 class IOpenDns(metaclass=ABCMeta):
@@ -38,16 +39,41 @@ class IOpenDns(metaclass=ABCMeta):
     @abstractmethod
     def get_domain_activity_report(
             self,
-            reportdate: date) -> Generator[DomainActivityRecord, None, None]:
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> Generator[DomainActivityRecord, None, None]:
         """
         Retrieve the Domain Activity report.
 
         :param reportdate: A date object that represents the reporting period.
 
+        :param limit: An integer value of the last rank to retrieve.
+
+        :param row_filter: A RowFilter object selecting the rows to provide.
+
         :returns: A generator object containing the report records.
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_domain_activity_report_columns(
+            self,
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> DomainActivityColumns:
+        """
+        Retrieve the Domain Activity report as columns.
+
+        :param reportdate: A date object that represents the reporting period.
+
+        :param limit: An integer value of the last rank to retrieve.
+
+        :param row_filter: A RowFilter object selecting the rows to provide.
+
+        :returns: A DomainActivityColumns object.
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def get_request_types_report(
             self,
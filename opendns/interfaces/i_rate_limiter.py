@@ -22,6 +22,17 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from abc import ABCMeta
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """
+    The priority classes of requests. Lower values are served first.
+    """
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
 
 
 class IRateLimiter(metaclass=ABCMeta):
@@ -30,9 +41,62 @@ class IRateLimiter(metaclass=ABCMeta):
     of the service provider's website.    
     """
 
-    def check(self) -> None:
+    def check(self, priority: Priority = None) -> None:
         """
         Determines if delay is required by the caller. Will pause execution
         until the limit period as expired.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+        """
+        raise NotImplementedError()
+
+    def try_acquire(self, priority: Priority = None) -> bool:
+        """
+        Takes a request from the budget if one is free now, without waiting.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+
+        :returns: True if the request may be made.
+        """
+        raise NotImplementedError()
+
+    def time_until_available(self, priority: Priority = None) -> float:
+        """
+        Returns the number of seconds until a request of the priority may be
+        made, zero if one may be made now. No request is taken.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+        """
+        raise NotImplementedError()
+
+    def remaining(self) -> int:
+        """
+        Returns the number of requests left in the current window.
+        """
+        raise NotImplementedError()
+
+    def time_until_refill(self) -> float:
+        """
+        Returns the number of seconds until the oldest request in the window
+        leaves it, freeing another request, zero if the window is empty.
+        """
+        raise NotImplementedError()
+
+    def on_success(self) -> None:
+        """
+        Tells the rate limiter a request succeeded. Rate limiters that do
+        not adapt to the responses ignore it.
+        """
+
+    def on_throttle(self, retry_after: float = None) -> None:
+        """
+        Tells the rate limiter the service asked for fewer requests, with a
+        429 or 503 response or a Retry-After header. Rate limiters that do
+        not adapt to the responses ignore it.
+
+        :param retry_after: A float value of the seconds the service asked
+            to wait, if it said.
         """
-        raise NotImplementedError()
\ No newline at end of file
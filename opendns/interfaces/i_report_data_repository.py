@@ -25,8 +25,9 @@ from abc import ABCMeta, abstractmethod
 from datetime import date
 from typing import Generator
 
-from ..models import (DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord,
-                      UniqueIpAddressRecord)
+from ..models import (DomainActivityColumns, DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord,
+                      TotalUniqueDomainsRecord, UniqueIpAddressRecord)
+from ..report_schemas import RowFilter
 
 
 class IReportDataRepository(metaclass=ABCMeta):
@@ -39,7 +40,9 @@ class IReportDataRepository(metaclass=ABCMeta):
     def get_domain_activity_records(
             self,
             network_refid: str,
-            reportdate: date) -> Generator[DomainActivityRecord, None, None]:
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> Generator[DomainActivityRecord, None, None]:
         """
         Retrieves domain activity report records.
 
@@ -48,10 +51,37 @@ class IReportDataRepository(metaclass=ABCMeta):
 
         :param reportdate: A date object that represents the reporting period.
 
+        :param limit: An integer value of the last rank to retrieve.
+
+        :param row_filter: A RowFilter object selecting the rows to provide.
+
         :returns: A Generator object providing DomainActivityRecord objects.
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_domain_activity_columns(
+            self,
+            network_refid: str,
+            reportdate: date,
+            limit: int = None,
+            row_filter: RowFilter = None) -> DomainActivityColumns:
+        """
+        Retrieves the domain activity report as columns.
+
+        :param network_refid: A string to identify a network to capture
+            records for.
+
+        :param reportdate: A date object that represents the reporting period.
+
+        :param limit: An integer value of the last rank to retrieve.
+
+        :param row_filter: A RowFilter object selecting the rows to provide.
+
+        :returns: A DomainActivityColumns object.
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def get_request_types_records(
             self,
@@ -0,0 +1,73 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from abc import ABCMeta, abstractmethod
+from typing import Any, ContextManager
+
+
+class ITracer(metaclass=ABCMeta):
+    """
+    An interface class for recording timed spans of the work done fetching
+    and parsing reports.
+    """
+
+    @abstractmethod
+    def span(self, name: str, **attributes: Any) -> ContextManager[Any]:
+        """
+        Times the block within, as a child of the span the block is nested
+        in.
+
+        :param name: A string name of the span.
+
+        :param attributes: Values describing the work, such as the network,
+            report type and page.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def start_span(self, name: str, parent: Any = None, **attributes: Any) -> ContextManager[Any]:
+        """
+        Times the block within, without making the span the parent of spans
+        started while it is open. For blocks that yield, such as the body of
+        a generator, whose spans would otherwise become the parent of the
+        consumer's spans.
+
+        :param name: A string name of the span.
+
+        :param parent: The span this span is a child of. If not provided,
+            the span the block is nested in.
+
+        :param attributes: Values describing the work, such as the network,
+            report type and page.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def use_span(self, span: Any) -> ContextManager[None]:
+        """
+        Makes a span the parent of the spans started within the block. The
+        block must not yield.
+
+        :param span: A span provided by start_span.
+        """
+        raise NotImplementedError()
@@ -0,0 +1,233 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import threading
+from bisect import bisect_left
+
+from .interfaces.i_metrics import IMetrics
+
+# seconds of each request, labelled by endpoint, until its headers arrived
+REQUEST_SECONDS = "opendns_request_duration_seconds"
+
+# bytes of response bodies received, labelled by endpoint
+RESPONSE_BYTES = "opendns_response_bytes_total"
+
+# failed requests retried, labelled by endpoint and status or "connection"
+REQUEST_RETRIES = "opendns_request_retries_total"
+
+LOGINS = "opendns_logins_total"
+LOGIN_SECONDS = "opendns_login_duration_seconds"
+
+# seconds requests waited in the rate limiter's check
+RATE_LIMIT_WAIT_SECONDS = "opendns_rate_limit_wait_seconds"
+
+# reports read to their end, pages and rows read, and CPU seconds parsing
+# each page, labelled by report type. Pages per report is REPORT_PAGES over
+# REPORTS.
+REPORTS = "opendns_reports_total"
+REPORT_PAGES = "opendns_report_pages_total"
+REPORT_ROWS = "opendns_report_rows_total"
+PAGE_PARSE_SECONDS = "opendns_page_parse_seconds"
+
+METRIC_HELP = {
+    REQUEST_SECONDS: "Seconds from sending a request until its response headers arrived.",
+    RESPONSE_BYTES: "Bytes of response bodies received.",
+    REQUEST_RETRIES: "Failed requests retried.",
+    LOGINS: "Logins made.",
+    LOGIN_SECONDS: "Seconds taken by each login.",
+    RATE_LIMIT_WAIT_SECONDS: "Seconds requests waited for the rate limiter.",
+    REPORTS: "Reports read to their last page.",
+    REPORT_PAGES: "Report pages read.",
+    REPORT_ROWS: "Report rows read, filtered rows included.",
+    PAGE_PARSE_SECONDS: "CPU seconds spent parsing each report page.",
+}
+
+
+class MetricsRegistry(IMetrics):
+    """
+    Keeps counters and histograms in memory, and renders them in the
+    Prometheus text exposition format. Safe to share between threads.
+
+    :param buckets: The upper bounds of the histogram buckets, in ascending
+        order. If not provided, DEFAULT_BUCKETS is used.
+    """
+
+    # seconds, from a fast request up to a full rate limiter period
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+    def __init__(self, buckets: tuple[float, ...] = None) -> None:
+
+        self.buckets = tuple(buckets) if buckets is not None else self.DEFAULT_BUCKETS
+
+        # name -> labels -> value
+        self.__counters = {}
+
+        # name -> labels -> [bucket counts, sum, count]
+        self.__histograms = {}
+
+        self.__lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, labels: dict[str, str] = None) -> None:
+        """
+        Adds to a counter.
+
+        :param name: A string name of the metric.
+
+        :param value: The amount to add.
+
+        :param labels: A dict of label names and values identifying the
+            series.
+        """
+
+        key = self._get_labels_key(labels)
+
+        with self.__lock:
+
+            series = self.__counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: dict[str, str] = None) -> None:
+        """
+        Records an observation in a histogram.
+
+        :param name: A string name of the metric.
+
+        :param value: The value observed, such as a duration in seconds.
+
+        :param labels: A dict of label names and values identifying the
+            series.
+        """
+
+        key = self._get_labels_key(labels)
+
+        # the first bucket whose upper bound holds the value, counts are
+        # made cumulative when rendered
+        bucket = bisect_left(self.buckets, value)
+
+        with self.__lock:
+
+            series = self.__histograms.setdefault(name, {})
+
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+            histogram[0][bucket] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def get_value(self, name: str, labels: dict[str, str] = None) -> float:
+        """
+        Returns the value of a counter, zero if it was never incremented.
+        """
+
+        with self.__lock:
+            return self.__counters.get(name, {}).get(self._get_labels_key(labels), 0)
+
+    def get_histogram(self, name: str, labels: dict[str, str] = None) -> tuple[int, float]:
+        """
+        Returns the number and the sum of the observations of a histogram.
+        """
+
+        with self.__lock:
+            histogram = self.__histograms.get(name, {}).get(self._get_labels_key(labels))
+
+        if histogram is None:
+            return 0, 0.0
+
+        return histogram[2], histogram[1]
+
+    def render(self) -> str:
+        """
+        Renders every metric in the Prometheus text exposition format.
+        """
+
+        lines = []
+
+        with self.__lock:
+
+            for name in sorted(self.__counters):
+
+                self._render_header(lines, name, "counter")
+
+                for key, value in sorted(self.__counters[name].items()):
+                    lines.append(f"{name}{self._format_labels(key)} {self._format_value(value)}")
+
+            for name in sorted(self.__histograms):
+
+                self._render_header(lines, name, "histogram")
+
+                for key, (bucket_counts, total, count) in sorted(self.__histograms[name].items()):
+
+                    cumulative = 0
+                    for upper_bound, bucket_count in zip((*self.buckets, "+Inf"), bucket_counts):
+
+                        cumulative += bucket_count
+
+                        bucket_key = (*key, ("le", self._format_value(upper_bound)), )
+                        lines.append(f"{name}_bucket{self._format_labels(bucket_key)} {cumulative}")
+
+                    lines.append(f"{name}_sum{self._format_labels(key)} {self._format_value(total)}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {count}")
+
+        return "".join(f"{line}\n" for line in lines)
+
+    def _render_header(self, lines: list[str], name: str, metric_type: str) -> None:
+        """
+        Adds the HELP and TYPE lines of a metric.
+        """
+
+        help_text = METRIC_HELP.get(name)
+        if help_text is not None:
+            lines.append(f"# HELP {name} {help_text}")
+
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    def _get_labels_key(self, labels: dict[str, str] | None) -> tuple[tuple[str, str], ...]:
+        """
+        Returns a hashable key of the labels of a series, independent of
+        their order.
+        """
+
+        return tuple(sorted((name, str(value)) for name, value in labels.items())) if labels else ()
+
+    def _format_labels(self, key: tuple[tuple[str, str], ...]) -> str:
+        """
+        Formats the labels of a series, escaped as Prometheus requires.
+        """
+
+        if not key:
+            return ""
+
+        labels = ",".join(f'{name}="{self._escape_label_value(value)}"' for name, value in key)
+
+        return f"{{{labels}}}"
+
+    def _escape_label_value(self, value: str) -> str:
+        """
+        Escapes backslashes, quotes and line feeds in a label value.
+        """
+
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    def _format_value(self, value: float | str) -> str:
+        """
+        Formats a sample value or bucket bound, whole numbers without a
+        fraction.
+        """
+
+        if isinstance(value, str):
+            return value
+
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+
+        return repr(value)
@@ -9,8 +9,11 @@ LICENSE file in the root directory of this source tree.
 If LICENSE file is not included, please visit :
     https://github.com/gkunde/py_opendns
 """
+from array import array
 from dataclasses import dataclass
 from datetime import datetime
+from enum import IntFlag
+from typing import Any
 
 
 @dataclass
@@ -90,6 +93,267 @@ class DomainActivityRecord:
     is_web_spam: bool = None
     is_webmail: bool = None
 
+
+class DomainStatus(IntFlag):
+    """
+    Bit flags of how a domain's requests were handled, as packed by
+    CompactDomainActivityRecord.status.
+    """
+
+    BLOCKED_HOSTNAME = 1 << 0
+    BLOCKED_CATEGORY = 1 << 1
+    BLOCKED_MALWARE = 1 << 2
+    BLOCKED_BOTNET = 1 << 3
+    BLOCKED_PHISHING = 1 << 4
+    SMARTCACHE_RESOLVED = 1 << 5
+
+
+class DomainCategory(IntFlag):
+    """
+    Bit flags of the content categories of a domain, as packed by
+    CompactDomainActivityRecord.categories.
+    """
+
+    ACADEMIC_FRAUD = 1 << 0
+    ADULT_THEMES = 1 << 1
+    ADVERTISEMENTS = 1 << 2
+    ADWARE = 1 << 3
+    ALCOHOL = 1 << 4
+    ANIME_MANGA_WEBCOMIC = 1 << 5
+    AUCTIONS = 1 << 6
+    AUTOMOTIVE = 1 << 7
+    BLOGS = 1 << 8
+    BUSINESS_SERVICES = 1 << 9
+    CHAT = 1 << 10
+    CLASSIFIEDS = 1 << 11
+    DATING = 1 << 12
+    DRUGS = 1 << 13
+    ECOMMERCE_SHOPPING = 1 << 14
+    EDUCATIONAL_INSTITUTIONS = 1 << 15
+    FILE_STORAGE = 1 << 16
+    FINANCIAL_INSTITUTIONS = 1 << 17
+    FORUMS_MESSAGE_BOARDS = 1 << 18
+    GAMBLING = 1 << 19
+    GAMES = 1 << 20
+    GERMAN_YOUTH_PROTECTION = 1 << 21
+    GOVERNMENT = 1 << 22
+    HATE_DISCRIMINATION = 1 << 23
+    HEALTH_AND_FITNESS = 1 << 24
+    HUMOR = 1 << 25
+    INSTANT_MESSAGING = 1 << 26
+    JOBS_EMPLOYMENT = 1 << 27
+    LINGERIE_BIKINI = 1 << 28
+    MOVIES = 1 << 29
+    MUSIC = 1 << 30
+    NEWS_MEDIA = 1 << 31
+    NON_PROFITS = 1 << 32
+    NUDITY = 1 << 33
+    P2P_FILE_SHARING = 1 << 34
+    PARKED_DOMAINS = 1 << 35
+    PHOTO_SHARING = 1 << 36
+    PODCASTS = 1 << 37
+    POLITICS = 1 << 38
+    PORNOGRAPHY = 1 << 39
+    PORTALS = 1 << 40
+    PROXY_ANONYMIZER = 1 << 41
+    RADIO = 1 << 42
+    RELIGIOUS = 1 << 43
+    RESEARCH_REFERENCE = 1 << 44
+    SEARCH_ENGINES = 1 << 45
+    SEXUALITY = 1 << 46
+    SOCIAL_NETWORKING = 1 << 47
+    SOFTWARE_TECHNOLOGY = 1 << 48
+    SPORTS = 1 << 49
+    TASTELESS = 1 << 50
+    TELEVISION = 1 << 51
+    TOBACCO = 1 << 52
+    TRAVEL = 1 << 53
+    VIDEO_SHARING = 1 << 54
+    VISUAL_SEARCH_ENGINES = 1 << 55
+    WEAPONS = 1 << 56
+    WEB_SPAM = 1 << 57
+    WEBMAIL = 1 << 58
+
+
+class CompactDomainActivityRecord:
+    """
+    A memory efficient alternative to DomainActivityRecord. The blocked and
+    category flags are packed into the status and categories integer bit
+    masks, while the is_* attributes of DomainActivityRecord remain
+    available as read-only properties.
+
+    :param rank: An integer value of the domain's rank in the report.
+
+    :param report_period: A datetime object of the reporting period.
+
+    :param hostname: A string value of the domain.
+
+    :param requests: An integer value of the requests made for the domain.
+
+    :param status: A DomainStatus bit mask.
+
+    :param categories: A DomainCategory bit mask.
+    """
+
+    __slots__ = ("rank", "report_period", "hostname", "requests", "status", "categories")
+
+    def __init__(
+            self,
+            rank: int = None,
+            report_period: datetime = None,
+            hostname: str = None,
+            requests: int = None,
+            status: int = 0,
+            categories: int = 0) -> None:
+
+        self.rank = rank
+        self.report_period = report_period
+        self.hostname = hostname
+        self.requests = requests
+        self.status = status
+        self.categories = categories
+
+    def __eq__(self, other: object) -> bool:
+
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+
+        return f"{self.__class__.__name__}({fields})"
+
+    def has_any_status(self, status: int) -> bool:
+        """
+        Determines if any of the given DomainStatus flags are set.
+        """
+
+        return (self.status & status) != 0
+
+    def has_any_category(self, categories: int) -> bool:
+        """
+        Determines if any of the given DomainCategory flags are set.
+        """
+
+        return (self.categories & categories) != 0
+
+    def has_all_categories(self, categories: int) -> bool:
+        """
+        Determines if all of the given DomainCategory flags are set.
+        """
+
+        return (self.categories & categories) == categories
+
+    def to_record(self) -> DomainActivityRecord:
+        """
+        Creates the equivalent DomainActivityRecord object.
+        """
+
+        flags = {name: getattr(self, name) for name in _COMPACT_STATUS_FIELDS}
+        flags.update((name, getattr(self, name)) for name in _COMPACT_CATEGORY_FIELDS)
+
+        return DomainActivityRecord(self.rank, self.report_period, self.hostname, self.requests, **flags)
+
+    @classmethod
+    def from_record(cls, record: DomainActivityRecord) -> "CompactDomainActivityRecord":
+        """
+        Creates a compact record from a DomainActivityRecord object. Flags
+        that are None are stored as not set.
+        """
+
+        status = sum(flag for name, flag in _COMPACT_STATUS_FIELDS.items() if getattr(record, name))
+        categories = sum(flag for name, flag in _COMPACT_CATEGORY_FIELDS.items() if getattr(record, name))
+
+        return cls(record.rank, record.report_period, record.hostname, record.requests, status, categories)
+
+
+# DomainActivityRecord flag fields and their bits in the compact record
+_COMPACT_STATUS_FIELDS = {f"is_{flag.name.lower()}": flag for flag in DomainStatus}
+_COMPACT_CATEGORY_FIELDS = {f"is_{flag.name.lower()}": flag for flag in DomainCategory}
+
+
+def _make_flag_property(mask_name: str, flag: int) -> property:
+
+    def get_flag(self: CompactDomainActivityRecord) -> bool:
+        return (getattr(self, mask_name) & flag) != 0
+
+    return property(get_flag)
+
+
+for _name, _flag in _COMPACT_STATUS_FIELDS.items():
+    setattr(CompactDomainActivityRecord, _name, _make_flag_property("status", _flag))
+
+for _name, _flag in _COMPACT_CATEGORY_FIELDS.items():
+    setattr(CompactDomainActivityRecord, _name, _make_flag_property("categories", _flag))
+
+del _name, _flag
+
+
+class DomainActivityColumns:
+    """
+    The Domain report for one reporting period held as columns rather than
+    one object per domain. Numeric columns are array objects, which can be
+    shared with NumPy without copying.
+
+    :param report_period: A datetime object of the reporting period.
+
+    Attributes:
+    rank: An array of the domains' ranks.
+
+    hostname: A list of the domains.
+
+    requests: An array of the requests made for each domain.
+
+    status: An array of DomainStatus bit masks.
+
+    categories: An array of DomainCategory bit masks.
+    """
+
+    def __init__(self, report_period: datetime = None) -> None:
+
+        self.report_period = report_period
+
+        self.rank = array("q")
+        self.hostname = []
+        self.requests = array("q")
+        self.status = array("Q")
+        self.categories = array("Q")
+
+    def __len__(self) -> int:
+
+        return len(self.rank)
+
+    def append(self, rank: int, hostname: str, requests: int, status: int, categories: int) -> None:
+        """
+        Adds a domain to the end of the columns.
+        """
+
+        self.rank.append(rank)
+        self.hostname.append(hostname)
+        self.requests.append(requests)
+        self.status.append(status)
+        self.categories.append(categories)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """
+        Returns the columns as NumPy arrays. The numeric arrays share memory
+        with the columns. Requires NumPy to be installed.
+        """
+
+        import numpy
+
+        return {
+            "rank": numpy.frombuffer(self.rank, dtype=numpy.int64),
+            "hostname": numpy.array(self.hostname, dtype=object),
+            "requests": numpy.frombuffer(self.requests, dtype=numpy.int64),
+            "status": numpy.frombuffer(self.status, dtype=numpy.uint64),
+            "categories": numpy.frombuffer(self.categories, dtype=numpy.uint64),
+        }
+
+
 @dataclass
 class UniqueIpAddressRecord:
 
@@ -0,0 +1,204 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+from collections import deque
+from datetime import date
+from typing import Any, Generator
+
+from .cached_data_source import CachedDataSource
+from .data_repository import ReportDataRepository
+from .data_source import DataSource
+from .interfaces.i_metrics import IMetrics
+from .interfaces.i_rate_limiter import IRateLimiter
+from .interfaces.i_tracer import ITracer
+from .models import (DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord,
+                     UniqueIpAddressRecord)
+
+
+class MultiNetworkOpenDns:
+    """
+    A class to enable access to OpenDNS's reporting data for several
+    networks of one account. All networks share a single login and rate
+    limit budget.
+
+    Report pages are requested from the networks in turn, so every network
+    progresses at the same pace. Records are provided as tuples of the
+    network reference id and the record.
+
+    :param username: A string value of the account's username to
+        authenticate with. This value should be the email address associated
+        to the account.
+
+    :param password: A string value of the account's password to authenticate
+        with.
+
+    :param network_refids: A collection of string values of the network
+        reference ids provided by OpenDNS.
+
+    :param rate_limiter: An IRateLimiter object to throttle requests with. If
+        not provided, the DataSource default is used.
+
+    :param cookie_file: A string path to a file for persisting the session
+        cookies between instances, avoiding a login on every start.
+
+    :param cache_dir: A string path to a directory for caching reports of
+        past dates. If not provided, reports are not cached.
+
+    :param metrics: An IMetrics object to record requests, logins, rate
+        limiter waits and report parsing with, such as a MetricsRegistry.
+
+    :param tracer: An ITracer object to record spans of reports, pages,
+        requests and logins with, such as a Tracer.
+    """
+
+    def __init__(
+            self,
+            username: str,
+            password: str,
+            network_refids: list[str],
+            rate_limiter: IRateLimiter = None,
+            cookie_file: str = None,
+            cache_dir: str = None,
+            metrics: IMetrics = None,
+            tracer: ITracer = None) -> None:
+
+        self.network_refids = list(network_refids)
+
+        self.data_source = DataSource(username, password, rate_limiter, cookie_file, metrics=metrics, tracer=tracer)
+
+        if cache_dir is not None:
+            self.data_source = CachedDataSource(self.data_source, cache_dir)
+
+        self.report_data_repository = ReportDataRepository(self.data_source, metrics=metrics, tracer=tracer)
+
+    def get_domain_activity_report(
+            self,
+            reportdate: date) -> Generator[tuple[str, DomainActivityRecord], None, None]:
+        """
+        Fetches the data for the Domain report of every network.
+
+        :param reportdate: A date object to specify the reporting period.
+
+        :returns: A Generator object that returns tuples of the network
+            reference id and a DomainActivityRecord object.
+        """
+
+        yield from self._get_report_records(ReportDataRepository.RPT_DOMAIN, reportdate, None)
+
+    def get_request_types_report(
+            self,
+            reportdate: date) -> Generator[tuple[str, RequestTypesRecord], None, None]:
+        """
+        Fetches the data for the Request Types report of every network.
+
+        :param reportdate: A date object to specify the reporting period.
+
+        :returns: A Generator object that returns tuples of the network
+            reference id and a RequestTypesRecord object.
+        """
+
+        yield from self._get_report_records(ReportDataRepository.RPT_REQUESTTYPE, reportdate, None)
+
+    def get_total_requests_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> Generator[tuple[str, TotalRequestsRecord], None, None]:
+        """
+        Fetches the data for the Total Requests report of every network. Note
+        that report ranges less a week will return hourly data.
+
+        :param reportdate_start: A date object to specify the reporting period
+            start.
+
+        :param reportdate_end: A date object to specify the reporting period
+            end. If not provided, a single day report will be retrieved.
+
+        :returns: A Generator object that returns tuples of the network
+            reference id and a TotalRequestsRecord object.
+        """
+
+        yield from self._get_report_records(ReportDataRepository.RPT_REQUESTS, reportdate_start, reportdate_end)
+
+    def get_total_unique_domains_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> Generator[tuple[str, TotalUniqueDomainsRecord], None, None]:
+        """
+        Fetches the data for the Total Unique Domains report of every network.
+        Note that report ranges less a week will return hourly data.
+
+        :param reportdate_start: A date object to specify the reporting period
+            start.
+
+        :param reportdate_end: A date object to specify the reporting period
+            end. If not provided, a single day report will be retrieved.
+
+        :returns: A Generator object that returns tuples of the network
+            reference id and a TotalUniqueDomainsRecord object.
+        """
+
+        yield from self._get_report_records(ReportDataRepository.RPT_UNQDOMAIN, reportdate_start, reportdate_end)
+
+    def get_unique_ipaddress_report(
+            self,
+            reportdate_start: date,
+            reportdate_end: date = None) -> Generator[tuple[str, UniqueIpAddressRecord], None, None]:
+        """
+        Fetches the data for the Total Unique IPs report of every network.
+        Note that report ranges less a week will return hourly data.
+
+        :param reportdate_start: A date object to specify the reporting period
+            start.
+
+        :param reportdate_end: A date object to specify the reporting period
+            end. If not provided, a single day report will be retrieved.
+
+        :returns: A Generator object that returns tuples of the network
+            reference id and a UniqueIpAddressRecord object.
+        """
+
+        yield from self._get_report_records(ReportDataRepository.RPT_IPADDR, reportdate_start, reportdate_end)
+
+    def _get_report_records(
+            self,
+            report_type: str,
+            reportdate_start: date,
+            reportdate_end: date) -> Generator[tuple[str, Any], None, None]:
+        """
+        Retrieves a report for every network, one page per network in turn.
+
+        :param report_type: A string to identify the report.
+
+        :param reportdate_start: A date object that represents the reporting
+            period start.
+
+        :param reportdate_end: A date object that represents the reporting
+            period end.
+
+        :returns: A Generator object providing tuples of the network
+            reference id and a record object.
+        """
+
+        # networks waiting for their next page, in turn order
+        pending = deque((network_refid, 1, ) for network_refid in self.network_refids)
+
+        while pending:
+
+            network_refid, page = pending.popleft()
+
+            records, is_final_page = self.report_data_repository.get_report_page(
+                report_type, network_refid, reportdate_start, reportdate_end, page)
+
+            for record in records:
+                yield network_refid, record
+
+            if not is_final_page:
+                pending.append((network_refid, page + 1, ))
@@ -0,0 +1,140 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import contextvars
+import queue
+import threading
+from typing import Callable, Generator, Iterable
+
+from .data_source import request_cancel_event
+
+
+class PagePrefetcher:
+    """
+    Fetches the pages of a report on a background thread, staying up to
+    depth pages ahead of the consumer. The wait for the rate limiter and the
+    transfer of the next pages overlap with processing the current one.
+
+    Once closed, no further request is sent, including one already waiting
+    for the rate limiter.
+
+    :param fetch_page: A callable returning the content of a page number.
+
+    :param is_final_page: A callable that determines if a page's content is
+        the last page of the report. No pages are fetched after it.
+
+    :param pages: An iterable of the page numbers to fetch, in order.
+
+    :param depth: An integer value of the pages fetched ahead of the
+        consumer.
+    """
+
+    # seconds between checks for the consumer having stopped
+    _POLL_PERIOD = 0.1
+
+    _END = object()
+
+    def __init__(
+            self,
+            fetch_page: Callable[[int], str],
+            is_final_page: Callable[[str], bool],
+            pages: Iterable[int],
+            depth: int) -> None:
+
+        self._fetch_page = fetch_page
+        self._is_final_page = is_final_page
+        self._pages = pages
+
+        self.__queue = queue.Queue()
+
+        # a page is only fetched once there is room for it, so pages held by
+        # the thread and the queue together stay within depth
+        self.__slots = threading.Semaphore(max(depth, 1))
+
+        self.__stopped = threading.Event()
+        self.__thread = None
+
+    def __iter__(self) -> Generator[str, None, None]:
+        """
+        Provides the content of each page in order. Errors raised fetching a
+        page are raised here.
+        """
+
+        if self.__thread is None:
+            # pages are fetched with the consumer's request_priority and
+            # within its trace
+            context = contextvars.copy_context()
+
+            self.__thread = threading.Thread(
+                target=context.run, args=(self._run, ), name="opendns-prefetch", daemon=True)
+            self.__thread.start()
+
+        while True:
+
+            item = self.__queue.get()
+
+            if item is self._END:
+                return
+
+            if isinstance(item, BaseException):
+                raise item
+
+            self.__slots.release()
+
+            yield item
+
+    def close(self) -> None:
+        """
+        Stops fetching further pages. A fetch waiting for the rate limiter
+        sends no request, one already sent is left to finish in the
+        background.
+        """
+
+        self.__stopped.set()
+
+    def _run(self) -> None:
+        """
+        Fetches pages until the final page, an error, or close is called.
+        """
+
+        try:
+            with request_cancel_event(self.__stopped):
+
+                for page in self._pages:
+
+                    if not self._wait_for_slot():
+                        return
+
+                    content = self._fetch_page(page)
+
+                    self.__queue.put(content)
+
+                    if self._is_final_page(content):
+                        break
+
+        except Exception as error:
+            self.__queue.put(error)
+            return
+
+        self.__queue.put(self._END)
+
+    def _wait_for_slot(self) -> bool:
+        """
+        Waits until the consumer is fewer than depth pages behind.
+
+        :returns: False if the consumer has stopped.
+        """
+
+        while not self.__stopped.is_set():
+            if self.__slots.acquire(timeout=self._POLL_PERIOD):
+                return True
+
+        return False
@@ -9,51 +9,419 @@ LICENSE file in the root directory of this source tree.
 If LICENSE file is not included, please visit :
     https://github.com/gkunde/py_opendns
 """
+import asyncio
+import threading
 import time
-from .interfaces.i_rate_limiter import IRateLimiter
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Generator
 
+from .interfaces.i_async_rate_limiter import IAsyncRateLimiter
+from .interfaces.i_rate_limiter import IRateLimiter, Priority
 
-class RateLimiter(IRateLimiter):
+# the priority of requests made without one, set with request_priority
+_current_priority = ContextVar("opendns_request_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Generator[None, None, None]:
     """
-    Prevents abuse of the service providers website.
+    Sets the priority of the requests made within the block, by the current
+    thread or asyncio task, without passing it through every call.
+
+    :param priority: The Priority of the requests.
+    """
+
+    token = _current_priority.set(priority)
+    try:
+        yield
+
+    finally:
+        _current_priority.reset(token)
+
+
+class RateLimiterBase:
+    """
+    Tracks the requests made within a sliding time window. Shared by the
+    blocking and asyncio rate limiters, and safe to use from several threads.
+
+    A free request goes to the highest Priority waiting for one. Requests of
+    a lower priority may still take up to reserved_share of each window
+    while higher priority requests wait, so they are never starved.
+
+    When max_requests is provided, the budget adapts to the service's
+    responses. It starts at num_requests, is cut by DECREASE_FACTOR when the
+    service throttles a request, and grows by one request for every window's
+    worth of requests that succeed, up to max_requests. A Retry-After pauses
+    every request until it has passed, whether or not the budget adapts.
 
     :param num_requests: An integer value for the maximum number of requests
         for a given time period.
-    
+
     :param period: An integer value of seconds for the time period.
+
+    :param clock: A callable returning the current time in seconds. Must be
+        monotonic, defaults to time.monotonic.
+
+    :param reserved_share: A float value of the share of each window's
+        requests that lower priority requests keep, between 0 and 1.
+
+    :param max_requests: An integer value of the most requests per time
+        period the budget may grow to. If not provided, the budget is fixed.
     """
 
-    def __init__(self, num_requests: int, period: int) -> None:
-        
+    # seconds a request yielding to a higher priority waits before retrying
+    PREEMPT_DELAY = 0.05
+
+    # share of the budget kept when the service throttles a request
+    DECREASE_FACTOR = 0.5
+
+    MIN_REQUESTS = 1
+
+    def __init__(
+            self,
+            num_requests: int,
+            period: int,
+            clock: Callable[[], float] = None,
+            reserved_share: float = 0.0,
+            max_requests: int = None) -> None:
+
         self.num_requests = num_requests
         self.period = period
+        self.reserved_share = reserved_share
+        self.max_requests = max_requests
+
+        self._clock = clock if clock is not None else time.monotonic
+
+        self._preempt_delay = self.PREEMPT_DELAY
+        self._decrease_factor = self.DECREASE_FACTOR
+        self._min_requests = self.MIN_REQUESTS
+
+        # (timestamp, priority) oldest request first, at most num_requests
+        # entries unless the budget was just cut
+        self.__checkpoints = deque()
+        self.__lock = threading.Lock()
+
+        # callers waiting for a request, by priority
+        self.__waiting = [0] * len(Priority)
+
+        # requests succeeded since the budget last changed
+        self.__successes = 0
+        self.__decreased_at = None
+
+        # no request is made before this time, set from Retry-After
+        self.__paused_until = None
+
+    def try_acquire(self, priority: Priority = None) -> bool:
+        """
+        Takes a request from the budget if one is free now, without waiting.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+
+        :returns: True if the request may be made.
+        """
+
+        return self._try_checkpoint(self._resolve_priority(priority)) <= 0
+
+    def time_until_available(self, priority: Priority = None) -> float:
+        """
+        Returns the number of seconds until a request of the priority may be
+        made, zero if one may be made now. No request is taken.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+        """
+
+        priority = self._resolve_priority(priority)
+
+        with self.__lock:
+
+            delay = self._get_delay()
+            if delay <= 0 and self._is_preempted(priority):
+                delay = self._preempt_delay
+
+        return max(delay, 0)
+
+    def remaining(self) -> int:
+        """
+        Returns the number of requests left in the current window.
+        """
+
+        with self.__lock:
+
+            # expires the requests that have left the window
+            self._get_delay()
+
+            return max(self.num_requests - len(self.__checkpoints), 0)
+
+    def time_until_refill(self) -> float:
+        """
+        Returns the number of seconds until the oldest request in the window
+        leaves it, freeing another request, zero if the window is empty.
+        """
+
+        with self.__lock:
+
+            # expires the requests that have left the window
+            self._get_delay()
+
+            if not self.__checkpoints:
+                return 0
+
+            return max(self.__checkpoints[0][0] + self.period - self._clock(), 0)
+
+    def on_success(self) -> None:
+        """
+        Tells the rate limiter a request succeeded. When the budget adapts,
+        it grows by one request for every window's worth of successes.
+        """
+
+        if self.max_requests is None:
+            return
+
+        with self.__lock:
+
+            self.__successes += 1
+
+            if self.__successes >= self.num_requests:
+                self.num_requests = min(self.num_requests + 1, self.max_requests)
+                self.__successes = 0
+
+    def on_throttle(self, retry_after: float = None) -> None:
+        """
+        Tells the rate limiter the service asked for fewer requests. When the
+        budget adapts, it is cut by DECREASE_FACTOR.
+
+        :param retry_after: A float value of the seconds the service asked
+            to wait. Every request waits until it has passed.
+        """
+
+        with self.__lock:
+
+            now = self._clock()
+
+            if retry_after is not None:
+                paused_until = now + retry_after
+                if self.__paused_until is None or paused_until > self.__paused_until:
+                    self.__paused_until = paused_until
+
+            if self.max_requests is None:
+                return
+
+            # requests already in flight are throttled together, so the
+            # budget is cut once for them rather than once each
+            interval = self.period / self.num_requests
+            if self.__decreased_at is not None and now - self.__decreased_at < interval:
+                return
+
+            self.num_requests = max(int(self.num_requests * self._decrease_factor), self._min_requests)
+            self.__successes = 0
+            self.__decreased_at = now
+
+    def _get_delay(self) -> float:
+        """
+        Returns the number of seconds until a request may be made, expiring
+        any checkpoints that have left the time window.
+        """
+
+        now = self._clock()
+        expiration = now - self.period
+
+        while self.__checkpoints and self.__checkpoints[0][0] <= expiration:
+            self.__checkpoints.popleft()
+
+        pause = self.__paused_until - now if self.__paused_until is not None else 0
+
+        if len(self.__checkpoints) < self.num_requests:
+            return max(pause, 0)
+
+        # once the budget is cut, the window may hold more requests than it
+        # allows, so the wait repeats until enough have left
+        return max(self.__checkpoints[0][0] + self.period - now, pause)
+
+    def _add_checkpoint(self, priority: Priority = Priority.NORMAL) -> None:
+        """
+        Records a request as made at the current time.
+        """
+
+        self.__checkpoints.append((self._clock(), priority, ))
+
+    def _try_checkpoint(self, priority: Priority = Priority.NORMAL) -> float:
+        """
+        Records a request if the budget allows it, and no higher priority
+        request is waiting for it. The check and the record are made under a
+        lock, so concurrent callers cannot both take the last request of the
+        window.
+
+        :param priority: The Priority of the request.
+
+        :returns: Zero if the request was recorded, otherwise the number of
+            seconds until a request may be made.
+        """
+
+        with self.__lock:
+
+            delay = self._get_delay()
+            if delay <= 0:
+
+                if self._is_preempted(priority):
+                    delay = self._preempt_delay
+
+                else:
+                    self._add_checkpoint(priority)
+
+        return delay
+
+    def _is_preempted(self, priority: Priority) -> bool:
+        """
+        Determines if a request must leave the next free request to a higher
+        priority one. Called with the lock held.
+        """
+
+        if not any(self.__waiting[:priority]):
+            return False
+
+        reserved = int(self.num_requests * self.reserved_share)
+
+        used = sum(1 for _, checkpoint_priority in self.__checkpoints if checkpoint_priority >= priority)
+
+        return used >= reserved
+
+    def _resolve_priority(self, priority: Priority | None) -> Priority:
+        """
+        Returns the priority of a request, defaulting to the one set with
+        request_priority.
+        """
+
+        return priority if priority is not None else _current_priority.get()
+
+    @contextmanager
+    def _waiting(self, priority: Priority) -> Generator[None, None, None]:
+        """
+        Registers the caller as waiting for a request, so that lower priority
+        requests yield to it.
+        """
+
+        with self.__lock:
+            self.__waiting[priority] += 1
 
-        # The time to wait between checking if checkpoints have expired.
-        # This should be a small value, used to prevent execution dead lock.
-        self._sleep_period = 1
+        try:
+            yield
 
-        self.__checkpoints = []
+        finally:
+            with self.__lock:
+                self.__waiting[priority] -= 1
+
+
+class RateLimiter(RateLimiterBase, IRateLimiter):
+    """
+    Prevents abuse of the service providers website.
+
+    :param num_requests: An integer value for the maximum number of requests
+        for a given time period.
     
-    def check(self) -> None:
+    :param period: An integer value of seconds for the time period.
+
+    :param clock: A callable returning the current time in seconds. Must be
+        monotonic, defaults to time.monotonic.
+
+    :param sleep: A callable that pauses execution for a number of seconds,
+        defaults to time.sleep.
+
+    :param reserved_share: A float value of the share of each window's
+        requests that lower priority requests keep, between 0 and 1.
+
+    :param max_requests: An integer value of the most requests per time
+        period the budget may grow to, when adapting to the service's
+        responses. If not provided, the budget is fixed.
+    """
+
+    def __init__(
+            self,
+            num_requests: int,
+            period: int,
+            clock: Callable[[], float] = None,
+            sleep: Callable[[float], None] = None,
+            reserved_share: float = 0.0,
+            max_requests: int = None) -> None:
+
+        super().__init__(num_requests, period, clock, reserved_share, max_requests)
+
+        self._sleep = sleep if sleep is not None else time.sleep
+
+    def check(self, priority: Priority = None) -> None:
         """
         Determines if delay is required by the caller. Will pause execution
         until the limit period as expired.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
         """
 
-        for _ in range(int(self.period) + 1):
+        priority = self._resolve_priority(priority)
 
-            if len(self.__checkpoints) < self.num_requests:
-                # not at the limit yet, safe to proceed
-                break
+        with self._waiting(priority):
 
-            expiration = time.time() - self.period
+            delay = self._try_checkpoint(priority)
+            while delay > 0:
+                # sleep until the oldest request leaves the window
+                self._sleep(delay)
+                delay = self._try_checkpoint(priority)
 
-            # remove any check ppoints that are older than expiration
-            self.__checkpoints = [cp for cp in self.__checkpoints if cp >= expiration]
 
-            time.sleep(self._sleep_period)
+class AsyncRateLimiter(RateLimiterBase, IAsyncRateLimiter):
+    """
+    Prevents abuse of the service providers website from asyncio code. Waits
+    suspend the calling coroutine instead of blocking the event loop.
+
+    :param num_requests: An integer value for the maximum number of requests
+        for a given time period.
+
+    :param period: An integer value of seconds for the time period.
+
+    :param clock: A callable returning the current time in seconds. Must be
+        monotonic, defaults to time.monotonic.
+
+    :param sleep: A coroutine function that suspends the caller for a number
+        of seconds, defaults to asyncio.sleep.
+
+    :param reserved_share: A float value of the share of each window's
+        requests that lower priority requests keep, between 0 and 1.
+
+    :param max_requests: An integer value of the most requests per time
+        period the budget may grow to, when adapting to the service's
+        responses. If not provided, the budget is fixed.
+    """
+
+    def __init__(
+            self,
+            num_requests: int,
+            period: int,
+            clock: Callable[[], float] = None,
+            sleep: Callable[[float], Awaitable[None]] = None,
+            reserved_share: float = 0.0,
+            max_requests: int = None) -> None:
+
+        super().__init__(num_requests, period, clock, reserved_share, max_requests)
+
+        self._sleep = sleep if sleep is not None else asyncio.sleep
+
+    async def check(self, priority: Priority = None) -> None:
+        """
+        Determines if delay is required by the caller. Will suspend the
+        calling coroutine until the limit period as expired.
+
+        :param priority: The Priority of the request. If not provided, the
+            priority set with request_priority is used.
+        """
 
-        self.__checkpoints.append(time.time())
+        priority = self._resolve_priority(priority)
 
+        with self._waiting(priority):
 
-        
+            delay = self._try_checkpoint(priority)
+            while delay > 0:
+                await self._sleep(delay)
+                delay = self._try_checkpoint(priority)
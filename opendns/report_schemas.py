@@ -0,0 +1,392 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+from abc import ABCMeta, abstractmethod
+from dataclasses import fields
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Any, Callable
+
+from .models import (CompactDomainActivityRecord, DomainActivityRecord, DomainCategory, DomainStatus,
+                     RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord, UniqueIpAddressRecord)
+
+# DomainActivityRecord flag fields and the report columns providing them
+DOMAIN_ACTIVITY_FLAG_COLUMNS = {
+    "is_blocked_hostname": "Blacklisted",
+    "is_blocked_category": "Blocked by Category",
+    "is_blocked_botnet": "Blocked as Botnet",
+    "is_blocked_malware": "Blocked as Malware",
+    "is_blocked_phishing": "Blocked as Phishing",
+    "is_smartcache_resolved": "Resolved by SmartCache",
+    "is_academic_fraud": "Academic Fraud",
+    "is_adult_themes": "Adult Themes",
+    "is_advertisements": "Advertisements",
+    "is_adware": "Adware",
+    "is_alcohol": "Alcohol",
+    "is_anime_manga_webcomic": "Anime/Manga/Webcomic",
+    "is_auctions": "Auctions",
+    "is_automotive": "Automotive",
+    "is_blogs": "Blogs",
+    "is_business_services": "Business Services",
+    "is_chat": "Chat",
+    "is_classifieds": "Classifieds",
+    "is_dating": "Dating",
+    "is_drugs": "Drugs",
+    "is_ecommerce_shopping": "Ecommerce/Shopping",
+    "is_educational_institutions": "Educational Institutions",
+    "is_file_storage": "File Storage",
+    "is_financial_institutions": "Financial Institutions",
+    "is_forums_message_boards": "Forums/Message boards",
+    "is_gambling": "Gambling",
+    "is_games": "Games",
+    "is_german_youth_protection": "German Youth Protection",
+    "is_government": "Government",
+    "is_hate_discrimination": "Hate/Discrimination",
+    "is_health_and_fitness": "Health and Fitness",
+    "is_humor": "Humor",
+    "is_instant_messaging": "Instant Messaging",
+    "is_jobs_employment": "Jobs/Employment",
+    "is_lingerie_bikini": "Lingerie/Bikini",
+    "is_movies": "Movies",
+    "is_music": "Music",
+    "is_news_media": "News/Media",
+    "is_non_profits": "Non-Profits",
+    "is_nudity": "Nudity",
+    "is_p2p_file_sharing": "P2P/File sharing",
+    "is_parked_domains": "Parked Domains",
+    "is_photo_sharing": "Photo Sharing",
+    "is_podcasts": "Podcasts",
+    "is_politics": "Politics",
+    "is_pornography": "Pornography",
+    "is_portals": "Portals",
+    "is_proxy_anonymizer": "Proxy/Anonymizer",
+    "is_radio": "Radio",
+    "is_religious": "Religious",
+    "is_research_reference": "Research/Reference",
+    "is_search_engines": "Search Engines",
+    "is_sexuality": "Sexuality",
+    "is_social_networking": "Social Networking",
+    "is_software_technology": "Software/Technology",
+    "is_sports": "Sports",
+    "is_tasteless": "Tasteless",
+    "is_television": "Television",
+    "is_tobacco": "Tobacco",
+    "is_travel": "Travel",
+    "is_video_sharing": "Video Sharing",
+    "is_visual_search_engines": "Visual Search Engines",
+    "is_weapons": "Weapons",
+    "is_web_spam": "Web Spam",
+    "is_webmail": "Webmail",
+}
+
+
+def parse_report_period(report_period: str) -> datetime:
+    """
+    A datetime object normalizing method.
+
+    :param report_period: A string representation of a date object.
+    """
+
+    return datetime.strptime(report_period.strip(), "%Y-%m-%d %H:%M:%S")
+
+
+class RowFilter:
+    """
+    Selects report rows by their CSV values, before a record object is
+    created for them. Columns are resolved to positions once per page.
+
+    :param columns: A collection of the column names the predicate is given.
+
+    :param predicate: A callable given the string values of the columns, in
+        order, that returns True to include the row.
+    """
+
+    def __init__(self, columns: list[str], predicate: Callable[..., bool]) -> None:
+
+        self.columns = tuple(columns)
+        self.predicate = predicate
+
+    @classmethod
+    def any_flag(cls, *flag_fields: str) -> "RowFilter":
+        """
+        Creates a filter for Domain report rows with any of the given flags
+        set.
+
+        :param flag_fields: The DomainActivityRecord flag field names, such
+            as is_blocked_malware.
+
+        :raises KeyError: If a name is not a flag field.
+        """
+
+        columns = [DOMAIN_ACTIVITY_FLAG_COLUMNS[name] for name in flag_fields]
+
+        return cls(columns, lambda *values: any(value != "0" for value in values))
+
+    def compile(self, header: list[str]) -> Callable[[list[str]], bool]:
+        """
+        Creates the test for rows of a page with the given header.
+
+        :param header: The column names from the first row of the page.
+
+        :returns: A callable that returns True if a row is included.
+
+        :raises KeyError: If the header is missing a column.
+        """
+
+        predicate = self.predicate
+
+        indexes = []
+        for column in self.columns:
+            try:
+                indexes.append(header.index(column))
+
+            except ValueError:
+                raise KeyError(column) from None
+
+        get_values = itemgetter(*indexes)
+
+        if len(indexes) == 1:
+            return lambda row: predicate(get_values(row))
+
+        return lambda row: predicate(*get_values(row))
+
+
+class ReportSchema(metaclass=ABCMeta):
+    """
+    Describes the columns of a report and decodes its CSV rows into record
+    objects. Columns are resolved to positions once per page, so rows can be
+    decoded from csv.reader lists without building a dictionary per row.
+
+    :param report_type: A string to identify the report.
+
+    :param record_type: The record class produced for each row.
+    """
+
+    def __init__(self, report_type: str, record_type: type) -> None:
+
+        self.report_type = report_type
+        self.record_type = record_type
+
+    @abstractmethod
+    def compile(self, header: list[str], reportdate: date) -> Callable[[list[str]], Any]:
+        """
+        Creates a decoder for rows of a page with the given header. Rows are
+        given at least as many values as the header has columns.
+
+        :param header: The column names from the first row of the page.
+
+        :param reportdate: A date object that represents the reporting
+            period start.
+
+        :returns: A callable that converts a row into a record object.
+
+        :raises KeyError: If the header is missing a required column.
+        """
+
+    def get_index(self, header: list[str], column: str) -> int:
+        """
+        Returns the position of a column within the header.
+
+        :raises KeyError: If the column is not found.
+        """
+
+        try:
+            return header.index(column)
+
+        except ValueError:
+            raise KeyError(column) from None
+
+
+class DomainActivitySchema(ReportSchema):
+    """
+    Decodes the Domain report.
+    """
+
+    def __init__(self) -> None:
+
+        super().__init__("topdomains", DomainActivityRecord)
+
+        # flag fields in the order DomainActivityRecord declares them
+        self.flag_fields = tuple(
+            field.name for field in fields(self.record_type) if field.name in DOMAIN_ACTIVITY_FLAG_COLUMNS)
+
+    def compile(self, header: list[str], reportdate: date) -> Callable[[list[str]], DomainActivityRecord]:
+
+        record_type = self.record_type
+        report_period = datetime(reportdate.year, reportdate.month, reportdate.day)
+
+        rank_index = self.get_index(header, "Rank")
+        hostname_index = self.get_index(header, "Domain")
+        requests_index = self.get_index(header, "Total")
+
+        get_flags = itemgetter(
+            *(self.get_index(header, DOMAIN_ACTIVITY_FLAG_COLUMNS[name]) for name in self.flag_fields))
+
+        def decode(row: list[str]) -> DomainActivityRecord:
+
+            return record_type(
+                int(row[rank_index]),
+                report_period,
+                row[hostname_index],
+                int(row[requests_index]),
+                *[value != "0" for value in get_flags(row)])
+
+        return decode
+
+
+class CompactDomainActivitySchema(ReportSchema):
+    """
+    Decodes the Domain report into CompactDomainActivityRecord objects.
+    """
+
+    def __init__(self) -> None:
+
+        super().__init__("topdomains", CompactDomainActivityRecord)
+
+    def compile(self, header: list[str], reportdate: date) -> Callable[[list[str]], CompactDomainActivityRecord]:
+
+        record_type = self.record_type
+        report_period = datetime(reportdate.year, reportdate.month, reportdate.day)
+
+        rank_index = self.get_index(header, "Rank")
+        hostname_index = self.get_index(header, "Domain")
+        requests_index = self.get_index(header, "Total")
+
+        get_status, status_bits = self._get_flags(header, DomainStatus)
+        get_categories, category_bits = self._get_flags(header, DomainCategory)
+
+        # records with the same flags share one mask object
+        masks = {}
+
+        def decode(row: list[str]) -> CompactDomainActivityRecord:
+
+            status = sum([bit for value, bit in zip(get_status(row), status_bits) if value != "0"])
+            categories = sum([bit for value, bit in zip(get_categories(row), category_bits) if value != "0"])
+
+            return record_type(
+                int(row[rank_index]),
+                report_period,
+                row[hostname_index],
+                int(row[requests_index]),
+                masks.setdefault(status, status),
+                masks.setdefault(categories, categories))
+
+        return decode
+
+    def _get_flags(self, header: list[str], flag_type: type) -> tuple[itemgetter, tuple[int, ...]]:
+        """
+        Returns a getter for the columns of each flag and the matching bits.
+        """
+
+        flags = tuple(flag_type)
+        columns = (DOMAIN_ACTIVITY_FLAG_COLUMNS[f"is_{flag.name.lower()}"] for flag in flags)
+
+        get_columns = itemgetter(*(self.get_index(header, column) for column in columns))
+
+        return get_columns, tuple(int(flag) for flag in flags)
+
+
+class DomainActivityColumnsSchema(CompactDomainActivitySchema):
+    """
+    Decodes the Domain report into (rank, hostname, requests, status,
+    categories) tuples for appending to DomainActivityColumns.
+    """
+
+    def compile(self, header: list[str], reportdate: date) -> Callable[[list[str]], tuple]:
+
+        rank_index = self.get_index(header, "Rank")
+        hostname_index = self.get_index(header, "Domain")
+        requests_index = self.get_index(header, "Total")
+
+        get_status, status_bits = self._get_flags(header, DomainStatus)
+        get_categories, category_bits = self._get_flags(header, DomainCategory)
+
+        def decode(row: list[str]) -> tuple:
+
+            return (
+                int(row[rank_index]),
+                row[hostname_index],
+                int(row[requests_index]),
+                sum([bit for value, bit in zip(get_status(row), status_bits) if value != "0"]),
+                sum([bit for value, bit in zip(get_categories(row), category_bits) if value != "0"]))
+
+        return decode
+
+
+class RequestTypesSchema(ReportSchema):
+    """
+    Decodes the Request Types report.
+    """
+
+    def __init__(self) -> None:
+
+        super().__init__("requesttypes", RequestTypesRecord)
+
+    def compile(self, header: list[str], reportdate: date) -> Callable[[list[str]], RequestTypesRecord]:
+
+        record_type = self.record_type
+        report_period = datetime(reportdate.year, reportdate.month, reportdate.day)
+
+        request_type_index = self.get_index(header, "Request Type")
+        requests_index = self.get_index(header, "Requests")
+
+        def decode(row: list[str]) -> RequestTypesRecord:
+
+            return record_type(report_period, row[request_type_index], int(row[requests_index]))
+
+        return decode
+
+
+class TimeSeriesSchema(ReportSchema):
+    """
+    Decodes reports of a single value per date or hour.
+
+    :param report_type: A string to identify the report.
+
+    :param record_type: The record class, constructed with the report period
+        and the value.
+
+    :param value_column: The name of the column holding the value.
+    """
+
+    def __init__(self, report_type: str, record_type: type, value_column: str) -> None:
+
+        super().__init__(report_type, record_type)
+
+        self.value_column = value_column
+
+    def compile(self, header: list[str], reportdate: date) -> Callable[[list[str]], Any]:
+
+        record_type = self.record_type
+
+        period_index = self.get_index(header, "Date")
+        value_index = self.get_index(header, self.value_column)
+
+        def decode(row: list[str]) -> Any:
+
+            return record_type(parse_report_period(row[period_index]), int(row[value_index]))
+
+        return decode
+
+
+REPORT_SCHEMAS = {
+    schema.report_type: schema for schema in (
+        DomainActivitySchema(),
+        RequestTypesSchema(),
+        TimeSeriesSchema("totalrequests", TotalRequestsRecord, "Requests"),
+        TimeSeriesSchema("uniquedomains", TotalUniqueDomainsRecord, "Requests"),
+        TimeSeriesSchema("uniqueips", UniqueIpAddressRecord, "IP Addresses"),
+    )
+}
+
+# schemas used instead of REPORT_SCHEMAS when compact records are requested
+COMPACT_REPORT_SCHEMAS = dict(REPORT_SCHEMAS)
+COMPACT_REPORT_SCHEMAS["topdomains"] = CompactDomainActivitySchema()
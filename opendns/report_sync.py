@@ -0,0 +1,123 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+from datetime import date, timedelta
+from typing import Any, Callable, Generator
+
+from .checkpoint_store import CheckpointStore
+from .data_repository import ReportDataRepository
+from .fetch_planner import FetchNeed, FetchPlanner, Granularity
+
+
+class ReportSync:
+    """
+    Fetches only the reporting data that is new since the previous sync.
+
+    Each report of a network has a checkpoint of the last date that has
+    closed and was fetched completely. A sync requests the dates after the
+    checkpoint through today, so the current day is fetched again on every
+    run until it closes. Records of a re-fetched day replace those provided
+    for it by earlier runs.
+
+    A checkpoint moves forward only once the records of a request have been
+    consumed, so a sync stopped part way resumes from the same place.
+
+    :param report_data_repository: The ReportDataRepository object to
+        retrieve reports with.
+
+    :param checkpoint_store: The CheckpointStore object to record progress
+        in.
+
+    :param granularity: The Granularity of range reports to keep. When
+        hourly, ranges are split so hours are never summarized into days.
+
+    :param settle_days: An integer value of the days a date must be in the
+        past before it is considered closed.
+
+    :param today: A callable returning the current date, defaults to
+        date.today.
+    """
+
+    def __init__(
+            self,
+            report_data_repository: ReportDataRepository,
+            checkpoint_store: CheckpointStore,
+            granularity: Granularity = Granularity.HOURLY,
+            settle_days: int = 1,
+            today: Callable[[], date] = None) -> None:
+
+        self.report_data_repository = report_data_repository
+        self.checkpoint_store = checkpoint_store
+        self.granularity = granularity
+        self.settle_days = settle_days
+
+        self._today = today if today is not None else date.today
+
+        self._planner = FetchPlanner()
+
+    def sync(
+            self,
+            report_type: str,
+            network_refid: str,
+            reportdate_start: date = None) -> Generator[Any, None, None]:
+        """
+        Retrieves the records of a report from after its checkpoint through
+        today.
+
+        :param report_type: A string to identify the report.
+
+        :param network_refid: A string to identify a network.
+
+        :param reportdate_start: A date object of the first date to fetch
+            when the report has no checkpoint. Defaults to the last closed
+            date, so the first sync records a checkpoint.
+
+        :returns: A Generator object providing the record objects of the
+            report type.
+        """
+
+        today = self._today()
+        last_closed = today - timedelta(days=self.settle_days)
+
+        checkpoint = self.checkpoint_store.get_checkpoint(network_refid, report_type)
+
+        if checkpoint is not None:
+            reportdate_start = checkpoint + timedelta(days=1)
+
+        elif reportdate_start is None:
+            # the last closed date is fetched too, so hours of it received
+            # after this run are not skipped by the next one
+            reportdate_start = last_closed
+
+        if reportdate_start > today:
+            return
+
+        if report_type in self._planner.RANGE_REPORT_TYPES:
+            plan = self._planner.plan([
+                FetchNeed(report_type, network_refid, reportdate_start, today, self.granularity)])
+
+            spans = [(request.reportdate_start, request.reportdate_end, ) for request in plan.requests]
+
+        else:
+            # single date reports, one date at a time
+            spans = [
+                (reportdate_start + timedelta(days=offset), None, )
+                for offset in range((today - reportdate_start).days + 1)]
+
+        for span_start, span_end in spans:
+
+            yield from self.report_data_repository.get_report_records(
+                report_type, network_refid, span_start, span_end)
+
+            complete_through = min(span_end or span_start, last_closed)
+
+            if complete_through >= span_start:
+                self.checkpoint_store.set_checkpoint(network_refid, report_type, complete_through)
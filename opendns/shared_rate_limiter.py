@@ -0,0 +1,340 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from typing import Callable, Generator
+
+from .interfaces.i_rate_limiter import IRateLimiter, Priority
+
+
+class SharedRateLimiter(IRateLimiter):
+    """
+    Prevents abuse of the service providers website across processes. The
+    requests made are recorded in a SQLite database, so every process using
+    the same file and key shares one budget, and the budget survives
+    restarts.
+
+    Timestamps are compared between processes, so the clock is the wall clock
+    rather than a monotonic one. Waiting requests are not known to other
+    processes, so every Priority is served in turn.
+
+    A Retry-After seen by any process pauses every process sharing the
+    budget. When the budget adapts, it is cut and grown for all of them, so
+    processes sharing a key should be created with the same settings.
+
+    :param path: A string path to the SQLite database file. The file is
+        created if it does not exist.
+
+    :param num_requests: An integer value for the maximum number of requests
+        for a given time period.
+
+    :param period: An integer value of seconds for the time period.
+
+    :param key: A string to identify the budget within the database, such as
+        the account's username.
+
+    :param clock: A callable returning the current time in seconds, defaults
+        to time.time.
+
+    :param sleep: A callable that pauses execution for a number of seconds,
+        defaults to time.sleep.
+
+    :param max_requests: An integer value of the most requests per time
+        period the budget may grow to. If not provided, the budget is fixed.
+    """
+
+    # seconds to wait for another process to release the database
+    LOCK_TIMEOUT = 30
+
+    # share of the budget kept when the service throttles a request
+    DECREASE_FACTOR = 0.5
+
+    MIN_REQUESTS = 1
+
+    def __init__(
+            self,
+            path: str,
+            num_requests: int,
+            period: int,
+            key: str = "default",
+            clock: Callable[[], float] = None,
+            sleep: Callable[[float], None] = None,
+            max_requests: int = None) -> None:
+
+        self.path = path
+        self.num_requests = num_requests
+        self.period = period
+        self.key = key
+        self.max_requests = max_requests
+
+        self._clock = clock if clock is not None else time.time
+        self._sleep = sleep if sleep is not None else time.sleep
+
+        self._lock_timeout = self.LOCK_TIMEOUT
+        self._decrease_factor = self.DECREASE_FACTOR
+        self._min_requests = self.MIN_REQUESTS
+
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints (key TEXT NOT NULL, timestamp REAL NOT NULL)")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS checkpoints_key_timestamp ON checkpoints (key, timestamp)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS budgets ("
+                "key TEXT PRIMARY KEY, "
+                "num_requests INTEGER NOT NULL, "
+                "successes INTEGER NOT NULL DEFAULT 0, "
+                "decreased_at REAL, "
+                "paused_until REAL)")
+
+            with self._transaction(connection):
+
+                row = connection.execute("SELECT num_requests FROM budgets WHERE key = ?", (self.key, )).fetchone()
+
+                # an adapted budget is kept between restarts, a fixed one
+                # is set to the value given
+                if row is None:
+                    connection.execute(
+                        "INSERT INTO budgets (key, num_requests) VALUES (?, ?)", (self.key, num_requests, ))
+
+                elif max_requests is None or not self._min_requests <= row[0] <= max_requests:
+                    connection.execute(
+                        "UPDATE budgets SET num_requests = ? WHERE key = ?", (num_requests, self.key, ))
+
+    def check(self, priority: Priority = None) -> None:
+        """
+        Determines if delay is required by the caller. Will pause execution
+        until the limit period as expired.
+
+        :param priority: The Priority of the request, accepted for
+            compatibility and not used.
+        """
+
+        delay = self._try_checkpoint()
+        while delay > 0:
+            self._sleep(delay)
+            delay = self._try_checkpoint()
+
+    def try_acquire(self, priority: Priority = None) -> bool:
+        """
+        Takes a request from the budget if one is free now, without waiting.
+
+        :param priority: The Priority of the request, accepted for
+            compatibility and not used.
+
+        :returns: True if the request may be made.
+        """
+
+        return self._try_checkpoint() <= 0
+
+    def time_until_available(self, priority: Priority = None) -> float:
+        """
+        Returns the number of seconds until a request may be made, zero if one
+        may be made now. No request is taken.
+
+        :param priority: The Priority of the request, accepted for
+            compatibility and not used.
+        """
+
+        with closing(self._connect()) as connection:
+            delay = self._get_delay(connection, self._clock())
+
+        return max(delay, 0)
+
+    def remaining(self) -> int:
+        """
+        Returns the number of requests left in the current window.
+        """
+
+        with closing(self._connect()) as connection:
+            count, _ = self._get_window(connection, self._clock())
+            num_requests, _ = self._get_budget(connection)
+
+        return max(num_requests - count, 0)
+
+    def time_until_refill(self) -> float:
+        """
+        Returns the number of seconds until the oldest request in the window
+        leaves it, freeing another request, zero if the window is empty.
+        """
+
+        now = self._clock()
+
+        with closing(self._connect()) as connection:
+            _, oldest = self._get_window(connection, now)
+
+        if oldest is None:
+            return 0
+
+        return max(min(oldest + self.period - now, self.period), 0)
+
+    def on_success(self) -> None:
+        """
+        Tells the rate limiter a request succeeded. When the budget adapts,
+        it grows by one request for every window's worth of successes.
+        """
+
+        if self.max_requests is None:
+            return
+
+        with closing(self._connect()) as connection:
+
+            with self._transaction(connection):
+
+                num_requests, _ = self._get_budget(connection)
+
+                successes = connection.execute(
+                    "SELECT successes FROM budgets WHERE key = ?", (self.key, )).fetchone()[0] + 1
+
+                if successes >= num_requests:
+                    num_requests = min(num_requests + 1, self.max_requests)
+                    successes = 0
+
+                connection.execute(
+                    "UPDATE budgets SET num_requests = ?, successes = ? WHERE key = ?",
+                    (num_requests, successes, self.key, ))
+
+        self.num_requests = num_requests
+
+    def on_throttle(self, retry_after: float = None) -> None:
+        """
+        Tells the rate limiter the service asked for fewer requests. Every
+        process sharing the budget waits until a Retry-After has passed, and
+        when the budget adapts, it is cut by DECREASE_FACTOR.
+
+        :param retry_after: A float value of the seconds the service asked
+            to wait.
+        """
+
+        with closing(self._connect()) as connection:
+
+            with self._transaction(connection):
+
+                now = self._clock()
+
+                if retry_after is not None:
+                    connection.execute(
+                        "UPDATE budgets SET paused_until = MAX(COALESCE(paused_until, ?), ?) WHERE key = ?",
+                        (now + retry_after, now + retry_after, self.key, ))
+
+                if self.max_requests is None:
+                    return
+
+                num_requests, _ = self._get_budget(connection)
+
+                decreased_at = connection.execute(
+                    "SELECT decreased_at FROM budgets WHERE key = ?", (self.key, )).fetchone()[0]
+
+                # requests already in flight, in any process, are throttled
+                # together, so the budget is cut once for them
+                if decreased_at is not None and now - decreased_at < self.period / num_requests:
+                    return
+
+                num_requests = max(int(num_requests * self._decrease_factor), self._min_requests)
+
+                connection.execute(
+                    "UPDATE budgets SET num_requests = ?, successes = 0, decreased_at = ? WHERE key = ?",
+                    (num_requests, now, self.key, ))
+
+        self.num_requests = num_requests
+
+    def _get_budget(self, connection: sqlite3.Connection) -> tuple[int, float | None]:
+        """
+        Returns the shared number of requests per period, and the time
+        requests are paused until, if any.
+        """
+
+        num_requests, paused_until = connection.execute(
+            "SELECT num_requests, paused_until FROM budgets WHERE key = ?", (self.key, )).fetchone()
+
+        # kept current for callers reading the budget, such as FetchPlanner
+        self.num_requests = num_requests
+
+        return num_requests, paused_until
+
+    def _get_delay(self, connection: sqlite3.Connection, now: float) -> float:
+        """
+        Returns the number of seconds until a request may be made.
+        """
+
+        count, oldest = self._get_window(connection, now)
+        num_requests, paused_until = self._get_budget(connection)
+
+        pause = paused_until - now if paused_until is not None else 0
+
+        if count < num_requests:
+            return max(pause, 0)
+
+        # never wait longer than one period, should the clock step back
+        return max(min(oldest + self.period - now, self.period), pause)
+
+    def _get_window(self, connection: sqlite3.Connection, now: float) -> tuple[int, float | None]:
+        """
+        Returns the number of requests within the window ending now, and the
+        time of the oldest.
+        """
+
+        return connection.execute(
+            "SELECT COUNT(*), MIN(timestamp) FROM checkpoints WHERE key = ? AND timestamp > ?",
+            (self.key, now - self.period, )).fetchone()
+
+    def _try_checkpoint(self) -> float:
+        """
+        Records a request if the budget allows it.
+
+        :returns: Zero if the request was recorded, otherwise the number of
+            seconds until a request may be made.
+        """
+
+        with closing(self._connect()) as connection:
+
+            with self._transaction(connection):
+
+                now = self._clock()
+
+                connection.execute(
+                    "DELETE FROM checkpoints WHERE key = ? AND timestamp <= ?", (self.key, now - self.period, ))
+
+                delay = self._get_delay(connection, now)
+                if delay <= 0:
+                    connection.execute(
+                        "INSERT INTO checkpoints (key, timestamp) VALUES (?, ?)", (self.key, now, ))
+
+        return delay
+
+    @contextmanager
+    def _transaction(self, connection: sqlite3.Connection) -> Generator[None, None, None]:
+        """
+        Runs the block in a transaction holding the write lock from the
+        start, so reads and the writes based on them are atomic between
+        processes.
+        """
+
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield
+
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        connection.execute("COMMIT")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection to the database with transactions managed by the
+        caller.
+        """
+
+        return sqlite3.connect(self.path, timeout=self._lock_timeout, isolation_level=None)
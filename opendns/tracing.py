@@ -0,0 +1,312 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import cProfile
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, ContextManager, Generator, Iterable, Iterator
+
+from .interfaces.i_tracer import ITracer
+
+# the span the current thread or asyncio task is within
+_current_span = ContextVar("opendns_current_span", default=None)
+
+
+@dataclass
+class Span:
+    """
+    A timed unit of work, such as a page of a report.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str = None
+
+    # seconds since the epoch
+    start: float = 0.0
+    duration: float = 0.0
+
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str = None
+
+
+def trace(tracer: ITracer | None, name: str, **attributes: Any) -> ContextManager[Any]:
+    """
+    Times the block within as a span of the tracer, or does nothing if no
+    tracer is provided.
+
+    :param tracer: An ITracer object, or None.
+
+    :param name: A string name of the span.
+
+    :param attributes: Values describing the work.
+    """
+
+    if tracer is None:
+        return nullcontext()
+
+    return tracer.span(name, **attributes)
+
+
+def start_trace(tracer: ITracer | None, name: str, parent: Any = None, **attributes: Any) -> ContextManager[Any]:
+    """
+    Times a block that may yield as a span of the tracer, without making it
+    the parent of spans started while it is open, or does nothing if no
+    tracer is provided.
+
+    :param tracer: An ITracer object, or None.
+
+    :param name: A string name of the span.
+
+    :param parent: The span this span is a child of. If not provided, the
+        span the block is nested in.
+
+    :param attributes: Values describing the work.
+    """
+
+    if tracer is None:
+        return nullcontext()
+
+    return tracer.start_span(name, parent, **attributes)
+
+
+def use_span(tracer: ITracer | None, span: Any) -> ContextManager[None]:
+    """
+    Makes a span the parent of the spans started within a block that does
+    not yield, or does nothing if no tracer or span is provided.
+
+    :param tracer: An ITracer object, or None.
+
+    :param span: A span provided by start_trace, or None.
+    """
+
+    if tracer is None or span is None:
+        return nullcontext()
+
+    return tracer.use_span(span)
+
+
+def iter_in_span(tracer: ITracer | None, span: Any, iterable: Iterable[Any]) -> Iterable[Any]:
+    """
+    Provides the items of an iterable, such as the lines of a response, with
+    a span as the parent of the spans started while each item is produced.
+
+    :param tracer: An ITracer object, or None.
+
+    :param span: A span provided by start_trace, or None.
+
+    :param iterable: The iterable to provide the items of.
+    """
+
+    if tracer is None or span is None:
+        return iterable
+
+    return _iter_in_span(tracer, span, iter(iterable))
+
+
+def _iter_in_span(tracer: ITracer, span: Any, iterator: Iterator[Any]) -> Generator[Any, None, None]:
+    """
+    Provides the items of an iterator, each produced within use_span.
+    """
+
+    while True:
+
+        with tracer.use_span(span):
+            try:
+                item = next(iterator)
+
+            except StopIteration:
+                return
+
+        yield item
+
+
+class Tracer(ITracer):
+    """
+    Records spans, nested by the thread or asyncio task they are made in,
+    and hands each to an exporter as it ends.
+
+    Spans opened by a report generator stay open while it is suspended, so
+    they include the time the consumer holds each record. Those spans are
+    started with start_span, so they do not become the parent of the spans
+    the consumer starts meanwhile.
+
+    :param exporter: An object with an export method taking a Span, such as
+        a JsonLinesExporter.
+
+    :param profile_dir: A string path to a directory to write a cProfile
+        file to for every span named in profiled_spans. If not provided,
+        nothing is profiled.
+
+    :param profiled_spans: The names of the spans to profile, by default
+        each report fetch.
+    """
+
+    PROFILED_SPANS = ("report", )
+
+    def __init__(self, exporter: Any, profile_dir: str = None, profiled_spans: tuple[str, ...] = PROFILED_SPANS) -> None:
+
+        self.exporter = exporter
+        self.profile_dir = profile_dir
+        self.profiled_spans = profiled_spans
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Generator[Span, None, None]:
+        """
+        Times the block within, as a child of the span the block is nested
+        in. The block must not yield, use start_span for one that does.
+
+        :param name: A string name of the span.
+
+        :param attributes: Values describing the work, such as the network,
+            report type and page.
+
+        :returns: The Span object, whose attributes may be added to.
+        """
+
+        with self.start_span(name, **attributes) as span:
+            with self.use_span(span):
+                yield span
+
+    @contextmanager
+    def start_span(self, name: str, parent: Span = None, **attributes: Any) -> Generator[Span, None, None]:
+        """
+        Times the block within, without making the span the parent of spans
+        started while it is open.
+
+        :param name: A string name of the span.
+
+        :param parent: The Span object this span is a child of. If not
+            provided, the span the block is nested in.
+
+        :param attributes: Values describing the work, such as the network,
+            report type and page.
+
+        :returns: The Span object, whose attributes may be added to.
+        """
+
+        if parent is None:
+            parent = _current_span.get()
+
+        span_id = secrets.token_hex(8)
+
+        span = Span(
+            name,
+            parent.trace_id if parent is not None else span_id,
+            span_id,
+            parent.span_id if parent is not None else None,
+            time.time(),
+            attributes=attributes)
+
+        profiler = self._start_profiler(name)
+
+        start = time.perf_counter()
+        try:
+            yield span
+
+        except BaseException as error:
+            span.error = f"{type(error).__name__}: {error}"
+            raise
+
+        finally:
+            span.duration = time.perf_counter() - start
+
+            if profiler is not None:
+                profiler.disable()
+
+                profile_path = os.path.join(self.profile_dir, f"{name}-{span_id}.prof")
+                profiler.dump_stats(profile_path)
+
+                span.attributes["profile"] = profile_path
+
+            self.exporter.export(span)
+
+    @contextmanager
+    def use_span(self, span: Span) -> Generator[None, None, None]:
+        """
+        Makes a span the parent of the spans started within the block. The
+        block must not yield.
+
+        :param span: A Span object provided by start_span.
+        """
+
+        token = _current_span.set(span)
+        try:
+            yield
+
+        finally:
+            _current_span.reset(token)
+
+    def _start_profiler(self, name: str) -> cProfile.Profile | None:
+        """
+        Starts a profiler for a span if it is to be profiled.
+        """
+
+        if self.profile_dir is None or name not in self.profiled_spans:
+            return None
+
+        profiler = cProfile.Profile()
+
+        try:
+            profiler.enable()
+
+        except ValueError:
+            # another profiler is already running in this thread
+            return None
+
+        return profiler
+
+
+class JsonLinesExporter:
+    """
+    Appends each span to a file as a line of JSON. Each line is written
+    whole, so several threads and processes may share the file.
+
+    :param path: A string path to the file. The file is created if it does
+        not exist.
+    """
+
+    DEFAULT_ENCODING = "UTF-8"
+
+    def __init__(self, path: str) -> None:
+
+        self.path = path
+
+        self.__lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """
+        Writes a span to the file.
+
+        :param span: The Span object that ended.
+        """
+
+        line = json.dumps({
+            "name": span.name,
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "start": span.start,
+            "duration": span.duration,
+            "attributes": span.attributes,
+            "error": span.error,
+        }, default=str)
+
+        with self.__lock:
+            with open(self.path, "a", encoding=self.DEFAULT_ENCODING) as file:
+                file.write(f"{line}\n")
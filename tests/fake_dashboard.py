@@ -0,0 +1,326 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import csv
+import io
+import re
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from opendns.async_data_source import AsyncDataSource
+from opendns.data_source import DataSource
+from opendns.report_schemas import DOMAIN_ACTIVITY_FLAG_COLUMNS
+
+
+class FakeDashboard:
+    """
+    A local stand-in for the OpenDNS login and dashboard sites, serving the
+    login form expected by LoginPageParser and CSV reports for the stats
+    endpoints.
+
+    The Domain report is paginated, and ranges shorter than a week are
+    reported hourly, as the dashboard does.
+
+    :param username: The username accepted by the login form.
+
+    :param password: The password accepted by the login form.
+
+    :param domain_count: The number of domains in each Domain report.
+
+    :param page_size: The number of domains on each Domain report page.
+
+    :param latency: Seconds to wait before answering a stats request.
+
+    :param throttle_every: Every this many stats requests is answered with
+        429 Too Many Requests. Zero never throttles.
+    """
+
+    LOGIN_PATH = "/login/"
+    SESSION_COOKIE = "PHPSESSID"
+
+    _REPORT_PATH_PATTERN = re.compile(
+        r"^/stats/(?P<network>[^/]+)/(?P<report>[^/]+)/(?P<start>\d{4}-\d{2}-\d{2})"
+        r"(?:to(?P<end>\d{4}-\d{2}-\d{2}))?(?:/page(?P<page>\d+))?\.csv$")
+
+    def __init__(
+            self,
+            username: str = "user@example.com",
+            password: str = "password",
+            domain_count: int = 500,
+            page_size: int = 200,
+            latency: float = 0.0,
+            throttle_every: int = 0) -> None:
+
+        self.username = username
+        self.password = password
+
+        self.domain_count = domain_count
+        self.page_size = page_size
+        self.latency = latency
+        self.throttle_every = throttle_every
+
+        self.sessions = set()
+
+        self.login_count = 0
+        self.requests = []
+        self.stats_count = 0
+        self.throttled_count = 0
+
+        self._lock = threading.Lock()
+        self.__server = None
+        self.__thread = None
+
+    @property
+    def root_url(self) -> str:
+
+        host, port = self.__server.server_address[:2]
+
+        return f"http://{host}:{port}/"
+
+    @property
+    def login_url(self) -> str:
+
+        return f"{self.root_url.rstrip('/')}{self.LOGIN_PATH}?return_to=%2F"
+
+    def start(self) -> "FakeDashboard":
+
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.__server.daemon_threads = True
+
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+
+        return self
+
+    def stop(self) -> None:
+
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+    def expire_sessions(self) -> None:
+
+        with self._lock:
+            self.sessions.clear()
+
+    def make_data_source(self, data_source_type: type = DataSource, **kwargs) -> DataSource:
+        """
+        Creates a data source pointed at this server.
+        """
+
+        data_source = data_source_type(self.username, self.password, **kwargs)
+
+        data_source._login_url = self.login_url
+        data_source._root_url_split = urlsplit(self.root_url)
+
+        return data_source
+
+    def make_async_data_source(self, **kwargs) -> AsyncDataSource:
+        """
+        Creates an asyncio data source pointed at this server.
+        """
+
+        data_source = AsyncDataSource(self.username, self.password, **kwargs)
+
+        data_source._data_source._login_url = self.login_url
+        data_source._data_source._root_url_split = urlsplit(self.root_url)
+
+        return data_source
+
+    def get_report(self, path: str, query: dict[str, str]) -> str | None:
+        """
+        Returns the CSV content for a stats endpoint, or None if not found.
+        """
+
+        match = self._REPORT_PATH_PATTERN.match(path)
+        if match is None:
+            return None
+
+        report_type = match.group("report")
+
+        start = date.fromisoformat(match.group("start"))
+        end = date.fromisoformat(match.group("end")) if match.group("end") else start
+
+        if report_type == "topdomains":
+            return self._get_domains_page(int(match.group("page") or 1))
+
+        if report_type == "requesttypes":
+            return "Request Type,Requests\nA,4321\nAAAA,1234\n"
+
+        if report_type in ("totalrequests", "uniquedomains"):
+            return self._get_time_series("Requests", start, end)
+
+        if report_type == "uniqueips":
+            return self._get_time_series("IP Addresses", start, end)
+
+        return None
+
+    def _get_domains_page(self, page: int) -> str:
+        """
+        Returns a page of the Domain report, with flags varying by rank.
+        """
+
+        first_rank = (page - 1) * self.page_size + 1
+        last_rank = min(page * self.page_size, self.domain_count)
+
+        with io.StringIO() as file:
+
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(["Rank", "Domain", "Total"] + list(DOMAIN_ACTIVITY_FLAG_COLUMNS.values()))
+
+            for rank in range(first_rank, last_rank + 1):
+                writer.writerow(
+                    [rank, f"host{rank}.example.com", self.domain_count * 10 - rank]
+                    + [int((rank + offset) % 11 == 0) for offset in range(len(DOMAIN_ACTIVITY_FLAG_COLUMNS))])
+
+            return file.getvalue()
+
+    def _get_time_series(self, value_column: str, start: date, end: date) -> str:
+        """
+        Returns a report of a value per hour, or per day for ranges of a week
+        or longer.
+        """
+
+        step = timedelta(hours=1) if (end - start).days < 7 else timedelta(days=1)
+
+        period = datetime(start.year, start.month, start.day)
+        period_end = datetime(end.year, end.month, end.day) + timedelta(days=1)
+
+        lines = [f"Date,{value_column}\n"]
+        while period < period_end:
+            lines.append(f"{period:%Y-%m-%d %H:%M:%S},{4321 + period.hour}\n")
+            period += step
+
+        return "".join(lines)
+
+    def _make_handler(self) -> type:
+
+        dashboard = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+
+                url = urlsplit(self.path)
+
+                with dashboard._lock:
+                    dashboard.requests.append(url.path)
+
+                if url.path == dashboard.LOGIN_PATH:
+                    self._send(200, "text/html", dashboard._login_page(None))
+                    return
+
+                if not self._has_session():
+                    self.send_response(302)
+                    self.send_header("Location", dashboard.login_url)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if url.path == "/":
+                    self._send(200, "text/html", "<html><body>Dashboard</body></html>")
+                    return
+
+                with dashboard._lock:
+                    dashboard.stats_count += 1
+                    is_throttled = (dashboard.throttle_every > 0
+                                    and dashboard.stats_count % dashboard.throttle_every == 0)
+
+                    if is_throttled:
+                        dashboard.throttled_count += 1
+
+                if dashboard.latency > 0:
+                    time.sleep(dashboard.latency)
+
+                if is_throttled:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                content = dashboard.get_report(url.path, dict(parse_qsl(url.query)))
+                if content is None:
+                    self._send(404, "text/plain", "Not Found")
+                    return
+
+                self._send(200, "text/csv", content)
+
+            def do_POST(self) -> None:
+
+                url = urlsplit(self.path)
+
+                length = int(self.headers.get("Content-Length", 0))
+                fields = dict(parse_qsl(self.rfile.read(length).decode("UTF-8")))
+
+                if url.path != dashboard.LOGIN_PATH:
+                    self._send(404, "text/plain", "Not Found")
+                    return
+
+                if (fields.get("username") != dashboard.username
+                        or fields.get("password") != dashboard.password
+                        or fields.get("formtoken") != "token"):
+                    self._send(200, "text/html", dashboard._login_page("error-text"))
+                    return
+
+                session = uuid.uuid4().hex
+                with dashboard._lock:
+                    dashboard.sessions.add(session)
+                    dashboard.login_count += 1
+
+                self.send_response(302)
+                self.send_header("Location", dashboard.root_url)
+                self.send_header("Set-Cookie", f"{dashboard.SESSION_COOKIE}={session}; Path=/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _has_session(self) -> bool:
+
+                for cookie in self.headers.get_all("Cookie", []):
+                    for pair in cookie.split(";"):
+                        name, _, value = pair.strip().partition("=")
+                        if name == dashboard.SESSION_COOKIE and value in dashboard.sessions:
+                            return True
+
+                return False
+
+            def _send(self, status: int, content_type: str, content: str) -> None:
+
+                body = content.encode("UTF-8")
+
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def _login_page(self, error_class: str | None) -> str:
+
+        error = f'<div class="{error_class}">Login failed</div>' if error_class else ""
+
+        return (
+            "<html><body>"
+            f"{error}"
+            f'<form name="signin" method="post" action="{self.root_url.rstrip("/")}{self.LOGIN_PATH}">'
+            '<input type="text" name="username" value="">'
+            '<input type="password" name="password" value="">'
+            '<input type="hidden" name="formtoken" value="token">'
+            "</form>"
+            "</body></html>")
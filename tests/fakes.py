@@ -0,0 +1,104 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import csv
+import re
+import threading
+from io import IOBase
+
+from opendns.interfaces.i_data_source import IDataSource
+from opendns.report_schemas import DOMAIN_ACTIVITY_FLAG_COLUMNS
+
+
+class FakeClock:
+    """
+    A clock for rate limiters and jobs that only moves when slept on or set,
+    so waits are checked without taking any time.
+
+    :param now: The time in seconds the clock starts at.
+
+    :param tick: Seconds the clock moves forward each time it is read.
+    """
+
+    def __init__(self, now: float = 1000.0, tick: float = 0.0) -> None:
+
+        self.now = now
+        self.tick = tick
+
+        self.sleeps = []
+
+    def __call__(self) -> float:
+
+        self.now += self.tick
+
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float) -> None:
+
+        self.sleep(seconds)
+
+
+class PagedDataSource(IDataSource):
+    """
+    Serves Domain reports split into pages of the given sizes, ranked across
+    the pages, and Total Requests reports of one row valued as the network
+    reference id.
+
+    :param page_sizes: A list of the number of domains on each page, or a
+        dict of such lists by network reference id.
+    """
+
+    def __init__(self, page_sizes: list[int] | dict[str, list[int]]) -> None:
+
+        self.page_sizes = page_sizes
+
+        self.endpoints = []
+
+        # an endpoint that raises ConnectionError instead of being served
+        self.fail_on = None
+
+        self.lock = threading.Lock()
+
+    def get_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None, file: IOBase = None) -> None:
+
+        if endpoint == self.fail_on:
+            raise ConnectionError(endpoint)
+
+        with self.lock:
+            self.endpoints.append(endpoint)
+
+        network_refid, report_type = endpoint.split("/")[2:4]
+
+        writer = csv.writer(file, lineterminator="\n")
+
+        if report_type == "totalrequests":
+            writer.writerow(["Date", "Requests"])
+            writer.writerow(["2005-11-01 00:00:00", network_refid])
+            return
+
+        match = re.search(r"/page(\d+)\.csv$", endpoint)
+        page = int(match.group(1)) if match else 1
+
+        page_sizes = self.page_sizes[network_refid] if isinstance(self.page_sizes, dict) else self.page_sizes
+        page_size = page_sizes[page - 1] if page <= len(page_sizes) else 0
+        first_rank = sum(page_sizes[:page - 1]) + 1
+
+        writer.writerow(["Rank", "Domain", "Total"] + list(DOMAIN_ACTIVITY_FLAG_COLUMNS.values()))
+        for rank in range(first_rank, first_rank + page_size):
+            writer.writerow([rank, f"host{rank}.example.com", 1000 - rank] + ["0"] * len(DOMAIN_ACTIVITY_FLAG_COLUMNS))
+
+    def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+        return super().post_endpoint(endpoint, params)
@@ -0,0 +1,134 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import asyncio
+from datetime import datetime
+from io import IOBase
+import unittest
+
+from opendns.async_data_repository import AsyncReportDataRepository
+from opendns.interfaces.i_async_data_source import IAsyncDataSource
+from opendns.models import DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord, UniqueIpAddressRecord
+
+
+class TestAsyncDataRepository(unittest.TestCase):
+
+    class _DataSource(IAsyncDataSource):
+
+        def __init__(self) -> None:
+
+            self.endpoints = []
+
+        async def get_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None, file: IOBase = None) -> None:
+
+            self.endpoints.append(endpoint)
+
+            if "topdomains" in endpoint:
+                file.write('Rank,Domain,Total,Blacklisted,"Blocked by Category","Blocked as Botnet","Blocked as Malware","Blocked as Phishing","Resolved by SmartCache","Academic Fraud","Adult Themes",Advertisements,Adware,Alcohol,Anime/Manga/Webcomic,Auctions,Automotive,Blogs,"Business Services",Chat,Classifieds,Dating,Drugs,Ecommerce/Shopping,"Educational Institutions","File Storage","Financial Institutions","Forums/Message boards",Gambling,Games,"German Youth Protection",Government,Hate/Discrimination,"Health and Fitness",Humor,"Instant Messaging",Jobs/Employment,Lingerie/Bikini,Movies,Music,News/Media,Non-Profits,Nudity,"P2P/File sharing","Parked Domains","Photo Sharing",Podcasts,Politics,Pornography,Portals,Proxy/Anonymizer,Radio,Religious,Research/Reference,"Search Engines",Sexuality,"Social Networking",Software/Technology,Sports,Tasteless,Television,Tobacco,Travel,"Video Sharing","Visual Search Engines",Weapons,"Web Spam",Webmail')
+                file.write("\n")
+                file.write(
+                    '1,www.example.com,4321,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0')
+                file.write("\n")
+
+            if "uniqueips" in endpoint:
+                file.write('Date,IP Addresses')
+                file.write("\n")
+                file.write('2005-11-01 00:00:00,1')
+                file.write("\n")
+
+            if "requesttypes" in endpoint:
+                file.write('Request Type,Requests')
+                file.write("\n")
+                file.write('A,4321')
+                file.write("\n")
+
+            if "totalrequests" in endpoint:
+                file.write('Date,Requests')
+                file.write("\n")
+                file.write('2005-11-01 00:00:00 ,4321')
+                file.write("\n")
+
+        async def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+            return await super().post_endpoint(endpoint, params)
+
+    @staticmethod
+    def _collect(records) -> list:
+
+        async def collect():
+            return [record async for record in records]
+
+        return asyncio.run(collect())
+
+    def test_get_domain_activity_records(self):
+
+        reportdate = datetime(2005, 11, 1, 0, 0, 0)
+
+        ds = self._DataSource()
+
+        obj = AsyncReportDataRepository(ds)
+
+        records = self._collect(obj.get_domain_activity_records("1", reportdate.date()))
+
+        self.assertEqual(len(records), 1)
+
+        self.assertIsInstance(records[0], DomainActivityRecord)
+
+        self.assertEqual(records[0].rank, 1)
+        self.assertEqual(records[0].report_period, reportdate)
+        self.assertEqual(records[0].hostname, "www.example.com")
+        self.assertTrue(records[0].is_blocked_hostname)
+        self.assertTrue(records[0].is_research_reference)
+        self.assertFalse(records[0].is_webmail)
+
+        self.assertEqual(ds.endpoints, ["/stats/1/topdomains/2005-11-01.csv"])
+
+    def test_get_request_types_records(self):
+
+        reportdate = datetime(2005, 11, 1, 0, 0, 0)
+
+        obj = AsyncReportDataRepository(self._DataSource())
+
+        records = self._collect(obj.get_request_types_records("1", reportdate.date()))
+
+        self.assertEqual(len(records), 1)
+        self.assertIsInstance(records[0], RequestTypesRecord)
+        self.assertEqual(records[0].request_type, "A")
+        self.assertEqual(records[0].requests, 4321)
+
+    def test_get_total_requests_records(self):
+
+        reportdate = datetime(2005, 11, 1, 0, 0, 0)
+
+        ds = self._DataSource()
+
+        obj = AsyncReportDataRepository(ds)
+
+        records = self._collect(obj.get_total_requests_records(
+            "1", reportdate.date(), datetime(2005, 11, 2).date()))
+
+        self.assertEqual(len(records), 1)
+        self.assertIsInstance(records[0], TotalRequestsRecord)
+        self.assertEqual(records[0].report_period, reportdate)
+        self.assertEqual(records[0].requests, 4321)
+
+        self.assertEqual(ds.endpoints, ["/stats/1/totalrequests/2005-11-01to2005-11-02.csv"])
+
+    def test_get_unique_ipaddress_records(self):
+
+        reportdate = datetime(2005, 11, 1, 0, 0, 0)
+
+        obj = AsyncReportDataRepository(self._DataSource())
+
+        records = self._collect(obj.get_unique_ipaddress_records("1", reportdate.date()))
+
+        self.assertEqual(len(records), 1)
+        self.assertIsInstance(records[0], UniqueIpAddressRecord)
+        self.assertEqual(records[0].ip_addresses, 1)
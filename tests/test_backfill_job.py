@@ -0,0 +1,137 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from fakes import FakeClock, PagedDataSource
+from opendns.backfill_job import BackfillJob, BackfillUnit
+from opendns.data_repository import ReportDataRepository
+
+
+class TestBackfillJob(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "backfill.sqlite")
+
+        self.data_source = PagedDataSource([5, 5, 1])
+
+        # a minute passes between each reading
+        self.clock = FakeClock(tick=60)
+
+    def tearDown(self) -> None:
+
+        self.tempdir.cleanup()
+
+    def _make_job(self) -> BackfillJob:
+
+        return BackfillJob(self.path, ReportDataRepository(self.data_source), self.clock)
+
+    def test_add(self):
+
+        job = self._make_job()
+
+        self.assertEqual(job.add(ReportDataRepository.RPT_DOMAIN, ["1", "2"], date(2022, 1, 1), date(2022, 1, 3)), 6)
+        self.assertEqual(job.add(ReportDataRepository.RPT_DOMAIN, ["1"], date(2022, 1, 3), date(2022, 1, 4)), 1)
+        self.assertEqual(job.add(ReportDataRepository.RPT_REQUESTS, ["1"], date(2022, 1, 1), date(2022, 12, 31)), 1)
+
+        self.assertEqual(job.get_progress().units_total, 8)
+
+    def test_run(self):
+
+        job = self._make_job()
+        job.add(ReportDataRepository.RPT_DOMAIN, ["1"], date(2022, 1, 1), date(2022, 1, 2))
+
+        records = list(job.run())
+
+        self.assertEqual(len(records), 22)
+        self.assertEqual(records[0][0], BackfillUnit("1", "topdomains", date(2022, 1, 1)))
+        self.assertEqual(len(self.data_source.endpoints), 6)
+
+        progress = job.get_progress()
+
+        self.assertTrue(progress.is_done)
+        self.assertEqual((progress.units_done, progress.pages_done, progress.records_done), (2, 6, 22))
+        self.assertEqual(progress.eta, timedelta(0))
+
+        # nothing left to fetch
+        self.assertEqual(list(job.run()), [])
+
+    def test_run_resumes(self):
+
+        job = self._make_job()
+        job.add(ReportDataRepository.RPT_DOMAIN, ["1"], date(2022, 1, 1), date(2022, 1, 3))
+
+        list(job.run(max_pages=4))
+
+        self.data_source.fail_on = "/stats/1/topdomains/2022-01-02/page2.csv"
+
+        with self.assertRaises(ConnectionError):
+            list(job.run())
+
+        progress = job.get_progress()
+
+        self.assertEqual((progress.units_done, progress.pages_done), (1, 4))
+        self.assertGreater(progress.pages_per_hour, 0)
+        self.assertIsNotNone(progress.eta)
+
+        # a new job on the same file continues from the failed page
+        self.data_source.fail_on = None
+        self.data_source.endpoints.clear()
+
+        records = list(self._make_job().run())
+
+        self.assertEqual(self.data_source.endpoints[0], "/stats/1/topdomains/2022-01-02/page2.csv")
+        self.assertEqual(len(records), 6 + 11)
+        self.assertTrue(self._make_job().get_progress().is_done)
+
+    def test_run_concurrent_runners(self):
+
+        first = self._make_job()
+        first.add(ReportDataRepository.RPT_DOMAIN, ["1"], date(2022, 1, 1), date(2022, 1, 2))
+
+        first_records = first.run()
+        second_records = self._make_job().run()
+
+        # each runner claims a unit of its own
+        self.assertEqual(next(first_records)[0].reportdate_start, date(2022, 1, 1))
+        self.assertEqual(next(second_records)[0].reportdate_start, date(2022, 1, 2))
+
+        list(first_records)
+        list(second_records)
+
+        self.assertEqual(len(self.data_source.endpoints), 6)
+        self.assertEqual(len(set(self.data_source.endpoints)), 6)
+
+    def test_run_claim_expires(self):
+
+        crashed = self._make_job()
+        crashed.add(ReportDataRepository.RPT_DOMAIN, ["1"], date(2022, 1, 1), date(2022, 1, 2))
+        crashed._claim_next_unit()
+
+        job = self._make_job()
+
+        records = list(job.run())
+
+        self.assertEqual({unit.reportdate_start for unit, _ in records}, {date(2022, 1, 2)})
+        self.assertFalse(job.get_progress().is_done)
+
+        # the unit of a runner that stopped without releasing it is taken over
+        self.clock.now += job.claim_timeout
+
+        records = list(job.run())
+
+        self.assertEqual({unit.reportdate_start for unit, _ in records}, {date(2022, 1, 1)})
+        self.assertTrue(job.get_progress().is_done)
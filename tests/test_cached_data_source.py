@@ -0,0 +1,171 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import os
+import tempfile
+import time
+import unittest
+from datetime import date
+from io import IOBase, StringIO
+
+from opendns.cached_data_source import CachedDataSource
+from opendns.interfaces.i_data_source import IDataSource
+
+
+class TestCachedDataSource(unittest.TestCase):
+
+    TODAY = date(2005, 11, 10)
+
+    class _DataSource(IDataSource):
+
+        def __init__(self) -> None:
+
+            self.endpoints = []
+
+        def get_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None, file: IOBase = None) -> bytes | None:
+
+            self.endpoints.append(endpoint)
+
+            content = f"Date,Requests\n{endpoint},{len(self.endpoints)}\n"
+
+            if file is None:
+                return content.encode("UTF-8")
+
+            file.write(content)
+
+        def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+            return super().post_endpoint(endpoint, params)
+
+    def setUp(self) -> None:
+
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+
+        self.tempdir.cleanup()
+
+    def _get(self, obj: CachedDataSource, endpoint: str) -> str:
+
+        with StringIO() as file:
+            obj.get_endpoint(endpoint, None, file)
+            return file.getvalue()
+
+    def _make(self, **kwargs) -> tuple[_DataSource, CachedDataSource]:
+
+        ds = self._DataSource()
+
+        return ds, CachedDataSource(ds, self.tempdir.name, today=lambda: self.TODAY, **kwargs)
+
+    def test_get_endpoint_past_report_cached(self):
+
+        ds, obj = self._make()
+
+        path = "/stats/1/topdomains/2005-11-01/page2.csv"
+
+        first = self._get(obj, path)
+        second = self._get(obj, path)
+
+        self.assertEqual(first, second)
+        self.assertEqual(ds.endpoints, [path])
+
+        self.assertEqual(obj.get_endpoint(path), first.encode("UTF-8"))
+        self.assertEqual(ds.endpoints, [path])
+
+    def test_iter_endpoint_lines_cached(self):
+
+        ds, obj = self._make()
+
+        path = "/stats/1/topdomains/2005-11-01.csv"
+
+        first = list(obj.iter_endpoint_lines(path))
+        second = list(obj.iter_endpoint_lines(path))
+
+        self.assertEqual(first, ["Date,Requests\n", f"{path},1\n"])
+        self.assertEqual(first, second)
+        self.assertEqual(ds.endpoints, [path])
+
+    def test_get_endpoint_open_report_not_cached(self):
+
+        ds, obj = self._make()
+
+        for path in ("/stats/1/totalrequests/2005-11-10.csv",
+                     "/stats/1/totalrequests/2005-11-01to2005-11-10.csv",
+                     "/"):
+            self._get(obj, path)
+            self._get(obj, path)
+
+        self.assertEqual(len(ds.endpoints), 6)
+
+    def test_get_endpoint_compressed(self):
+
+        ds, obj = self._make(compress=True)
+
+        path = "/stats/1/totalrequests/2005-11-01to2005-11-07.csv"
+
+        first = self._get(obj, path)
+        second = self._get(obj, path)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(ds.endpoints), 1)
+        self.assertTrue(all(name.endswith(".csv.gz") for name in os.listdir(self.tempdir.name)))
+
+    def test_evicts_least_recently_used(self):
+
+        ds, obj = self._make()
+
+        paths = [f"/stats/1/requesttypes/2005-11-0{day}.csv" for day in range(1, 4)]
+
+        self._get(obj, paths[0])
+        page_size = sum(entry.stat().st_size for entry in os.scandir(self.tempdir.name))
+        obj.max_size = page_size * 2
+
+        self._get(obj, paths[1])
+
+        # make the first page the most recently used, as another process
+        # sharing the directory would by reading it
+        used_at = time.time() + 1000
+        for age, path in enumerate(paths[:2]):
+            cache_path = obj._get_cache_path(path, None)
+            os.utime(cache_path, (used_at - age, used_at - age))
+
+        self._get(obj, paths[2])
+
+        self.assertEqual(len(os.listdir(self.tempdir.name)), 2)
+
+        self._get(obj, paths[0])
+
+        self.assertEqual(ds.endpoints, paths)
+
+    def test_evict_scans_once(self):
+
+        ds, obj = self._make()
+
+        scans = []
+        scan = obj._scan
+        obj._scan = lambda: scans.append(1) or scan()
+
+        paths = [f"/stats/1/requesttypes/2005-11-0{day}.csv" for day in range(1, 8)]
+
+        self._get(obj, paths[0])
+        page_size = sum(entry.stat().st_size for entry in os.scandir(self.tempdir.name))
+        obj.max_size = page_size * 3
+
+        for path in paths[1:]:
+            self._get(obj, path)
+
+        # a page read is kept over pages stored after it
+        self._get(obj, paths[4])
+        self._get(obj, paths[0])
+        self._get(obj, paths[4])
+
+        self.assertEqual(len(scans), 1)
+        self.assertEqual(len(os.listdir(self.tempdir.name)), 3)
+        self.assertEqual(ds.endpoints, paths + [paths[0]])
@@ -0,0 +1,185 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import IOBase, StringIO
+
+from opendns.coalescing_data_source import AsyncCoalescingDataSource, CoalescingDataSource
+from opendns.interfaces.i_async_data_source import IAsyncDataSource
+from opendns.interfaces.i_data_source import IDataSource
+
+
+class TestCoalescingDataSource(unittest.TestCase):
+
+    class _DataSource(IDataSource):
+
+        def __init__(self) -> None:
+
+            self.endpoints = []
+            self.release = threading.Event()
+            self.error = None
+
+        def get_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None, file: IOBase = None) -> bytes | None:
+
+            self.endpoints.append(endpoint)
+
+            # hold the fetch open until every caller is waiting on it
+            self.release.wait(5)
+
+            if self.error is not None:
+                raise self.error
+
+            content = f"Date,Requests\n{endpoint},{len(self.endpoints)}\n"
+
+            if file is None:
+                return content.encode("cp1252") + b"caf\xe9\n"
+
+            file.write(content)
+
+        def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+            return super().post_endpoint(endpoint, params)
+
+    class _AsyncDataSource(IAsyncDataSource):
+
+        def __init__(self) -> None:
+
+            self.endpoints = []
+            self.error = None
+
+        async def get_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None, file: IOBase = None) -> bytes | None:
+
+            self.endpoints.append(endpoint)
+
+            await asyncio.sleep(0.01)
+
+            if self.error is not None:
+                raise self.error
+
+            content = f"Date,Requests\n{endpoint},{len(self.endpoints)}\n"
+
+            if file is None:
+                return content.encode("cp1252") + b"caf\xe9\n"
+
+            file.write(content)
+
+        async def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+            return await super().post_endpoint(endpoint, params)
+
+    def _fetch_concurrently(self, obj: CoalescingDataSource, endpoints: list[str]) -> list:
+
+        with ThreadPoolExecutor(len(endpoints)) as executor:
+
+            futures = [executor.submit(obj.get_endpoint, endpoint) for endpoint in endpoints]
+
+            # let every thread reach the in-flight fetch before it completes
+            threading.Event().wait(0.2)
+            obj.data_source.release.set()
+
+            return [future.result() for future in futures]
+
+    def test_get_endpoint_shares_fetch(self):
+
+        ds = self._DataSource()
+        obj = CoalescingDataSource(ds)
+
+        contents = self._fetch_concurrently(obj, ["/a.csv"] * 6 + ["/b.csv"] * 2)
+
+        self.assertEqual(sorted(ds.endpoints), ["/a.csv", "/b.csv"])
+        self.assertEqual(len(set(contents[:6])), 1)
+        self.assertIn(b"/a.csv", contents[0])
+
+        # content is shared as the data source returned it, not re-encoded
+        self.assertTrue(contents[0].endswith(b"caf\xe9\n"))
+
+        # finished fetches are not kept
+        with StringIO() as file:
+            obj.get_endpoint("/a.csv", None, file)
+
+        self.assertEqual(len(ds.endpoints), 3)
+
+    def test_get_endpoint_shares_error(self):
+
+        ds = self._DataSource()
+        ds.error = ConnectionError("unavailable")
+
+        obj = CoalescingDataSource(ds)
+
+        with ThreadPoolExecutor(4) as executor:
+
+            futures = [executor.submit(obj.get_endpoint, "/a.csv") for _ in range(4)]
+
+            threading.Event().wait(0.2)
+            ds.release.set()
+
+            errors = []
+            for future in futures:
+                with self.assertRaises(ConnectionError) as context:
+                    future.result()
+
+                errors.append(context.exception)
+
+        self.assertEqual(len(ds.endpoints), 1)
+
+        # each waiter raises its own error, chained to the original
+        self.assertEqual(len(set(map(id, errors))), 4)
+        self.assertEqual(sum(error is ds.error for error in errors), 1)
+        self.assertTrue(all(error.__cause__ is ds.error for error in errors if error is not ds.error))
+
+    def test_iter_endpoint_lines(self):
+
+        ds = self._DataSource()
+        ds.release.set()
+
+        obj = CoalescingDataSource(ds)
+
+        self.assertEqual(list(obj.iter_endpoint_lines("/a.csv")), ["Date,Requests\n", "/a.csv,1\n"])
+
+    def test_async_get_endpoint_shares_fetch(self):
+
+        ds = self._AsyncDataSource()
+        obj = AsyncCoalescingDataSource(ds)
+
+        async def fetch_all():
+
+            waiter = asyncio.ensure_future(obj.get_endpoint("/a.csv"))
+            await asyncio.sleep(0)
+
+            # a cancelled caller does not cancel the shared fetch
+            waiter.cancel()
+
+            return await asyncio.gather(*(obj.get_endpoint(endpoint) for endpoint in ["/a.csv", "/a.csv", "/b.csv"]))
+
+        contents = asyncio.run(fetch_all())
+
+        self.assertEqual(ds.endpoints, ["/a.csv", "/b.csv"])
+        self.assertEqual(contents[0], contents[1])
+        self.assertIn(b"/a.csv", contents[0])
+        self.assertTrue(contents[0].endswith(b"caf\xe9\n"))
+
+    def test_async_get_endpoint_shares_error(self):
+
+        ds = self._AsyncDataSource()
+        ds.error = ConnectionError("unavailable")
+
+        obj = AsyncCoalescingDataSource(ds)
+
+        async def fetch_all():
+            return await asyncio.gather(*(obj.get_endpoint("/a.csv") for _ in range(3)), return_exceptions=True)
+
+        errors = asyncio.run(fetch_all())
+
+        self.assertEqual(ds.endpoints, ["/a.csv"])
+        self.assertTrue(all(isinstance(error, ConnectionError) for error in errors))
+        self.assertEqual(len(set(map(id, errors))), 3)
+        self.assertTrue(all(error.__cause__ is ds.error for error in errors))
@@ -9,13 +9,18 @@ LICENSE file in the root directory of this source tree.
 If LICENSE file is not included, please visit :
     https://github.com/gkunde/py_opendns
 """
+import time
 from datetime import datetime
 from io import IOBase
 import unittest
 
+from fakes import PagedDataSource
 from opendns.data_repository import ReportDataRepository
 from opendns.interfaces.i_data_source import IDataSource
-from opendns.models import DomainActivityRecord, RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord, UniqueIpAddressRecord
+from opendns.interfaces.i_rate_limiter import Priority
+from opendns.models import CompactDomainActivityRecord, DomainActivityColumns, DomainActivityRecord, DomainCategory, DomainStatus, RequestTypesRecord, TotalRequestsRecord, TotalUniqueDomainsRecord, UniqueIpAddressRecord
+from opendns.rate_limiter import _current_priority, request_priority
+from opendns.report_schemas import RowFilter
 
 
 class TestDataRepository(unittest.TestCase):
@@ -155,6 +160,43 @@ class TestDataRepository(unittest.TestCase):
         self.assertFalse(records[0].is_web_spam)
         self.assertFalse(records[0].is_webmail)
 
+    def test_get_domain_activity_records_compact(self):
+
+        reportdate = datetime(2005, 11, 1, 0, 0, 0)
+
+        obj = ReportDataRepository(self._DataSource(), compact=True)
+
+        records = list(obj.get_domain_activity_records("1", reportdate.date()))
+
+        self.assertEqual(len(records), 1)
+
+        self.assertIsInstance(records[0], CompactDomainActivityRecord)
+
+        self.assertEqual(records[0].rank, 1)
+        self.assertEqual(records[0].report_period, reportdate)
+        self.assertEqual(records[0].hostname, "www.example.com")
+        self.assertEqual(records[0].requests, 4321)
+        self.assertEqual(records[0].status, DomainStatus.BLOCKED_HOSTNAME)
+        self.assertEqual(records[0].categories, DomainCategory.RESEARCH_REFERENCE)
+
+    def test_get_domain_activity_columns(self):
+
+        reportdate = datetime(2005, 11, 1, 0, 0, 0)
+
+        obj = ReportDataRepository(self._DataSource())
+
+        columns = obj.get_domain_activity_columns("1", reportdate.date())
+
+        self.assertIsInstance(columns, DomainActivityColumns)
+        self.assertEqual(len(columns), 1)
+
+        self.assertEqual(columns.report_period, reportdate)
+        self.assertEqual(list(columns.rank), [1])
+        self.assertEqual(columns.hostname, ["www.example.com"])
+        self.assertEqual(list(columns.requests), [4321])
+        self.assertEqual(list(columns.status), [DomainStatus.BLOCKED_HOSTNAME])
+        self.assertEqual(list(columns.categories), [DomainCategory.RESEARCH_REFERENCE])
+
     def test_get_request_types_records(self):
 
         reportdate = datetime(2005, 11, 1, 0, 0, 0)
@@ -173,6 +215,17 @@ class TestDataRepository(unittest.TestCase):
         self.assertEqual(records[0].request_type, "A"),
         self.assertEqual(records[0].requests, 4321)
 
+    def test_read_page_short_row(self):
+
+        obj = ReportDataRepository(self._DataSource())
+
+        # values missing from the end of a row are None, as with csv.DictReader
+        records, row_count, _ = obj._read_page_records(
+            ["Requests,Request Type\n", "4321\n"], "requesttypes", datetime(2005, 11, 1).date())
+
+        self.assertEqual(row_count, 1)
+        self.assertEqual(records, [RequestTypesRecord(datetime(2005, 11, 1), None, 4321)])
+
     def test_get_total_requests_records(self):
 
         reportdate = datetime(2005, 11, 1, 0, 0, 0)
@@ -225,3 +278,160 @@ class TestDataRepository(unittest.TestCase):
 
         self.assertEqual(records[0].report_period, reportdate)
         self.assertEqual(records[0].ip_addresses, 1)
+
+    def test_get_domain_activity_records_pages(self):
+
+        ds = PagedDataSource([5, 5, 2])
+
+        obj = ReportDataRepository(ds)
+
+        records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 1).date()))
+
+        self.assertEqual([record.rank for record in records], list(range(1, 13)))
+        self.assertEqual(ds.endpoints, [
+            "/stats/1/topdomains/2005-11-01.csv",
+            "/stats/1/topdomains/2005-11-01/page2.csv",
+            "/stats/1/topdomains/2005-11-01/page3.csv"])
+
+    def test_get_domain_activity_records_learned_page_size(self):
+
+        ds = PagedDataSource([5, 5, 3])
+
+        obj = ReportDataRepository(ds)
+
+        records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 1).date()))
+
+        # the short third page ends the report, without requesting a fourth
+        self.assertEqual(len(records), 13)
+        self.assertEqual(len(ds.endpoints), 3)
+
+        # the page size is remembered for later reports
+        ds.page_sizes = [4]
+        ds.endpoints.clear()
+
+        records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 2).date()))
+
+        self.assertEqual(len(records), 4)
+        self.assertEqual(len(ds.endpoints), 1)
+
+    def test_get_domain_activity_records_limit(self):
+
+        ds = PagedDataSource([5, 5, 5, 2])
+
+        obj = ReportDataRepository(ds)
+
+        records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 1).date(), limit=7))
+
+        self.assertEqual([record.rank for record in records], list(range(1, 8)))
+        self.assertEqual(len(ds.endpoints), 2)
+
+        # a limit on a page boundary requests no further page
+        ds.endpoints.clear()
+        records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 1).date(), limit=5))
+
+        self.assertEqual(len(records), 5)
+        self.assertEqual(len(ds.endpoints), 1)
+
+    def test_get_domain_activity_records_row_filter(self):
+
+        ds = PagedDataSource([5, 5, 2])
+
+        obj = ReportDataRepository(ds)
+
+        row_filter = RowFilter(["Domain"], lambda hostname: hostname.startswith("host1"))
+
+        records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 1).date(), row_filter=row_filter))
+
+        # filtered pages are still paged by their row count
+        self.assertEqual([record.rank for record in records], [1, 10, 11, 12])
+        self.assertEqual(len(ds.endpoints), 3)
+
+        columns = obj.get_domain_activity_columns("1", datetime(2005, 11, 1).date(), 10, row_filter)
+
+        self.assertEqual(list(columns.rank), [1, 10])
+
+    def test_get_domain_activity_records_prefetch(self):
+
+        ds = PagedDataSource([5, 5, 5, 2])
+
+        obj = ReportDataRepository(ds, prefetch_pages=2)
+
+        records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 1).date()))
+
+        self.assertEqual([record.rank for record in records], list(range(1, 18)))
+        self.assertEqual(len(ds.endpoints), 4)
+
+    def test_get_domain_activity_records_prefetch_depth(self):
+
+        ds = PagedDataSource([5] * 10)
+
+        obj = ReportDataRepository(ds, prefetch_pages=2)
+
+        records = obj.get_domain_activity_records("1", datetime(2005, 11, 1).date())
+        next(records)
+
+        # the first page is being read, and no more than 2 are fetched ahead
+        deadline = time.monotonic() + 5
+        while len(ds.endpoints) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        time.sleep(0.2)
+
+        self.assertEqual(len(ds.endpoints), 3)
+
+        records.close()
+
+    def test_get_domain_activity_records_prefetch_priority(self):
+
+        class _PriorityDataSource(PagedDataSource):
+
+            def __init__(self, page_sizes: list[int]) -> None:
+
+                super().__init__(page_sizes)
+
+                self.priorities = []
+
+            def get_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None, file: IOBase = None) -> None:
+
+                self.priorities.append(_current_priority.get())
+
+                super().get_endpoint(endpoint, params, file)
+
+        ds = _PriorityDataSource([5, 5, 2])
+
+        obj = ReportDataRepository(ds, prefetch_pages=2)
+
+        with request_priority(Priority.HIGH):
+            records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 1).date()))
+
+        self.assertEqual(len(records), 12)
+        self.assertEqual(ds.priorities, [Priority.HIGH] * 3)
+
+    def test_get_domain_activity_records_prefetch_limit(self):
+
+        ds = PagedDataSource([5, 5, 5, 5, 2])
+
+        obj = ReportDataRepository(ds, prefetch_pages=3)
+
+        records = list(obj.get_domain_activity_records("1", datetime(2005, 11, 1).date(), limit=8))
+
+        self.assertEqual([record.rank for record in records], list(range(1, 9)))
+        self.assertEqual(len(ds.endpoints), 2)
+
+    def test_get_domain_activity_records_prefetch_error(self):
+
+        class _FailingDataSource(PagedDataSource):
+
+            def get_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None, file: IOBase = None) -> None:
+
+                if "page2" in endpoint:
+                    raise RuntimeError("page2")
+
+                super().get_endpoint(endpoint, params, file)
+
+        obj = ReportDataRepository(_FailingDataSource([5, 5]), prefetch_pages=2)
+
+        records = obj.get_domain_activity_records("1", datetime(2005, 11, 1).date())
+
+        with self.assertRaises(RuntimeError):
+            list(records)
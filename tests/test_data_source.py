@@ -0,0 +1,237 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import os
+import stat
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+import requests
+
+from fake_dashboard import FakeDashboard
+from fakes import FakeClock
+from opendns.data_source import request_cancel_event
+from opendns.rate_limiter import RateLimiter
+
+REPORT_PATH = "/stats/1/requesttypes/2005-11-01.csv"
+
+
+class TestDataSource(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.dashboard = FakeDashboard().start()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cookie_file = os.path.join(self.tempdir.name, "cookies.txt")
+
+    def tearDown(self) -> None:
+
+        self.dashboard.stop()
+        self.tempdir.cleanup()
+
+    def _make_data_source(self, **kwargs):
+
+        return self.dashboard.make_data_source(rate_limiter=RateLimiter(100, 1), **kwargs)
+
+    def test_get_endpoint(self):
+
+        obj = self._make_data_source()
+
+        with StringIO() as file:
+            obj.get_endpoint(REPORT_PATH, None, file)
+            content = file.getvalue()
+
+        self.assertTrue(obj.is_connected)
+        self.assertEqual(content, "Request Type,Requests\nA,4321\nAAAA,1234\n")
+        self.assertEqual(self.dashboard.login_count, 1)
+
+    def test_iter_endpoint_lines(self):
+
+        obj = self._make_data_source()
+        obj.line_chunk_size = 5
+
+        lines = list(obj.iter_endpoint_lines(REPORT_PATH))
+
+        self.assertEqual(lines, ["Request Type,Requests\n", "A,4321\n", "AAAA,1234\n"])
+
+    def test_get_endpoint_retried(self):
+
+        self.dashboard.throttle_every = 2
+
+        clock = FakeClock()
+
+        obj = self.dashboard.make_data_source(rate_limiter=RateLimiter(100, 1, clock=clock, sleep=clock.sleep))
+        obj._sleep = clock.sleep
+
+        contents = [obj.get_endpoint(REPORT_PATH) for _ in range(2)]
+
+        self.assertEqual(contents[0], contents[1])
+        self.assertEqual(self.dashboard.throttled_count, 1)
+        self.assertEqual(len(clock.sleeps), 1)
+
+    def test_get_endpoint_retries_exhausted(self):
+
+        self.dashboard.throttle_every = 1
+
+        clock = FakeClock()
+
+        obj = self.dashboard.make_data_source(
+            rate_limiter=RateLimiter(100, 1, clock=clock, sleep=clock.sleep), max_retries=2)
+        obj._sleep = clock.sleep
+
+        with self.assertRaises(requests.HTTPError):
+            obj.get_endpoint(REPORT_PATH)
+
+        self.assertEqual(self.dashboard.throttled_count, 3)
+
+        # jittered between half and all of a backoff doubling each retry,
+        # never shorter than the Retry-After of 1 second
+        self.assertEqual(len(clock.sleeps), 2)
+        self.assertTrue(1 <= clock.sleeps[0] <= 2)
+        self.assertTrue(2 <= clock.sleeps[1] <= 4)
+
+    def test_request_cancel_event(self):
+
+        cancelled = threading.Event()
+
+        class _CancellingRateLimiter(RateLimiter):
+
+            def check(self, priority=None):
+
+                # the consumer stops while the request waits for its turn
+                super().check(priority)
+                cancelled.set()
+
+        obj = self.dashboard.make_data_source(rate_limiter=_CancellingRateLimiter(100, 1))
+
+        with request_cancel_event(cancelled):
+            with self.assertRaises(RuntimeError):
+                obj.get_endpoint(REPORT_PATH)
+
+        self.assertEqual(self.dashboard.stats_count, 0)
+
+        obj.get_endpoint(REPORT_PATH)
+
+        self.assertEqual(self.dashboard.stats_count, 1)
+
+    def test_get_retry_after(self):
+
+        obj = self._make_data_source()
+
+        response = requests.Response()
+
+        self.assertIsNone(obj._get_retry_after(response))
+
+        response.headers["Retry-After"] = "30"
+        self.assertEqual(obj._get_retry_after(response), 30)
+
+        response.headers["Retry-After"] = "Sun, 06 Nov 1994 08:49:37 GMT"
+        self.assertEqual(obj._get_retry_after(response), 0)
+
+        response.headers["Retry-After"] = "soon"
+        self.assertIsNone(obj._get_retry_after(response))
+
+    def test_get_endpoint_login_failed(self):
+
+        obj = self._make_data_source()
+
+        self.dashboard.password = "other"
+
+        with self.assertRaises(RuntimeError):
+            obj.get_endpoint(REPORT_PATH, None, StringIO())
+
+    def test_cookie_file_skips_login(self):
+
+        obj = self._make_data_source(cookie_file=self.cookie_file)
+        obj.get_endpoint(REPORT_PATH, None, StringIO())
+
+        self.assertEqual(self.dashboard.login_count, 1)
+        self.assertEqual(stat.S_IMODE(os.stat(self.cookie_file).st_mode), 0o600)
+
+        obj = self._make_data_source(cookie_file=self.cookie_file)
+
+        self.assertTrue(obj.is_connected)
+
+        with StringIO() as file:
+            obj.get_endpoint(REPORT_PATH, None, file)
+            self.assertTrue(file.getvalue().startswith("Request Type,Requests"))
+
+        self.assertEqual(self.dashboard.login_count, 1)
+
+    def test_cookie_file_permissions_restricted(self):
+
+        with open(self.cookie_file, "w", encoding="UTF-8") as file:
+            file.write("#LWP-Cookies-2.0\n")
+
+        os.chmod(self.cookie_file, 0o644)
+
+        obj = self._make_data_source(cookie_file=self.cookie_file)
+        obj.get_endpoint(REPORT_PATH)
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.cookie_file).st_mode), 0o600)
+
+    def test_expired_session_logs_in_again(self):
+
+        obj = self._make_data_source(cookie_file=self.cookie_file)
+        obj.get_endpoint(REPORT_PATH, None, StringIO())
+
+        self.dashboard.expire_sessions()
+
+        obj = self._make_data_source(cookie_file=self.cookie_file)
+
+        with StringIO() as file:
+            obj.get_endpoint(REPORT_PATH, None, file)
+            self.assertTrue(file.getvalue().startswith("Request Type,Requests"))
+
+        self.assertEqual(self.dashboard.login_count, 2)
+
+    def test_expired_session_retry_rate_limited(self):
+
+        clock = FakeClock()
+        rate_limiter = RateLimiter(100, 1, clock=clock, sleep=clock.sleep)
+
+        obj = self.dashboard.make_data_source(rate_limiter=rate_limiter)
+        obj.get_endpoint(REPORT_PATH)
+
+        self.dashboard.expire_sessions()
+        obj.get_endpoint(REPORT_PATH)
+
+        # the request sent again after logging in takes its own request
+        self.assertEqual(rate_limiter.remaining(), 97)
+        self.assertEqual(self.dashboard.login_count, 2)
+
+    def test_concurrent_login_is_single_flight(self):
+
+        obj = self._make_data_source(pool_maxsize=8)
+
+        with ThreadPoolExecutor(8) as executor:
+            contents = list(executor.map(lambda _: obj.get_endpoint(REPORT_PATH), range(16)))
+
+        self.assertEqual(self.dashboard.login_count, 1)
+        self.assertEqual(len(set(contents)), 1)
+
+        # an expired session is replaced once, however many threads find it
+        self.dashboard.expire_sessions()
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda _: obj.get_endpoint(REPORT_PATH), range(16)))
+
+        self.assertEqual(self.dashboard.login_count, 2)
+
+    def test_missing_cookie_file(self):
+
+        obj = self._make_data_source(cookie_file=self.cookie_file)
+
+        self.assertFalse(obj.is_connected)
@@ -0,0 +1,319 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import asyncio
+import unittest
+from datetime import date, datetime
+from itertools import zip_longest
+
+import requests
+
+from fake_dashboard import FakeDashboard
+from fakes import FakeClock
+from opendns.async_data_repository import AsyncReportDataRepository
+from opendns.data_repository import ReportDataRepository
+from opendns.metrics import (LOGINS, PAGE_PARSE_SECONDS, RATE_LIMIT_WAIT_SECONDS, REPORT_PAGES, REPORT_ROWS,
+                             REQUEST_SECONDS, RESPONSE_BYTES, MetricsRegistry)
+from opendns.rate_limiter import AsyncRateLimiter, RateLimiter
+from opendns.tracing import Span, Tracer
+
+
+class TestEndToEnd(unittest.TestCase):
+    """
+    Retrieves reports over HTTP from the fake dashboard.
+    """
+
+    def _make_repository(self, dashboard: FakeDashboard) -> ReportDataRepository:
+
+        data_source = dashboard.make_data_source(rate_limiter=RateLimiter(1000, 1))
+
+        return ReportDataRepository(data_source)
+
+    def test_get_domain_activity_records(self):
+
+        dashboard = FakeDashboard(domain_count=450, page_size=200).start()
+        try:
+            obj = self._make_repository(dashboard)
+
+            records = list(obj.get_domain_activity_records("1", date(2005, 11, 1)))
+
+        finally:
+            dashboard.stop()
+
+        self.assertEqual([record.rank for record in records], list(range(1, 451)))
+        self.assertTrue(records[10].is_blocked_hostname)
+        self.assertFalse(records[0].is_blocked_hostname)
+
+        self.assertEqual(dashboard.stats_count, 3)
+
+    def test_async_get_domain_activity_records(self):
+
+        metrics = MetricsRegistry()
+
+        async def get_reports(obj: AsyncReportDataRepository) -> list[list]:
+
+            async def get_report(day: int) -> list:
+                return [record async for record in obj.get_domain_activity_records("1", date(2005, 11, day))]
+
+            return await asyncio.gather(*(get_report(day) for day in range(1, 4)))
+
+        dashboard = FakeDashboard(domain_count=450, page_size=200).start()
+        try:
+            data_source = dashboard.make_async_data_source(metrics=metrics)
+            obj = AsyncReportDataRepository(data_source)
+
+            reports = asyncio.run(get_reports(obj))
+
+        finally:
+            dashboard.stop()
+
+        for records in reports:
+            self.assertEqual([record.rank for record in records], list(range(1, 451)))
+
+        # the reports started together log in once
+        self.assertEqual(dashboard.login_count, 1)
+        self.assertEqual(metrics.get_value(LOGINS), 1)
+        self.assertEqual(dashboard.stats_count, 9)
+
+    def test_metrics(self):
+
+        metrics = MetricsRegistry()
+
+        dashboard = FakeDashboard(domain_count=450, page_size=200).start()
+        try:
+            data_source = dashboard.make_data_source(rate_limiter=RateLimiter(1000, 1), metrics=metrics)
+            obj = ReportDataRepository(data_source, metrics=metrics)
+
+            list(obj.get_domain_activity_records("1", date(2005, 11, 1)))
+
+        finally:
+            dashboard.stop()
+
+        endpoint = {"endpoint": "/stats/topdomains"}
+        report_type = {"report_type": "topdomains"}
+
+        self.assertEqual(metrics.get_value(LOGINS), 1)
+        self.assertEqual(metrics.get_histogram(REQUEST_SECONDS, endpoint)[0], 3)
+        self.assertEqual(metrics.get_histogram(RATE_LIMIT_WAIT_SECONDS)[0], 3)
+        self.assertGreater(metrics.get_value(RESPONSE_BYTES, endpoint), 450 * 68 * 2)
+
+        self.assertEqual(metrics.get_value(REPORT_PAGES, report_type), 3)
+        self.assertEqual(metrics.get_value(REPORT_ROWS, report_type), 450)
+        self.assertEqual(metrics.get_histogram(PAGE_PARSE_SECONDS, report_type)[0], 3)
+
+    def test_tracer(self):
+
+        class Exporter:
+
+            def __init__(self) -> None:
+
+                self.spans = []
+
+            def export(self, span: Span) -> None:
+
+                self.spans.append(span)
+
+        exporter = Exporter()
+        tracer = Tracer(exporter)
+
+        dashboard = FakeDashboard(domain_count=250, page_size=200).start()
+        try:
+            data_source = dashboard.make_data_source(rate_limiter=RateLimiter(1000, 1), tracer=tracer)
+            obj = ReportDataRepository(data_source, tracer=tracer)
+
+            list(obj.get_domain_activity_records("1", date(2005, 11, 1)))
+
+        finally:
+            dashboard.stop()
+
+        spans = {span.span_id: span for span in exporter.spans}
+
+        self.assertEqual(
+            [span.name for span in exporter.spans],
+            ["login", "connection", "iter_endpoint_lines", "parse", "page",
+             "connection", "iter_endpoint_lines", "parse", "page", "report"])
+
+        page = exporter.spans[8]
+
+        self.assertEqual(page.attributes, {
+            "network_refid": "1",
+            "report_type": "topdomains",
+            "reportdate_start": date(2005, 11, 1),
+            "reportdate_end": None,
+            "page": 2,
+        })
+
+        self.assertEqual(spans[page.parent_id].name, "report")
+        self.assertEqual(spans[exporter.spans[0].parent_id].name, "connection")
+
+        # each page's request is a child of the page, and the connection a
+        # child of the request
+        request = exporter.spans[6]
+
+        self.assertEqual(request.parent_id, page.span_id)
+        self.assertEqual(request.attributes, {"endpoint": "/stats/1/topdomains/2005-11-01/page2.csv"})
+        self.assertEqual(exporter.spans[5].parent_id, request.span_id)
+        self.assertEqual(exporter.spans[7].parent_id, page.span_id)
+
+    def test_tracer_interleaved_reports(self):
+
+        class Exporter:
+
+            def __init__(self) -> None:
+
+                self.spans = []
+
+            def export(self, span: Span) -> None:
+
+                self.spans.append(span)
+
+        exporter = Exporter()
+        tracer = Tracer(exporter)
+
+        dashboard = FakeDashboard(domain_count=250, page_size=200).start()
+        try:
+            data_source = dashboard.make_data_source(rate_limiter=RateLimiter(1000, 1), tracer=tracer)
+            obj = ReportDataRepository(data_source, tracer=tracer)
+
+            first = obj.get_domain_activity_records("1", date(2005, 11, 1))
+            second = obj.get_domain_activity_records("1", date(2005, 11, 2))
+
+            # the reports are read in turn, each suspended while the other is
+            for _ in zip_longest(first, second):
+                pass
+
+            data_source.get_endpoint("/stats/1/requesttypes/2005-11-01.csv")
+
+        finally:
+            dashboard.stop()
+
+        reports = [span for span in exporter.spans if span.name == "report"]
+        request = exporter.spans[-1]
+
+        self.assertEqual(len(reports), 2)
+        self.assertNotEqual(reports[0].trace_id, reports[1].trace_id)
+
+        for span in exporter.spans:
+
+            if span.name in ("page", "parse", "iter_endpoint_lines"):
+                self.assertIn(span.trace_id, {report.trace_id for report in reports})
+
+        # a request made after the reports starts a trace of its own
+        self.assertEqual(request.name, "get_endpoint")
+        self.assertIsNone(request.parent_id)
+        self.assertEqual(request.trace_id, request.span_id)
+
+        pages = [span for span in exporter.spans if span.name == "page"]
+
+        self.assertEqual(
+            sorted(report.span_id for report in reports for _ in range(2)),
+            sorted(page.parent_id for page in pages))
+
+    def test_get_total_requests_records(self):
+
+        dashboard = FakeDashboard().start()
+        try:
+            obj = self._make_repository(dashboard)
+
+            hourly = list(obj.get_total_requests_records("1", date(2005, 11, 1), date(2005, 11, 2)))
+            daily = list(obj.get_total_requests_records("1", date(2005, 11, 1), date(2005, 11, 30)))
+
+        finally:
+            dashboard.stop()
+
+        self.assertEqual(len(hourly), 48)
+        self.assertEqual(hourly[13].report_period, datetime(2005, 11, 1, 13))
+        self.assertEqual(len(daily), 30)
+
+    def test_throttled_request(self):
+
+        dashboard = FakeDashboard(throttle_every=1).start()
+        try:
+            data_source = dashboard.make_data_source(rate_limiter=RateLimiter(1000, 1), max_retries=0)
+            obj = ReportDataRepository(data_source)
+
+            with self.assertRaises(requests.HTTPError):
+                list(obj.get_request_types_records("1", date(2005, 11, 1)))
+
+        finally:
+            dashboard.stop()
+
+        self.assertEqual(dashboard.throttled_count, 1)
+
+    def test_async_throttled_request(self):
+
+        async def get_records(obj: AsyncReportDataRepository) -> list:
+            return [record async for record in obj.get_request_types_records("1", date(2005, 11, 1))]
+
+        dashboard = FakeDashboard(throttle_every=1).start()
+        try:
+            data_source = dashboard.make_async_data_source(rate_limiter=AsyncRateLimiter(1000, 1), max_retries=0)
+
+            with self.assertRaises(requests.HTTPError):
+                asyncio.run(get_records(AsyncReportDataRepository(data_source)))
+
+        finally:
+            dashboard.stop()
+
+        self.assertEqual(dashboard.throttled_count, 1)
+
+    def test_throttled_request_retried(self):
+
+        clock = FakeClock()
+        rate_limiter = RateLimiter(16, 60, clock=clock, sleep=clock.sleep, max_requests=32)
+
+        dashboard = FakeDashboard(domain_count=450, page_size=200, throttle_every=2).start()
+        try:
+            data_source = dashboard.make_data_source(rate_limiter=rate_limiter)
+            data_source._sleep = clock.sleep
+
+            obj = ReportDataRepository(data_source)
+
+            records = list(obj.get_domain_activity_records("1", date(2005, 11, 1)))
+
+        finally:
+            dashboard.stop()
+
+        self.assertEqual(len(records), 450)
+        self.assertEqual(dashboard.throttled_count, 2)
+        self.assertEqual(dashboard.stats_count, 5)
+
+        # each retry waited at least the Retry-After of 1 second
+        self.assertEqual(len(clock.sleeps), 2)
+        self.assertTrue(all(1 <= seconds <= data_source.RETRY_BACKOFF for seconds in clock.sleeps))
+
+        # cut once, the second throttle came within one request interval
+        self.assertEqual(rate_limiter.num_requests, 8)
+
+    def test_async_throttled_request_retried(self):
+
+        async def get_records(obj: AsyncReportDataRepository) -> list:
+            return [record async for record in obj.get_domain_activity_records("1", date(2005, 11, 1))]
+
+        clock = FakeClock()
+        rate_limiter = AsyncRateLimiter(16, 60, clock=clock, sleep=clock.async_sleep, max_requests=32)
+
+        dashboard = FakeDashboard(domain_count=450, page_size=200, throttle_every=2).start()
+        try:
+            data_source = dashboard.make_async_data_source(rate_limiter=rate_limiter)
+            data_source._sleep = clock.async_sleep
+
+            records = asyncio.run(get_records(AsyncReportDataRepository(data_source)))
+
+        finally:
+            dashboard.stop()
+
+        self.assertEqual(len(records), 450)
+        self.assertEqual(dashboard.throttled_count, 2)
+        self.assertEqual(len(clock.sleeps), 2)
+
+        # the adaptive budget of the provided limiter was cut
+        self.assertEqual(rate_limiter.num_requests, 8)
@@ -0,0 +1,149 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import unittest
+from datetime import date, timedelta
+
+from fakes import FakeClock
+from opendns.data_repository import ReportDataRepository
+from opendns.fetch_planner import FetchNeed, FetchPlanner, FetchRequest, Granularity
+from opendns.rate_limiter import RateLimiter
+
+
+class TestFetchPlanner(unittest.TestCase):
+
+    RPT = ReportDataRepository.RPT_REQUESTS
+
+    def _spans(self, plan) -> list[tuple[date, date]]:
+
+        return [(request.reportdate_start, request.reportdate_end) for request in plan.requests]
+
+    def test_plan_merges_daily(self):
+
+        plan = FetchPlanner().plan([
+            FetchNeed(self.RPT, "1", date(2022, 1, 1), date(2022, 1, 10)),
+            FetchNeed(self.RPT, "1", date(2022, 1, 11), date(2022, 2, 10)),
+            FetchNeed(self.RPT, "1", date(2022, 1, 5)),
+            FetchNeed(self.RPT, "1", date(2022, 3, 1), date(2022, 3, 2)),
+        ])
+
+        self.assertEqual(self._spans(plan), [
+            (date(2022, 1, 1), date(2022, 2, 10)),
+            (date(2022, 3, 1), date(2022, 3, 2))])
+
+    def test_plan_separates_reports_and_networks(self):
+
+        plan = FetchPlanner().plan([
+            FetchNeed(self.RPT, "1", date(2022, 1, 1)),
+            FetchNeed(self.RPT, "2", date(2022, 1, 1)),
+            FetchNeed(ReportDataRepository.RPT_IPADDR, "1", date(2022, 1, 1)),
+        ])
+
+        self.assertEqual(plan.request_count, 3)
+        self.assertIn(FetchRequest(self.RPT, "2", date(2022, 1, 1), date(2022, 1, 1)), plan.requests)
+
+    def test_plan_splits_hourly(self):
+
+        plan = FetchPlanner().plan([
+            FetchNeed(self.RPT, "1", date(2022, 1, 1), date(2022, 1, 20), Granularity.HOURLY),
+        ])
+
+        self.assertEqual(self._spans(plan), [
+            (date(2022, 1, 1), date(2022, 1, 7)),
+            (date(2022, 1, 8), date(2022, 1, 14)),
+            (date(2022, 1, 15), date(2022, 1, 20))])
+
+    def test_plan_hourly_spans_share_window(self):
+
+        plan = FetchPlanner().plan([
+            FetchNeed(self.RPT, "1", date(2022, 1, 1), date(2022, 1, 2), Granularity.HOURLY),
+            FetchNeed(self.RPT, "1", date(2022, 1, 5), date(2022, 1, 10), Granularity.HOURLY),
+        ])
+
+        self.assertEqual(self._spans(plan), [
+            (date(2022, 1, 1), date(2022, 1, 7)),
+            (date(2022, 1, 8), date(2022, 1, 10))])
+
+    def test_plan_drops_daily_covered_by_hourly(self):
+
+        plan = FetchPlanner().plan([
+            FetchNeed(self.RPT, "1", date(2022, 1, 1), date(2022, 1, 10), Granularity.HOURLY),
+            FetchNeed(self.RPT, "1", date(2022, 1, 3), date(2022, 1, 9)),
+            FetchNeed(self.RPT, "1", date(2022, 1, 20), date(2022, 1, 21)),
+        ])
+
+        self.assertEqual(self._spans(plan), [
+            (date(2022, 1, 1), date(2022, 1, 7)),
+            (date(2022, 1, 8), date(2022, 1, 10)),
+            (date(2022, 1, 20), date(2022, 1, 21))])
+
+    def test_plan_rejects_single_date_reports(self):
+
+        with self.assertRaises(ValueError):
+            FetchPlanner().plan([FetchNeed(ReportDataRepository.RPT_DOMAIN, "1", date(2022, 1, 1))])
+
+        with self.assertRaises(ValueError):
+            FetchPlanner().plan([FetchNeed(self.RPT, "1", date(2022, 1, 2), date(2022, 1, 1))])
+
+    def test_get_eta(self):
+
+        planner = FetchPlanner(19, 120)
+
+        self.assertEqual(planner.get_eta(0), timedelta(0))
+        self.assertEqual(planner.get_eta(19), timedelta(0))
+        self.assertEqual(planner.get_eta(20), timedelta(seconds=120))
+        self.assertEqual(planner.get_eta(39), timedelta(seconds=240))
+
+        plan = planner.plan([FetchNeed(self.RPT, str(refid), date(2022, 1, 1)) for refid in range(25)])
+
+        self.assertEqual(plan.request_count, 25)
+        self.assertEqual(plan.eta, timedelta(seconds=120))
+
+    def test_get_eta_rate_limiter(self):
+
+        clock = FakeClock()
+        rate_limiter = RateLimiter(19, 120, clock)
+
+        for _ in range(5):
+            rate_limiter.try_acquire()
+
+        planner = FetchPlanner(rate_limiter=rate_limiter)
+
+        # requests left in the window are made now
+        self.assertEqual(planner.get_eta(14), timedelta(0))
+        self.assertEqual(planner.get_eta(15), timedelta(seconds=120))
+
+        # the window slides, more are made as the oldest leave it
+        clock.now += 50
+        self.assertEqual(planner.get_eta(15), timedelta(seconds=70))
+        self.assertEqual(planner.get_eta(34), timedelta(seconds=190))
+
+        for _ in range(14):
+            rate_limiter.try_acquire()
+
+        # a spent window frees when its oldest request leaves it
+        self.assertEqual(planner.get_eta(1), timedelta(seconds=70))
+        self.assertEqual(planner.get_eta(20), timedelta(seconds=190))
+
+        # a Retry-After pauses every request
+        rate_limiter.on_throttle(100)
+        self.assertEqual(planner.get_eta(1), timedelta(seconds=100))
+
+    def test_get_eta_adapted_budget(self):
+
+        rate_limiter = RateLimiter(20, 120, FakeClock(), max_requests=40)
+        rate_limiter.on_throttle()
+
+        planner = FetchPlanner(rate_limiter=rate_limiter)
+
+        self.assertEqual(planner.get_eta(10), timedelta(0))
+        self.assertEqual(planner.get_eta(11), timedelta(seconds=120))
+        self.assertEqual(planner.get_eta(21), timedelta(seconds=240))
@@ -0,0 +1,92 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import unittest
+from datetime import date
+
+from fakes import PagedDataSource
+from opendns.data_repository import ReportDataRepository
+from opendns.metrics import LOGINS, REPORT_PAGES, REPORTS, REQUEST_SECONDS, MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_increment(self):
+
+        obj = MetricsRegistry()
+
+        obj.increment(LOGINS)
+        obj.increment(LOGINS, 2)
+        obj.increment("pages", labels={"report_type": "topdomains", "network": "1"})
+        obj.increment("pages", labels={"network": "1", "report_type": "topdomains"})
+
+        self.assertEqual(obj.get_value(LOGINS), 3)
+        self.assertEqual(obj.get_value("pages", {"report_type": "topdomains", "network": "1"}), 2)
+        self.assertEqual(obj.get_value("pages"), 0)
+
+    def test_observe(self):
+
+        obj = MetricsRegistry(buckets=(0.1, 1))
+
+        for value in (0.05, 0.1, 0.5, 3):
+            obj.observe(REQUEST_SECONDS, value, {"endpoint": "/stats/topdomains"})
+
+        self.assertEqual(obj.get_histogram(REQUEST_SECONDS, {"endpoint": "/stats/topdomains"}), (4, 3.65))
+        self.assertEqual(obj.get_histogram(REQUEST_SECONDS), (0, 0.0))
+
+    def test_render(self):
+
+        obj = MetricsRegistry(buckets=(0.1, 1))
+
+        obj.increment(LOGINS)
+        obj.observe(REQUEST_SECONDS, 0.05, {"endpoint": "/stats/topdomains"})
+        obj.observe(REQUEST_SECONDS, 2.5, {"endpoint": "/stats/topdomains"})
+        obj.increment("custom_total", 1.5, {"path": 'a"b\\c\n'})
+
+        self.assertEqual(obj.render(), (
+            "# TYPE custom_total counter\n"
+            'custom_total{path="a\\"b\\\\c\\n"} 1.5\n'
+            "# HELP opendns_logins_total Logins made.\n"
+            "# TYPE opendns_logins_total counter\n"
+            "opendns_logins_total 1\n"
+            "# HELP opendns_request_duration_seconds "
+            "Seconds from sending a request until its response headers arrived.\n"
+            "# TYPE opendns_request_duration_seconds histogram\n"
+            'opendns_request_duration_seconds_bucket{endpoint="/stats/topdomains",le="0.1"} 1\n'
+            'opendns_request_duration_seconds_bucket{endpoint="/stats/topdomains",le="1"} 1\n'
+            'opendns_request_duration_seconds_bucket{endpoint="/stats/topdomains",le="+Inf"} 2\n'
+            'opendns_request_duration_seconds_sum{endpoint="/stats/topdomains"} 2.55\n'
+            'opendns_request_duration_seconds_count{endpoint="/stats/topdomains"} 2\n'))
+
+
+class TestReportMetrics(unittest.TestCase):
+
+    def test_pages_per_report(self):
+
+        metrics = MetricsRegistry()
+
+        ds = PagedDataSource([5, 5, 2])
+
+        for prefetch_pages in (0, 2):
+
+            obj = ReportDataRepository(ds, metrics=metrics, prefetch_pages=prefetch_pages)
+
+            list(obj.get_domain_activity_records("1", date(2005, 11, 1)))
+
+        # a report abandoned before its last page is not counted
+        records = obj.get_domain_activity_records("1", date(2005, 11, 2))
+        next(records)
+        records.close()
+
+        report_type = {"report_type": "topdomains"}
+
+        self.assertEqual(metrics.get_value(REPORTS, report_type), 2)
+        self.assertEqual(metrics.get_value(REPORT_PAGES, report_type), 6)
@@ -0,0 +1,60 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import unittest
+from datetime import datetime
+
+from opendns.models import CompactDomainActivityRecord, DomainActivityRecord, DomainCategory, DomainStatus
+
+
+class TestCompactDomainActivityRecord(unittest.TestCase):
+
+    def test_flag_properties(self):
+
+        obj = CompactDomainActivityRecord(
+            1, datetime(2005, 11, 1), "www.example.com", 4321,
+            DomainStatus.BLOCKED_HOSTNAME, DomainCategory.ADWARE | DomainCategory.WEBMAIL)
+
+        self.assertTrue(obj.is_blocked_hostname)
+        self.assertFalse(obj.is_blocked_category)
+        self.assertTrue(obj.is_adware)
+        self.assertTrue(obj.is_webmail)
+        self.assertFalse(obj.is_academic_fraud)
+
+        self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_mask_queries(self):
+
+        obj = CompactDomainActivityRecord(categories=DomainCategory.ADWARE | DomainCategory.WEBMAIL)
+
+        self.assertTrue(obj.has_any_category(DomainCategory.ADWARE | DomainCategory.GAMBLING))
+        self.assertFalse(obj.has_any_category(DomainCategory.GAMBLING))
+        self.assertTrue(obj.has_all_categories(DomainCategory.ADWARE | DomainCategory.WEBMAIL))
+        self.assertFalse(obj.has_all_categories(DomainCategory.ADWARE | DomainCategory.GAMBLING))
+        self.assertFalse(obj.has_any_status(DomainStatus.BLOCKED_MALWARE))
+
+    def test_record_round_trip(self):
+
+        record = DomainActivityRecord(
+            rank=1, report_period=datetime(2005, 11, 1), hostname="www.example.com", requests=4321,
+            is_blocked_botnet=True, is_research_reference=True)
+
+        obj = CompactDomainActivityRecord.from_record(record)
+
+        self.assertEqual(obj.status, DomainStatus.BLOCKED_BOTNET)
+        self.assertEqual(obj.categories, DomainCategory.RESEARCH_REFERENCE)
+
+        converted = obj.to_record()
+
+        self.assertTrue(converted.is_blocked_botnet)
+        self.assertTrue(converted.is_research_reference)
+        self.assertFalse(converted.is_webmail)
+        self.assertEqual(CompactDomainActivityRecord.from_record(converted), obj)
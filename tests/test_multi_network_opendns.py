@@ -0,0 +1,67 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import unittest
+from datetime import date
+
+from fakes import PagedDataSource
+from opendns.data_repository import ReportDataRepository
+from opendns.interfaces.i_data_source import IDataSource
+from opendns.multi_network_opendns import MultiNetworkOpenDns
+
+
+class TestMultiNetworkOpenDns(unittest.TestCase):
+
+    def _make(self, network_refids: list[str], data_source: IDataSource) -> MultiNetworkOpenDns:
+
+        obj = MultiNetworkOpenDns("username", "password", network_refids)
+
+        obj.data_source = data_source
+        obj.report_data_repository = ReportDataRepository(data_source)
+
+        return obj
+
+    def test_init(self):
+
+        obj = MultiNetworkOpenDns("username", "password", ["1", "2"])
+
+        self.assertEqual(obj.network_refids, ["1", "2"])
+        self.assertIs(obj.report_data_repository.data_source, obj.data_source)
+
+    def test_get_domain_activity_report_round_robin(self):
+
+        ds = PagedDataSource({"1": [3, 3, 1], "2": [2]})
+
+        obj = self._make(["1", "2"], ds)
+
+        records = list(obj.get_domain_activity_report(date(2005, 11, 1)))
+
+        self.assertEqual(ds.endpoints, [
+            "/stats/1/topdomains/2005-11-01.csv",
+            "/stats/2/topdomains/2005-11-01.csv",
+            "/stats/1/topdomains/2005-11-01/page2.csv",
+            "/stats/1/topdomains/2005-11-01/page3.csv"])
+
+        self.assertEqual(
+            [(network_refid, record.rank) for network_refid, record in records],
+            [("1", 1), ("1", 2), ("1", 3), ("2", 1), ("2", 2), ("1", 4), ("1", 5), ("1", 6), ("1", 7)])
+
+    def test_get_total_requests_report(self):
+
+        ds = PagedDataSource({})
+
+        obj = self._make(["1", "2", "3"], ds)
+
+        records = list(obj.get_total_requests_report(date(2005, 11, 1)))
+
+        self.assertEqual([(network_refid, record.requests) for network_refid, record in records],
+                         [("1", 1), ("2", 2), ("3", 3)])
+        self.assertEqual(len(ds.endpoints), 3)
@@ -11,7 +11,8 @@ If LICENSE file is not included, please visit :
 """
 import unittest
 import uuid
-from opendns import OpenDns
+from opendns import AsyncOpenDns, OpenDns
+from opendns.rate_limiter import AsyncRateLimiter, RateLimiter
 
 
 class TestOpenDns(unittest.TestCase):
@@ -28,3 +29,33 @@ class TestOpenDns(unittest.TestCase):
         self.assertEqual(obj.network_refid, self.TEST_NETWORKREFID)
         self.assertEqual(obj.data_source._username, self.TEST_USERNAME)
         self.assertEqual(obj.data_source._password, self.TEST_PASSWORD)
+
+    def test_init_rate_limiter(self):
+
+        rate_limiter = RateLimiter(1, 1)
+
+        obj = OpenDns(self.TEST_USERNAME, self.TEST_PASSWORD,
+                      self.TEST_NETWORKREFID, rate_limiter)
+
+        self.assertIs(obj.data_source._rate_limiter, rate_limiter)
+
+    def test_async_init(self):
+
+        obj = AsyncOpenDns(self.TEST_USERNAME, self.TEST_PASSWORD,
+                           self.TEST_NETWORKREFID)
+
+        self.assertEqual(obj.network_refid, self.TEST_NETWORKREFID)
+        self.assertEqual(obj.data_source._data_source._username, self.TEST_USERNAME)
+        self.assertEqual(obj.data_source._data_source._password, self.TEST_PASSWORD)
+
+    def test_async_init_rate_limiter(self):
+
+        rate_limiter = AsyncRateLimiter(16, 60, max_requests=32)
+
+        obj = AsyncOpenDns(self.TEST_USERNAME, self.TEST_PASSWORD,
+                           self.TEST_NETWORKREFID, rate_limiter)
+
+        self.assertIs(obj.data_source._rate_limiter, rate_limiter)
+
+        # requests are only rate limited by the async rate limiter
+        self.assertNotIsInstance(obj.data_source._data_source._rate_limiter, RateLimiter)
@@ -9,10 +9,14 @@ LICENSE file in the root directory of this source tree.
 If LICENSE file is not included, please visit :
     https://github.com/gkunde/py_opendns
 """
+import asyncio
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
-from opendns.rate_limiter import RateLimiter
+from fakes import FakeClock
+from opendns.interfaces.i_rate_limiter import Priority
+from opendns.rate_limiter import AsyncRateLimiter, RateLimiter, request_priority
 
 
 class TestRateLimiter(unittest.TestCase):
@@ -43,3 +47,225 @@ class TestRateLimiter(unittest.TestCase):
         test_duration = time.time() - test_start
 
         self.assertGreaterEqual(test_duration, self.TIMING_TEST_PERIOD)
+
+    def test_async_check(self):
+
+        clock = FakeClock()
+
+        obj = AsyncRateLimiter(self.TIMING_TEST_NUM_REQUESTS,
+                               self.TIMING_TEST_PERIOD,
+                               clock=clock,
+                               sleep=clock.async_sleep)
+
+        async def run():
+            for _ in range(self.TIMING_TEST_NUM_REQUESTS + 1):
+                await obj.check()
+
+        asyncio.run(run())
+
+        self.assertEqual(clock.sleeps, [self.TIMING_TEST_PERIOD])
+
+    def test_check_sleeps_until_slot_frees(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(2, 120, clock=clock, sleep=clock.sleep)
+
+        obj.check()
+        clock.now += 30
+        obj.check()
+
+        self.assertEqual(clock.sleeps, [])
+
+        obj.check()
+
+        # woken exactly when the first request left the window
+        self.assertEqual(clock.sleeps, [90.0])
+        self.assertEqual(clock.now, 1120.0)
+
+        obj.check()
+
+        self.assertEqual(clock.sleeps, [90.0, 30.0])
+
+    def test_try_checkpoint_threads(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(5, 60, clock=clock, sleep=clock.sleep)
+
+        with ThreadPoolExecutor(8) as executor:
+            delays = list(executor.map(lambda _: obj._try_checkpoint(), range(40)))
+
+        # the clock is stopped, so only the budget's requests are allowed
+        self.assertEqual(delays.count(0), 5)
+
+    def test_priority_takes_free_request_first(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(10, 60, clock=clock, sleep=clock.sleep)
+
+        with obj._waiting(Priority.HIGH):
+
+            # background requests leave the free requests to the waiting one
+            self.assertEqual(obj._try_checkpoint(Priority.LOW), obj.PREEMPT_DELAY)
+            self.assertEqual(obj._try_checkpoint(Priority.HIGH), 0)
+
+        self.assertEqual(obj._try_checkpoint(Priority.LOW), 0)
+
+    def test_priority_reserved_share(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(10, 60, clock=clock, sleep=clock.sleep, reserved_share=0.2)
+
+        with obj._waiting(Priority.HIGH):
+
+            # background keeps 2 of every 10 requests while high priority waits
+            delays = [obj._try_checkpoint(Priority.LOW) for _ in range(3)]
+
+        self.assertEqual(delays, [0, 0, obj.PREEMPT_DELAY])
+
+    def test_introspection(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(2, 60, clock=clock, sleep=clock.sleep)
+
+        self.assertEqual(obj.remaining(), 2)
+        self.assertEqual(obj.time_until_available(), 0)
+        self.assertEqual(obj.time_until_refill(), 0)
+
+        self.assertTrue(obj.try_acquire())
+        clock.now += 10
+        self.assertTrue(obj.try_acquire())
+        self.assertFalse(obj.try_acquire())
+
+        self.assertEqual(obj.remaining(), 0)
+        self.assertEqual(obj.time_until_available(), 50)
+
+        clock.now += 50
+
+        self.assertEqual(obj.remaining(), 1)
+        self.assertEqual(obj.time_until_available(), 0)
+        self.assertEqual(obj.time_until_refill(), 10)
+
+        # a waiting higher priority holds back lower ones
+        with obj._waiting(Priority.HIGH):
+            self.assertEqual(obj.time_until_available(Priority.LOW), obj.PREEMPT_DELAY)
+            self.assertFalse(obj.try_acquire(Priority.LOW))
+
+        self.assertEqual(clock.sleeps, [])
+
+    def test_adaptive_budget(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(4, 60, clock=clock, sleep=clock.sleep, max_requests=6)
+
+        obj.on_throttle()
+        self.assertEqual(obj.num_requests, 2)
+
+        # throttled again within one request interval, requests in flight
+        # together only cut the budget once
+        clock.now += 10
+        obj.on_throttle()
+        self.assertEqual(obj.num_requests, 2)
+
+        clock.now += 30
+        obj.on_throttle()
+        obj.on_throttle()
+        self.assertEqual(obj.num_requests, 1)
+
+        # a window's worth of successes adds a request
+        budgets = []
+        for _ in range(12):
+            obj.on_success()
+            budgets.append(obj.num_requests)
+
+        self.assertEqual(budgets, [2, 2, 3, 3, 3, 4, 4, 4, 4, 5, 5, 5])
+
+        for _ in range(20):
+            obj.on_success()
+
+        self.assertEqual(obj.num_requests, 6)
+
+    def test_fixed_budget_retry_after(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(4, 60, clock=clock, sleep=clock.sleep)
+
+        obj.on_throttle(5)
+        obj.on_success()
+
+        self.assertEqual(obj.num_requests, 4)
+        self.assertEqual(obj.time_until_available(), 5)
+
+        obj.check()
+
+        self.assertEqual(clock.sleeps, [5])
+
+    def test_adaptive_budget_cut_below_window(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(4, 60, clock=clock, sleep=clock.sleep, max_requests=4)
+
+        for _ in range(4):
+            obj.check()
+            clock.now += 1
+
+        obj.on_throttle()
+
+        self.assertEqual(obj.remaining(), 0)
+
+        obj.check()
+
+        # the budget is now 2, so three of the four requests leave first
+        self.assertEqual(clock.now, 1062.0)
+
+    def test_request_priority(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(10, 60, clock=clock, sleep=clock.sleep)
+
+        priorities = []
+        obj._try_checkpoint = lambda priority: priorities.append(priority) or 0
+
+        obj.check()
+        with request_priority(Priority.HIGH):
+            obj.check()
+            obj.check(Priority.LOW)
+
+        self.assertEqual(priorities, [Priority.NORMAL, Priority.HIGH, Priority.LOW])
+
+    def test_check_window_expires(self):
+
+        clock = FakeClock()
+
+        obj = RateLimiter(2, 120, clock=clock, sleep=clock.sleep)
+
+        obj.check()
+        obj.check()
+        clock.now += 120
+        obj.check()
+        obj.check()
+
+        self.assertEqual(clock.sleeps, [])
+
+    def test_async_check_sleeps_until_slot_frees(self):
+
+        clock = FakeClock()
+
+        obj = AsyncRateLimiter(1, 120, clock=clock, sleep=clock.async_sleep)
+
+        async def run():
+            await obj.check()
+            clock.now += 20
+            await obj.check()
+
+        asyncio.run(run())
+
+        self.assertEqual(clock.sleeps, [100.0])
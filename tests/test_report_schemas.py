@@ -0,0 +1,86 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import unittest
+from datetime import date, datetime
+
+from opendns.models import DomainActivityRecord, TotalUniqueDomainsRecord
+from opendns.report_schemas import DOMAIN_ACTIVITY_FLAG_COLUMNS, REPORT_SCHEMAS, ReportSchema, RowFilter
+
+
+class TestReportSchemas(unittest.TestCase):
+
+    REPORT_DATE = date(2005, 11, 1)
+
+    def test_registry(self):
+
+        self.assertEqual(
+            set(REPORT_SCHEMAS),
+            {"topdomains", "requesttypes", "totalrequests", "uniquedomains", "uniqueips"})
+
+    def test_domain_activity_column_order(self):
+
+        # columns in a different order than the record's fields
+        header = ["Domain", "Total", "Rank"] + list(reversed(DOMAIN_ACTIVITY_FLAG_COLUMNS.values()))
+
+        decode = REPORT_SCHEMAS["topdomains"].compile(header, self.REPORT_DATE)
+
+        flags = ["0"] * len(DOMAIN_ACTIVITY_FLAG_COLUMNS)
+        flags[header.index("Blocked as Botnet") - 3] = "1"
+        flags[header.index("Webmail") - 3] = "2"
+
+        record = decode(["www.example.com", "4321", "7"] + flags)
+
+        self.assertIsInstance(record, DomainActivityRecord)
+        self.assertEqual(record.rank, 7)
+        self.assertEqual(record.report_period, datetime(2005, 11, 1))
+        self.assertEqual(record.hostname, "www.example.com")
+        self.assertEqual(record.requests, 4321)
+        self.assertTrue(record.is_blocked_botnet)
+        self.assertTrue(record.is_webmail)
+        self.assertFalse(record.is_blocked_malware)
+        self.assertFalse(record.is_blocked_hostname)
+
+    def test_time_series(self):
+
+        decode = REPORT_SCHEMAS["uniquedomains"].compile(["Requests", "Date"], self.REPORT_DATE)
+
+        record = decode(["12", "2005-11-01 13:00:00 "])
+
+        self.assertEqual(record, TotalUniqueDomainsRecord(datetime(2005, 11, 1, 13), 12))
+
+    def test_missing_column(self):
+
+        with self.assertRaises(KeyError):
+            REPORT_SCHEMAS["uniqueips"].compile(["Date", "Requests"], self.REPORT_DATE)
+
+    def test_abstract(self):
+
+        with self.assertRaises(TypeError):
+            ReportSchema("topdomains", DomainActivityRecord)
+
+    def test_row_filter_any_flag(self):
+
+        header = ["Rank", "Domain", "Total"] + list(DOMAIN_ACTIVITY_FLAG_COLUMNS.values())
+
+        is_included = RowFilter.any_flag("is_blocked_malware", "is_blocked_botnet").compile(header)
+
+        flags = ["0"] * len(DOMAIN_ACTIVITY_FLAG_COLUMNS)
+        self.assertFalse(is_included(["1", "www.example.com", "1"] + flags))
+
+        flags[header.index("Blocked as Botnet") - 3] = "1"
+        self.assertTrue(is_included(["1", "www.example.com", "1"] + flags))
+
+        with self.assertRaises(KeyError):
+            RowFilter.any_flag("is_blocked_malware").compile(["Rank", "Domain"])
+
+        with self.assertRaises(KeyError):
+            RowFilter.any_flag("hostname")
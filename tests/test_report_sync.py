@@ -0,0 +1,126 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import os
+import tempfile
+import unittest
+from datetime import date
+from io import IOBase
+
+from opendns.checkpoint_store import CheckpointStore
+from opendns.data_repository import ReportDataRepository
+from opendns.interfaces.i_data_source import IDataSource
+from opendns.report_sync import ReportSync
+
+
+class TestReportSync(unittest.TestCase):
+
+    class _DataSource(IDataSource):
+
+        def __init__(self) -> None:
+
+            self.endpoints = []
+
+        def get_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None, file: IOBase = None) -> None:
+
+            self.endpoints.append(endpoint)
+
+            if "requesttypes" in endpoint:
+                file.write("Request Type,Requests\nA,4321\n")
+
+            if "totalrequests" in endpoint:
+                file.write("Date,Requests\n2005-11-01 00:00:00,4321\n")
+
+        def post_endpoint(self, endpoint: str, params: list[tuple[str, str | None]] = None) -> None:
+            return super().post_endpoint(endpoint, params)
+
+    def setUp(self) -> None:
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.store = CheckpointStore(os.path.join(self.tempdir.name, "checkpoints.sqlite"))
+
+        self.data_source = self._DataSource()
+        self.today = date(2022, 1, 20)
+
+        self.sync = ReportSync(ReportDataRepository(self.data_source), self.store, today=lambda: self.today)
+
+    def tearDown(self) -> None:
+
+        self.tempdir.cleanup()
+
+    def test_checkpoint_store(self):
+
+        self.assertIsNone(self.store.get_checkpoint("1", "totalrequests"))
+
+        self.store.set_checkpoint("1", "totalrequests", date(2022, 1, 5))
+        self.store.set_checkpoint("1", "totalrequests", date(2022, 1, 3))
+        self.store.set_checkpoint("2", "totalrequests", date(2022, 1, 1))
+
+        self.assertEqual(self.store.get_checkpoint("1", "totalrequests"), date(2022, 1, 5))
+        self.assertEqual(self.store.get_checkpoint("2", "totalrequests"), date(2022, 1, 1))
+
+    def test_sync_range_report(self):
+
+        records = list(self.sync.sync(ReportDataRepository.RPT_REQUESTS, "1", date(2022, 1, 10)))
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(self.data_source.endpoints, [
+            "/stats/1/totalrequests/2022-01-10to2022-01-16.csv",
+            "/stats/1/totalrequests/2022-01-17to2022-01-20.csv"])
+        self.assertEqual(self.store.get_checkpoint("1", "totalrequests"), date(2022, 1, 19))
+
+        # steady state, only the open day is fetched again
+        self.data_source.endpoints.clear()
+        list(self.sync.sync(ReportDataRepository.RPT_REQUESTS, "1"))
+
+        self.assertEqual(self.data_source.endpoints, ["/stats/1/totalrequests/2022-01-20.csv"])
+
+        # the next day, yesterday closes in the same request
+        self.today = date(2022, 1, 21)
+        self.data_source.endpoints.clear()
+        list(self.sync.sync(ReportDataRepository.RPT_REQUESTS, "1"))
+
+        self.assertEqual(self.data_source.endpoints, ["/stats/1/totalrequests/2022-01-20to2022-01-21.csv"])
+        self.assertEqual(self.store.get_checkpoint("1", "totalrequests"), date(2022, 1, 20))
+
+    def test_sync_single_date_report(self):
+
+        list(self.sync.sync(ReportDataRepository.RPT_REQUESTTYPE, "1", date(2022, 1, 18)))
+
+        self.assertEqual(self.data_source.endpoints, [
+            "/stats/1/requesttypes/2022-01-18.csv",
+            "/stats/1/requesttypes/2022-01-19.csv",
+            "/stats/1/requesttypes/2022-01-20.csv"])
+        self.assertEqual(self.store.get_checkpoint("1", "requesttypes"), date(2022, 1, 19))
+
+    def test_sync_without_start(self):
+
+        list(self.sync.sync(ReportDataRepository.RPT_REQUESTS, "1"))
+
+        self.assertEqual(self.data_source.endpoints, ["/stats/1/totalrequests/2022-01-19to2022-01-20.csv"])
+        self.assertEqual(self.store.get_checkpoint("1", "totalrequests"), date(2022, 1, 19))
+
+        # the next day, the day left open is fetched again once it closes
+        self.today = date(2022, 1, 21)
+        self.data_source.endpoints.clear()
+        list(self.sync.sync(ReportDataRepository.RPT_REQUESTS, "1"))
+
+        self.assertEqual(self.data_source.endpoints, ["/stats/1/totalrequests/2022-01-20to2022-01-21.csv"])
+        self.assertEqual(self.store.get_checkpoint("1", "totalrequests"), date(2022, 1, 20))
+
+    def test_sync_stopped_keeps_checkpoint(self):
+
+        records = self.sync.sync(ReportDataRepository.RPT_REQUESTS, "1", date(2022, 1, 1))
+
+        next(records)
+        records.close()
+
+        self.assertIsNone(self.store.get_checkpoint("1", "totalrequests"))
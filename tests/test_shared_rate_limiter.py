@@ -0,0 +1,146 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import os
+import tempfile
+import unittest
+
+from fakes import FakeClock
+from opendns.shared_rate_limiter import SharedRateLimiter
+
+
+class TestSharedRateLimiter(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "budget.sqlite")
+
+    def tearDown(self) -> None:
+
+        self.tempdir.cleanup()
+
+    def test_init(self):
+
+        obj = SharedRateLimiter(self.path, 19, 120)
+
+        self.assertEqual(obj.num_requests, 19)
+        self.assertEqual(obj.period, 120)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_check_shares_budget(self):
+
+        clock = FakeClock()
+
+        first = SharedRateLimiter(self.path, 2, 120, clock=clock, sleep=clock.sleep)
+        second = SharedRateLimiter(self.path, 2, 120, clock=clock, sleep=clock.sleep)
+
+        first.check()
+        clock.now += 10
+        second.check()
+
+        self.assertEqual(clock.sleeps, [])
+
+        first.check()
+
+        self.assertEqual(clock.sleeps, [110.0])
+
+    def test_check_persists_between_instances(self):
+
+        clock = FakeClock()
+
+        obj = SharedRateLimiter(self.path, 1, 120, clock=clock, sleep=clock.sleep)
+        obj.check()
+        del obj
+
+        obj = SharedRateLimiter(self.path, 1, 120, clock=clock, sleep=clock.sleep)
+        obj.check()
+
+        self.assertEqual(clock.sleeps, [120.0])
+
+    def test_check_keys_are_independent(self):
+
+        clock = FakeClock()
+
+        first = SharedRateLimiter(self.path, 1, 120, key="a", clock=clock, sleep=clock.sleep)
+        second = SharedRateLimiter(self.path, 1, 120, key="b", clock=clock, sleep=clock.sleep)
+
+        first.check()
+        second.check()
+
+        self.assertEqual(clock.sleeps, [])
+
+    def test_introspection(self):
+
+        clock = FakeClock()
+
+        first = SharedRateLimiter(self.path, 2, 120, clock=clock, sleep=clock.sleep)
+        second = SharedRateLimiter(self.path, 2, 120, clock=clock, sleep=clock.sleep)
+
+        self.assertEqual(second.remaining(), 2)
+
+        self.assertTrue(first.try_acquire())
+        clock.now += 20
+        self.assertTrue(second.try_acquire())
+        self.assertFalse(first.try_acquire())
+
+        self.assertEqual(first.remaining(), 0)
+        self.assertEqual(second.time_until_available(), 100.0)
+
+        clock.now += 100
+
+        self.assertEqual(second.remaining(), 1)
+        self.assertEqual(second.time_until_available(), 0)
+        self.assertEqual(first.time_until_refill(), 20)
+        self.assertEqual(clock.sleeps, [])
+
+    def test_on_throttle_pauses_every_process(self):
+
+        clock = FakeClock()
+
+        first = SharedRateLimiter(self.path, 19, 120, clock=clock, sleep=clock.sleep)
+        second = SharedRateLimiter(self.path, 19, 120, clock=clock, sleep=clock.sleep)
+
+        first.on_throttle(30)
+
+        self.assertEqual(second.time_until_available(), 30)
+        self.assertFalse(second.try_acquire())
+
+        second.check()
+
+        self.assertEqual(clock.sleeps, [30])
+
+        # a fixed budget is not cut
+        self.assertEqual(second.remaining(), 18)
+
+    def test_adaptive_budget_is_shared(self):
+
+        clock = FakeClock()
+
+        first = SharedRateLimiter(self.path, 4, 120, clock=clock, sleep=clock.sleep, max_requests=8)
+        second = SharedRateLimiter(self.path, 4, 120, clock=clock, sleep=clock.sleep, max_requests=8)
+
+        # throttles of requests in flight together cut the budget once
+        first.on_throttle()
+        second.on_throttle()
+
+        self.assertEqual(second.remaining(), 2)
+        self.assertEqual(second.num_requests, 2)
+
+        first.on_success()
+        second.on_success()
+
+        self.assertEqual(first.remaining(), 3)
+
+        # an adapted budget is kept for processes started later
+        third = SharedRateLimiter(self.path, 4, 120, clock=clock, sleep=clock.sleep, max_requests=8)
+
+        self.assertEqual(third.remaining(), 3)
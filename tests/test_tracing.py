@@ -0,0 +1,146 @@
+"""
+MIT License
+
+Copyright (c) 2022 Garrett Kunde
+
+This source code is licensed under the MIT License found in the
+LICENSE file in the root directory of this source tree.
+
+If LICENSE file is not included, please visit :
+    https://github.com/gkunde/py_opendns
+"""
+import json
+import os
+import pstats
+import tempfile
+import unittest
+from datetime import date
+
+from opendns.tracing import JsonLinesExporter, Span, Tracer, trace
+
+
+class TestTracer(unittest.TestCase):
+
+    class _Exporter:
+
+        def __init__(self) -> None:
+
+            self.spans = []
+
+        def export(self, span: Span) -> None:
+
+            self.spans.append(span)
+
+    def test_span(self):
+
+        exporter = self._Exporter()
+
+        obj = Tracer(exporter)
+
+        with obj.span("report", report_type="topdomains") as report:
+            with obj.span("page", page=1) as page:
+                pass
+
+        self.assertEqual([span.name for span in exporter.spans], ["page", "report"])
+
+        self.assertEqual(page.parent_id, report.span_id)
+        self.assertEqual(page.trace_id, report.span_id)
+        self.assertIsNone(report.parent_id)
+        self.assertEqual(report.attributes, {"report_type": "topdomains"})
+        self.assertGreaterEqual(report.duration, page.duration)
+
+        # the next span starts a new trace
+        with obj.span("report") as next_report:
+            pass
+
+        self.assertIsNone(next_report.parent_id)
+        self.assertNotEqual(next_report.trace_id, report.trace_id)
+
+    def test_start_span(self):
+
+        exporter = self._Exporter()
+
+        obj = Tracer(exporter)
+
+        with obj.start_span("report") as report:
+
+            # not the parent of spans started while it is open
+            with obj.span("get_endpoint") as request:
+                pass
+
+            with obj.start_span("page", report) as page:
+
+                with obj.use_span(page):
+                    with obj.span("connection") as connection:
+                        pass
+
+        self.assertIsNone(request.parent_id)
+        self.assertNotEqual(request.trace_id, report.trace_id)
+
+        self.assertEqual(page.parent_id, report.span_id)
+        self.assertEqual(connection.parent_id, page.span_id)
+        self.assertEqual(connection.trace_id, report.trace_id)
+
+    def test_span_error(self):
+
+        exporter = self._Exporter()
+
+        obj = Tracer(exporter)
+
+        with self.assertRaises(RuntimeError):
+            with obj.span("login"):
+                raise RuntimeError("Login failed.")
+
+        self.assertEqual(exporter.spans[0].error, "RuntimeError: Login failed.")
+
+    def test_trace_without_tracer(self):
+
+        with trace(None, "page", page=1) as span:
+            self.assertIsNone(span)
+
+    def test_profile_dir(self):
+
+        exporter = self._Exporter()
+
+        with tempfile.TemporaryDirectory() as profile_dir:
+
+            obj = Tracer(exporter, profile_dir=profile_dir)
+
+            with obj.span("report"):
+                with obj.span("page"):
+                    sorted(range(1000))
+
+            page, report = exporter.spans
+
+            self.assertNotIn("profile", page.attributes)
+
+            stats = pstats.Stats(report.attributes["profile"])
+
+            self.assertTrue(any(function[2] == "<built-in method builtins.sorted>" for function in stats.stats))
+
+
+class TestJsonLinesExporter(unittest.TestCase):
+
+    def test_export(self):
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+
+            path = os.path.join(temp_dir, "trace.jsonl")
+
+            obj = Tracer(JsonLinesExporter(path))
+
+            with obj.span("report", network_refid="1", reportdate_start=date(2005, 11, 1)):
+                with obj.span("page", page=2):
+                    pass
+
+            with open(path, encoding="UTF-8") as file:
+                lines = [json.loads(line) for line in file]
+
+        page, report = lines
+
+        self.assertEqual(page["name"], "page")
+        self.assertEqual(page["attributes"], {"page": 2})
+        self.assertEqual(page["parent_id"], report["span_id"])
+
+        self.assertEqual(report["attributes"], {"network_refid": "1", "reportdate_start": "2005-11-01"})
+        self.assertIsNone(report["error"])